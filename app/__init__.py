@@ -1,4 +1,4 @@
-from flask import Flask
+from flask import Flask, Request, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
@@ -11,8 +11,19 @@ login_manager = LoginManager()
 bcrypt = Bcrypt()
 migrate = Migrate()
 
+class JobMatchRequest(Request):
+    """Requête avec une taille maximale propre à l'analyse de fraude en masse."""
+
+    @property
+    def max_content_length(self):
+        # Le fichier reçu est écrit sur disque par Werkzeug puis lu par blocs
+        if self.endpoint == 'jobs.fraud_check':
+            return current_app.config.get('BULK_CHECK_MAX_CONTENT_LENGTH')
+        return super().max_content_length
+
 def create_app(config_class=Config):
     app = Flask(__name__)
+    app.request_class = JobMatchRequest
     app.config.from_object(config_class)
     
     # Initialisation des extensions avec l'application
@@ -31,14 +42,36 @@ def create_app(config_class=Config):
     from app.routes.profile import profile
     from app.routes.jobs import jobs
     from app.routes.history import history
+    from app.routes.monitoring import monitoring
     
     app.register_blueprint(auth)
     app.register_blueprint(profile)
     app.register_blueprint(jobs)
     app.register_blueprint(history)
+    app.register_blueprint(monitoring)
     
     # Création des tables dans la base de données
     with app.app_context():
         db.create_all()
-    
+
     return app
+
+def start_background_services(app):
+    """
+    Démarre les services d'arrière-plan de l'application web.
+    Appelé uniquement par le point d'entrée web (run.py) : les scripts
+    (init_db.py, crawler_daemon...) créent l'application sans ces threads.
+
+    Args:
+        app (Flask): Application web
+    """
+    # Démarrage du pool des rafraîchissements d'offres
+    from app.services.scrape_tasks import scrape_task_runner
+    scrape_task_runner.max_workers = app.config.get('SCRAPE_WORKERS', scrape_task_runner.max_workers)
+    scrape_task_runner.start(app, resume=app.config.get('SCRAPE_TASK_RESUME', True))
+
+    # Démarrage de l'analyse de fraude en arrière-plan
+    if app.config.get('FRAUD_ASYNC_SCORING'):
+        from app.services.fraud_detection.background_scorer import background_scorer
+        background_scorer.batch_size = app.config.get('FRAUD_SCORING_BATCH_SIZE', background_scorer.batch_size)
+        background_scorer.start(app)
@@ -19,3 +19,21 @@ class Config:
     # Configuration des uploads
     UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'static/uploads')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16 MB max upload
+    # Limite propre à l'analyse de fraude en masse (le fichier est traité par blocs)
+    BULK_CHECK_MAX_CONTENT_LENGTH = int(os.environ.get('BULK_CHECK_MAX_CONTENT_LENGTH', 1024 * 1024 * 1024))  # 1 GB
+
+    # Analyse de fraude asynchrone (les offres sont analysées en arrière-plan après l'enregistrement)
+    FRAUD_ASYNC_SCORING = os.environ.get('FRAUD_ASYNC_SCORING', 'true').lower() in ('1', 'true', 'yes')
+    FRAUD_SCORING_BATCH_SIZE = int(os.environ.get('FRAUD_SCORING_BATCH_SIZE', 100))
+
+    # Rafraîchissement des offres en arrière-plan (/jobs/refresh)
+    SCRAPE_WORKERS = int(os.environ.get('SCRAPE_WORKERS', 2))
+    # Reprise au démarrage des tâches restées dans la file persistante
+    SCRAPE_TASK_RESUME = os.environ.get('SCRAPE_TASK_RESUME', 'true').lower() in ('1', 'true', 'yes')
+
+    # Crawler planifié des recherches populaires (python -m app.services.crawler_daemon)
+    CRAWLER_INTERVAL = int(os.environ.get('CRAWLER_INTERVAL', 1800))  # Délai entre deux cycles (secondes)
+    CRAWLER_PAGE_BUDGET = int(os.environ.get('CRAWLER_PAGE_BUDGET', 1200))  # Pages demandées par cycle (résultats et pages d'offres)
+    CRAWLER_MAX_AGE = int(os.environ.get('CRAWLER_MAX_AGE', 3600))  # Âge maximal des résultats (secondes)
+    CRAWLER_HISTORY_DAYS = int(os.environ.get('CRAWLER_HISTORY_DAYS', 14))
+    CRAWLER_HALF_LIFE_HOURS = float(os.environ.get('CRAWLER_HALF_LIFE_HOURS', 48))
@@ -3,6 +3,30 @@ Configuration pour les différents scrapers de sites d'emploi.
 Ce fichier centralise les paramètres de configuration pour faciliter la maintenance.
 """
 
+import os
+
+# Répertoire des fichiers d'état du scraping (caches, bases SQLite partagées par les workers).
+# Par défaut, le dossier instance/ de l'application, indépendamment du répertoire courant.
+SCRAPER_STATE_DIR = os.environ.get(
+    'SCRAPER_STATE_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'instance')
+)
+
+
+def state_path(name):
+    """
+    Retourne le chemin d'un fichier d'état dans SCRAPER_STATE_DIR (créé si besoin).
+
+    Args:
+        name (str): Nom du fichier ou du répertoire
+
+    Returns:
+        str: Chemin absolu
+    """
+    os.makedirs(SCRAPER_STATE_DIR, exist_ok=True)
+    return os.path.join(SCRAPER_STATE_DIR, name)
+
+
 # Configuration des sélecteurs CSS et paramètres pour chaque site
 SCRAPER_CONFIG = {
     'indeed': {
@@ -17,7 +41,10 @@ SCRAPER_CONFIG = {
             'salary': ['div.salary-snippet-container', 'div[data-testid="attribute_snippet_testid"]'],
             'link': ['h2.jobTitle a', 'a.jcs-JobTitle', 'h2 a'],
             'description': ['div.job-snippet', 'div[data-testid="job-snippet"]'],
-            'metadata': ['div.metadata', 'div[data-testid="attribute_snippet_testid"]']
+            'metadata': ['div.metadata', 'div[data-testid="attribute_snippet_testid"]'],
+            'date': ['span.date', 'span[data-testid="myJobsStateDate"]'],
+            # Description complète sur la page de l'offre (enrichissement)
+            'detail_description': ['div#jobDescriptionText', 'div.jobsearch-jobDescriptionText']
         },
         'params': {
             'q': '{query}',
@@ -39,7 +66,12 @@ SCRAPER_CONFIG = {
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1'
         },
-        'rate_limit': {'calls': 5, 'period': 60}  # 5 appels par minute
+        'rate_limit': {'calls': 5, 'period': 60},  # 5 appels par minute
+        'detail_rate_limit': {'calls': 20, 'period': 60},  # Pages d'offres (budget distinct)
+        'cache_ttl': 300,  # Durée minimale de fraîcheur du cache HTTP (secondes)
+        # Pagination : paramètre 'start' avancé de 10 offres par page
+        'pagination': {'param': 'start', 'first': 0, 'step': 10, 'page_size': 10, 'max_pages': 5,
+                       'newest_first': True}
     },
     'linkedin': {
         'base_url': 'https://www.linkedin.com/jobs/search',
@@ -50,12 +82,15 @@ SCRAPER_CONFIG = {
                        'a.hidden-nested-link', 'span.job-search-card__company-name'],
             'location': ['span.job-search-card__location', 'div.base-search-card__metadata'],
             'link': ['a.base-card__full-link', 'a.job-search-card__link'],
-            'date': ['time.job-search-card__listdate', 'time']
+            'date': ['time.job-search-card__listdate', 'time'],
+            # Description complète sur la page de l'offre (enrichissement)
+            'detail_description': ['div.show-more-less-html__markup', 'div.description__text']
         },
         'params': {
             'keywords': '{query}',
             'location': '{location}',
             'f_TPR': 'r86400',  # Offres des dernières 24 heures
+            'sortBy': 'DD',  # Offres les plus récentes d'abord
             'position': '1',
             'pageNum': '0'
         },
@@ -73,7 +108,12 @@ SCRAPER_CONFIG = {
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1'
         },
-        'rate_limit': {'calls': 3, 'period': 60}  # 3 appels par minute (plus restrictif)
+        'rate_limit': {'calls': 3, 'period': 60},  # 3 appels par minute (plus restrictif)
+        'detail_rate_limit': {'calls': 10, 'period': 60},  # Pages d'offres (budget distinct)
+        'cache_ttl': 600,  # Durée minimale de fraîcheur du cache HTTP (secondes)
+        # Pagination : paramètre 'pageNum' à partir de 0, 25 offres par page
+        'pagination': {'param': 'pageNum', 'first': 0, 'step': 1, 'page_size': 25, 'max_pages': 4,
+                       'newest_first': True}
     },
     'monster': {
         'base_url': 'https://www.monster.fr/emploi/recherche',
@@ -82,7 +122,10 @@ SCRAPER_CONFIG = {
             'title': ['h3.job-cardstyle__JobCardTitle', 'a.title'],
             'company': ['span.job-cardstyle__CompanyName', 'div.company'],
             'location': ['span.job-cardstyle__Location', 'div.location'],
-            'link': ['a.job-cardstyle__JobCardComponent', 'a.title']
+            'link': ['a.job-cardstyle__JobCardComponent', 'a.title'],
+            'date': ['span[data-testid="jobDetailDateRecency"]', 'time'],
+            # Description complète sur la page de l'offre (enrichissement)
+            'detail_description': ['div[data-testid="svx-description-container-inner"]', 'div.job-description']
         },
         'params': {
             'q': '{query}',
@@ -104,7 +147,11 @@ SCRAPER_CONFIG = {
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1'
         },
-        'rate_limit': {'calls': 5, 'period': 60}  # 5 appels par minute
+        'rate_limit': {'calls': 5, 'period': 60},  # 5 appels par minute
+        'detail_rate_limit': {'calls': 20, 'period': 60},  # Pages d'offres (budget distinct)
+        'cache_ttl': 300,  # Durée minimale de fraîcheur du cache HTTP (secondes)
+        # Pagination : paramètre 'page' à partir de 1
+        'pagination': {'param': 'page', 'first': 1, 'step': 1, 'page_size': 20, 'max_pages': 5}
     },
     'pole_emploi': {
         'base_url': 'https://candidat.pole-emploi.fr/offres/recherche',
@@ -115,14 +162,17 @@ SCRAPER_CONFIG = {
             'location': ['span.location', 'p.location'],
             'link': ['a.media', 'a.card-body'],
             'description': ['p.description', 'div.description'],
-            'contract': ['span.contrat', 'p.contrat']
+            'contract': ['span.contrat', 'p.contrat'],
+            'date': ['p.date', 'span.date'],
+            # Description complète sur la page de l'offre (enrichissement)
+            'detail_description': ['div.description-offre', 'div[itemprop="description"]']
         },
         'params': {
             'motsCles': '{query}',
             'lieux': '{location}',
             'offresPartenaires': 'true',
             'rayon': '10',
-            'tri': '1',
+            'tri': '1',  # Offres les plus récentes d'abord
             'typeContrat': '',
             'qualification': '',
             'periodeEmission': '1'  # Offres des dernières 24 heures
@@ -141,10 +191,59 @@ SCRAPER_CONFIG = {
             'Sec-Fetch-User': '?1',
             'Upgrade-Insecure-Requests': '1'
         },
-        'rate_limit': {'calls': 5, 'period': 60}  # 5 appels par minute
+        'rate_limit': {'calls': 5, 'period': 60},  # 5 appels par minute
+        'detail_rate_limit': {'calls': 20, 'period': 60},  # Pages d'offres (budget distinct)
+        'cache_ttl': 300,  # Durée minimale de fraîcheur du cache HTTP (secondes)
+        # Pagination : plage de résultats 'range' (ex: 0-19, 20-39...)
+        'pagination': {'param': 'range', 'format': '{start}-{end}', 'page_size': 20, 'max_pages': 5,
+                       'newest_first': True}
     }
 }
 
+# Configuration du moteur de récupération asynchrone
+ASYNC_ENGINE_CONFIG = {
+    'max_connections': 100,  # Requêtes simultanées au total
+    'max_per_host': 4,  # Requêtes simultanées par site
+    'timeout': 10,  # Délai maximal d'une requête (secondes)
+    'retries': 3,
+    'backoff_factor': 0.3,
+    'status_forcelist': (500, 502, 503, 504)
+}
+
+# Pools de connexions persistantes des sessions requests (une session par site)
+CONNECTION_POOL_CONFIG = {
+    'pool_connections': 4,  # Hôtes dont le pool est conservé par session
+    # Connexions conservées par hôte : pagination, enrichissement et tâches simultanées
+    'pool_maxsize': 8
+}
+
+# Configuration de l'enrichissement par les pages d'offres
+ENRICHMENT_CONFIG = {
+    'enabled': True,
+    'max_workers': 8,  # Pages d'offres récupérées simultanément au total
+    'max_per_host': 2,  # Pages d'offres récupérées simultanément par site
+    'window': 32,  # Offres en cours d'enrichissement au maximum
+    'min_length': 200  # Une description plus courte est considérée comme un extrait
+}
+
+# Disjoncteur par source (voir circuit_breaker.py)
+CIRCUIT_BREAKER_CONFIG = {
+    'timeout_threshold': 3,  # Délais dépassés consécutifs avant ouverture (blocage et 429 : ouverture immédiate)
+    'base_cooldown': 300,  # Première durée d'ouverture (secondes)
+    'max_cooldown': 6 * 3600,  # Durée d'ouverture maximale (secondes)
+    'multiplier': 2,  # Facteur appliqué à chaque échec de la requête de test
+    'probe_timeout': 120  # Délai après lequel une requête de test sans réponse est relancée (secondes)
+}
+
+# Scraping incrémental par recherche (voir high_water.py)
+INCREMENTAL_CONFIG = {
+    'enabled': True,
+    'known_urls': 200,  # URLs les plus récentes gardées par (source, recherche, lieu)
+    'stop_after_known': 3,  # Offres déjà connues sur une page avant d'arrêter la pagination
+    'date_tolerance': 86400,  # Marge sur les dates relatives ("il y a 1 jour") (secondes)
+    'full_crawl_interval': 24 * 3600  # Parcours complet périodique de chaque recherche (secondes)
+}
+
 # Patterns pour l'extraction de données
 EXTRACTION_PATTERNS = {
     'salary': [
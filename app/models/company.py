@@ -0,0 +1,32 @@
+from datetime import datetime
+from app import db
+
+class Company(db.Model):
+    """Entreprise canonique, partagée par toutes les offres de ses variantes de nom."""
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Nom affiché (première variante rencontrée, nettoyée)
+    name = db.Column(db.String(100), nullable=False)
+    # Clé de rapprochement : nom sans accents, casse ni ponctuation (ex: 'capgemini')
+    key = db.Column(db.String(100), unique=True, nullable=False, index=True)
+    logo = db.Column(db.String(255))
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    # Relations
+    aliases = db.relationship('CompanyAlias', backref='company', lazy=True)
+
+    def __repr__(self):
+        return f"Company('{self.name}')"
+
+
+class CompanyAlias(db.Model):
+    """Variante de nom rencontrée sur un site, rattachée à son entreprise canonique."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    raw_name = db.Column(db.String(200), unique=True, nullable=False, index=True)
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=False, index=True)
+
+    def __repr__(self):
+        return f"CompanyAlias('{self.raw_name}')"
@@ -0,0 +1,57 @@
+from datetime import datetime
+import json
+from app import db
+
+class FraudScoreStats(db.Model):
+    """Statistiques agrégées des scores de fraude par source, jour et version du modèle."""
+    __table_args__ = (
+        db.UniqueConstraint('source', 'day', 'model_version', name='uq_fraud_score_stats_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Clé d'agrégation
+    source = db.Column(db.String(50), nullable=False)
+    day = db.Column(db.Date, nullable=False)
+    model_version = db.Column(db.String(40), nullable=False)
+
+    # Moments (algorithme de Welford)
+    count = db.Column(db.Integer, default=0, nullable=False)
+    mean = db.Column(db.Float, default=0.0, nullable=False)
+    m2 = db.Column(db.Float, default=0.0, nullable=False)
+    min_score = db.Column(db.Float)
+    max_score = db.Column(db.Float)
+
+    # Histogramme à intervalles fixes, stocké en JSON
+    histogram = db.Column(db.Text, nullable=False, default='[]')
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"FraudScoreStats('{self.source}', '{self.day}', '{self.model_version}', {self.count})"
+
+    def get_histogram(self):
+        """
+        Récupère l'histogramme sous forme de liste de compteurs.
+
+        Returns:
+            list: Compteurs par intervalle de score
+        """
+        try:
+            return json.loads(self.histogram or '[]')
+        except ValueError:
+            return []
+
+    def set_histogram(self, buckets):
+        """
+        Définit l'histogramme à partir d'une liste de compteurs.
+
+        Args:
+            buckets (list): Compteurs par intervalle de score
+        """
+        self.histogram = json.dumps(buckets)
+
+    @property
+    def variance(self):
+        """Variance de l'échantillon des scores."""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
@@ -1,6 +1,7 @@
 from datetime import datetime
 import json
 from app import db
+from app.models.company import Company
 
 # Table d'association pour les compétences requises
 job_skills = db.Table('job_skills',
@@ -15,6 +16,11 @@ class Job(db.Model):
     title = db.Column(db.String(100), nullable=False)
     company_name = db.Column(db.String(100), nullable=False)
     company_logo = db.Column(db.String(255))
+    # Entreprise canonique (voir Company). company_name et company_logo en restent une copie,
+    # réécrite à chaque enregistrement, pour les gabarits, la recherche (Job.company_name)
+    # et les offres antérieures sans company_id. À retirer une fois ces offres rattachées
+    # (reprise de company_id dans init_db.py) et les lectures passées par Job.company.
+    company_id = db.Column(db.Integer, db.ForeignKey('company.id'), nullable=True, index=True)
     description = db.Column(db.Text, nullable=False)
 
     # Détails du poste
@@ -31,7 +37,9 @@ class Job(db.Model):
 
     # Métadonnées
     application_link = db.Column(db.String(255))
-    source_url = db.Column(db.String(255))
+    source_url = db.Column(db.String(255), index=True, unique=True)
+    source = db.Column(db.String(50))  # Site d'origine (Indeed, LinkedIn...)
+    enriched_date = db.Column(db.DateTime, nullable=True)  # Description complète récupérée sur la page de l'offre
     posted_date = db.Column(db.DateTime, default=datetime.utcnow)
     scraped_date = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -59,10 +67,19 @@ class Job(db.Model):
     # Utiliser nullable=True pour que les colonnes soient optionnelles
     fraud_probability = db.Column(db.Float, default=0.0, nullable=True)
     fraud_indicators = db.Column(db.Text, nullable=True)  # Stocké en JSON
+    # 'pending' tant que l'analyse asynchrone n'a pas été faite, 'scoring' pendant
+    # l'analyse, 'scored' ensuite ('failed' après plusieurs échecs, voir background_scorer.py)
+    fraud_status = db.Column(db.String(20), default='scored', nullable=True, index=True)
+    # Jeton du service d'analyse qui traite l'offre (voir background_scorer.py)
+    fraud_claim = db.Column(db.String(32), nullable=True)
+    # Fin de la réservation en cours ou date de la prochaine tentative après un échec
+    fraud_retry_at = db.Column(db.DateTime, nullable=True)
+    fraud_attempts = db.Column(db.Integer, default=0, nullable=True)
 
     # Relations
     skills = db.relationship('Skill', secondary=job_skills, lazy='subquery',
                            backref=db.backref('jobs', lazy=True))
+    company = db.relationship(Company, backref=db.backref('jobs', lazy=True))
 
     def __repr__(self):
         return f"Job('{self.title}', '{self.company_name}')"
@@ -99,6 +116,11 @@ class Job(db.Model):
         else:
             self.fraud_indicators = json.dumps(indicators)
 
+    @property
+    def is_fraud_pending(self):
+        """Indique si l'analyse de fraude de l'offre est encore en attente"""
+        return getattr(self, 'fraud_status', None) in ('pending', 'scoring')
+
     def get_fraud_risk_level(self):
         """
         Détermine le niveau de risque de fraude en fonction de la probabilité.
@@ -108,6 +130,9 @@ class Job(db.Model):
         """
         # Vérifier si l'attribut existe (pour la compatibilité avec les anciennes bases de données)
         if not hasattr(self, 'fraud_probability') or self.fraud_probability is None:
+            # Offre pas encore analysée par le service d'arrière-plan
+            if self.is_fraud_pending:
+                return "Analyse en cours", "secondary"
             return "Inconnu", "secondary"
 
         if self.fraud_probability < 0.2:
@@ -0,0 +1,75 @@
+from datetime import datetime
+import json
+from app import db
+
+class SalaryStats(db.Model):
+    """Distribution approchée des salaires par famille de postes et par lieu."""
+    __table_args__ = (
+        db.UniqueConstraint('title_family', 'location_key', name='uq_salary_stats_key'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+
+    # Clé d'agrégation ('*' pour toutes les localisations)
+    title_family = db.Column(db.String(100), nullable=False)
+    location_key = db.Column(db.String(100), nullable=False)
+
+    # Esquisse de quantiles (intervalles logarithmiques), stockée en JSON
+    count = db.Column(db.Integer, default=0, nullable=False)
+    sketch = db.Column(db.Text, nullable=False, default='{}')
+
+    # Percentiles précalculés
+    p50 = db.Column(db.Float)
+    p90 = db.Column(db.Float)
+
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f"SalaryStats('{self.title_family}', '{self.location_key}', {self.count})"
+
+    @staticmethod
+    def decode_sketch(sketch):
+        """
+        Décode les compteurs d'une esquisse stockée en JSON.
+
+        Args:
+            sketch (str): Esquisse en JSON
+
+        Returns:
+            dict: Dictionnaire {indice d'intervalle: nombre de salaires}
+        """
+        try:
+            return {int(k): v for k, v in json.loads(sketch or '{}').items()}
+        except ValueError:
+            return {}
+
+    @staticmethod
+    def encode_sketch(buckets):
+        """
+        Encode les compteurs d'une esquisse en JSON.
+
+        Args:
+            buckets (dict): Dictionnaire {indice d'intervalle: nombre de salaires}
+
+        Returns:
+            str: Esquisse en JSON
+        """
+        return json.dumps({str(k): v for k, v in sorted(buckets.items())})
+
+    def get_sketch(self):
+        """
+        Récupère les compteurs de l'esquisse.
+
+        Returns:
+            dict: Dictionnaire {indice d'intervalle: nombre de salaires}
+        """
+        return self.decode_sketch(self.sketch)
+
+    def set_sketch(self, buckets):
+        """
+        Définit les compteurs de l'esquisse.
+
+        Args:
+            buckets (dict): Dictionnaire {indice d'intervalle: nombre de salaires}
+        """
+        self.sketch = self.encode_sketch(buckets)
@@ -0,0 +1,80 @@
+from datetime import datetime
+import json
+import uuid
+from app import db
+
+class ScrapeTask(db.Model):
+    """Tâche de scraping exécutée en arrière-plan (file d'attente persistante)."""
+
+    # Identifiant communiqué au client pour le suivi de la tâche
+    id = db.Column(db.String(32), primary_key=True, default=lambda: uuid.uuid4().hex)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+
+    # Critères de recherche
+    search_query = db.Column(db.String(200))
+    location_filter = db.Column(db.String(100))
+
+    # État : queued, running, done, failed
+    status = db.Column(db.String(20), default='queued', nullable=False, index=True)
+
+    # Avancement par source, stocké en JSON : {source: {'state': ..., 'found': int}}
+    progress = db.Column(db.Text, nullable=False, default='{}')
+    new_jobs_count = db.Column(db.Integer, default=0, nullable=False)
+    error = db.Column(db.Text)
+
+    # Métadonnées
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    # Dernier signe de vie d'une tâche en cours (une tâche silencieuse est considérée comme interrompue)
+    updated_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    def __repr__(self):
+        return f"ScrapeTask('{self.id}', '{self.search_query}', '{self.status}')"
+
+    @property
+    def finished(self):
+        """Indique si la tâche est terminée (avec ou sans erreur)."""
+        return self.status in ('done', 'failed')
+
+    def get_progress(self):
+        """
+        Récupère l'avancement par source.
+
+        Returns:
+            dict: {source: {'state': str, 'found': int}}
+        """
+        try:
+            return json.loads(self.progress or '{}')
+        except ValueError:
+            return {}
+
+    def set_progress(self, progress):
+        """
+        Définit l'avancement par source.
+
+        Args:
+            progress (dict): {source: {'state': str, 'found': int}}
+        """
+        self.progress = json.dumps(progress)
+
+    def to_dict(self):
+        """
+        Convertit la tâche en dictionnaire pour l'API de suivi.
+
+        Returns:
+            dict: État de la tâche
+        """
+        return {
+            'id': self.id,
+            'query': self.search_query,
+            'location': self.location_filter,
+            'status': self.status,
+            'sources': self.get_progress(),
+            'new_jobs_count': self.new_jobs_count,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
@@ -1,10 +1,12 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, stream_with_context, jsonify
 from flask_login import login_required, current_user
 from app import db
 from app.models.job import Job
 from app.models.search_history import SearchHistory
-from app.services.scraper_api import scrape_jobs
+from app.models.scrape_task import ScrapeTask
+from app.services.scrape_tasks import scrape_task_runner
 from app.services.job_matcher import match_jobs_to_profile
+from app.services.fraud_detection.bulk_check import detect_format, stream_results
 
 jobs = Blueprint('jobs', __name__)
 
@@ -56,6 +58,8 @@ def job_list():
         job_query = job_query.filter((Job.experience_required <= experience_max) | (Job.experience_required.is_(None)))
 
     # Filtrage par risque de fraude (si la colonne existe)
+    # Les offres en attente d'analyse (fraud_probability NULL) sont exclues
+    # par ces filtres tant que le service d'arrière-plan ne les a pas analysées
     try:
         if hasattr(Job, 'fraud_probability'):
             if fraud_max is not None:
@@ -179,20 +183,47 @@ def refresh_jobs():
     if not query and not location:
         flash('Veuillez spécifier des termes de recherche pour trouver des offres d\'emploi réelles.', 'info')
         return redirect(url_for('jobs.job_list'))
-    else:
-        # Lancer le scraping avec les paramètres fournis
-        try:
-            flash(f'Recherche d\'offres d\'emploi réelles pour "{query}" à "{location}" en cours... Cette opération peut prendre quelques instants.', 'info')
 
-            print(f"Scraping en temps réel pour '{query}' à '{location}'...")
-            new_jobs_count = scrape_jobs(query, location)
+    # Le scraping est exécuté en arrière-plan : la requête rend la main immédiatement
+    user_id = current_user.id if current_user.is_authenticated else None
+    task = scrape_task_runner.submit(query, location, user_id)
+
+    return redirect(url_for('jobs.refresh_status', task_id=task.id))
+
+@jobs.route('/jobs/refresh/<task_id>')
+def refresh_status(task_id):
+    # Page de suivi d'un rafraîchissement (interroge l'API de statut)
+    task = ScrapeTask.query.get_or_404(task_id)
+    if task.status == 'done':
+        return redirect(url_for('jobs.refresh_results', task_id=task.id))
+
+    return render_template('jobs/refresh_status.html', task=task)
+
+@jobs.route('/jobs/refresh/<task_id>/status')
+def refresh_status_api(task_id):
+    # État de la tâche et avancement par source, au format JSON
+    task = ScrapeTask.query.get_or_404(task_id)
+    status = task.to_dict()
+    if task.status == 'done':
+        status['results_url'] = url_for('jobs.refresh_results', task_id=task.id)
+
+    return jsonify(status)
 
-            if new_jobs_count > 0:
-                flash(f'{new_jobs_count} nouvelles offres d\'emploi réelles ont été scrapées pour "{query}" à "{location}".', 'success')
-            else:
-                flash(f'Aucune nouvelle offre d\'emploi trouvée pour "{query}" à "{location}". Essayez avec d\'autres termes de recherche ou vérifiez les offres existantes.', 'warning')
-        except Exception as e:
-            flash(f'Erreur lors du scraping des offres: {str(e)}', 'danger')
+@jobs.route('/jobs/refresh/<task_id>/results')
+def refresh_results(task_id):
+    # Redirection vers les offres une fois la tâche terminée
+    task = ScrapeTask.query.get_or_404(task_id)
+    query, location = task.search_query, task.location_filter
+
+    if not task.finished:
+        return redirect(url_for('jobs.refresh_status', task_id=task.id))
+
+    if task.status == 'failed':
+        flash(f'Erreur lors du scraping des offres: {task.error}', 'danger')
+    elif task.new_jobs_count > 0:
+        flash(f'{task.new_jobs_count} nouvelles offres d\'emploi réelles ont été scrapées pour "{query}" à "{location}".', 'success')
+    else:
+        flash(f'Aucune nouvelle offre d\'emploi trouvée pour "{query}" à "{location}". Essayez avec d\'autres termes de recherche ou vérifiez les offres existantes.', 'warning')
 
     return redirect(url_for('jobs.job_list', query=query, location=location))
 
@@ -226,3 +257,28 @@ def match_jobs():
     return render_template('jobs/match.html',
                           jobs=jobs_list,
                           job_scores=job_scores)
+
+@jobs.route('/jobs/fraud-check', methods=['GET', 'POST'])
+@login_required
+def fraud_check():
+    # Analyse de fraude en masse d'un fichier d'offres (CSV ou NDJSON)
+    if request.method == 'GET':
+        return render_template('jobs/fraud_check.html')
+
+    postings_file = request.files.get('postings')
+    input_format = detect_format(postings_file.filename) if postings_file else None
+    if not input_format:
+        flash('Veuillez sélectionner un fichier CSV ou NDJSON au format fake_job_postings.csv.', 'danger')
+        return redirect(url_for('jobs.fraud_check'))
+
+    output_format = 'ndjson' if request.form.get('output_format') == 'ndjson' else 'csv'
+    mimetype = 'application/x-ndjson' if output_format == 'ndjson' else 'text/csv'
+    filename = f"fraud_check.{output_format}"
+
+    # Les résultats sont envoyés bloc par bloc pendant la lecture du fichier
+    # (le fichier reçu reste ouvert grâce à stream_with_context)
+    return Response(
+        stream_with_context(stream_results(postings_file.stream, input_format, output_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
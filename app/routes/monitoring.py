@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+from flask import Blueprint, jsonify, request
+from flask_login import login_required
+from app.models.fraud_score_stats import FraudScoreStats
+from app.services.fraud_detection.drift_monitor import drift_monitor, drift_report
+from app.services.scraper.http_cache import http_cache
+from app.services.scraper.circuit_breaker import circuit_breaker
+from app.services.scraper.metrics import scrape_metrics
+
+monitoring = Blueprint('monitoring', __name__)
+
+@monitoring.route('/monitoring/fraud-drift')
+@login_required
+def fraud_drift():
+    # Paramètres de la période analysée
+    days = request.args.get('days', 7, type=int)
+    source = request.args.get('source', '')
+    model_version = request.args.get('model_version', '')
+
+    # Écrire les agrégats en attente pour que le rapport soit à jour
+    drift_monitor.flush()
+
+    # Lecture de la seule table d'agrégats (quelques lignes par jour et par source)
+    since = datetime.utcnow().date() - timedelta(days=max(days, 1) - 1)
+    stats_query = FraudScoreStats.query.filter(FraudScoreStats.day >= since)
+    if source:
+        stats_query = stats_query.filter(FraudScoreStats.source == source)
+    if model_version:
+        stats_query = stats_query.filter(FraudScoreStats.model_version == model_version)
+
+    rows = stats_query.order_by(FraudScoreStats.day.asc()).all()
+
+    return jsonify({
+        'since': since.isoformat(),
+        'series': drift_report(rows)
+    })
+
+@monitoring.route('/monitoring/scraper-cache')
+@login_required
+def scraper_cache():
+    # Compteurs du cache HTTP des scrapers depuis le démarrage du processus
+    return jsonify(http_cache.stats())
+
+@monitoring.route('/monitoring/scraper-circuits')
+@login_required
+def scraper_circuits():
+    # État des disjoncteurs par source (partagé par tous les workers)
+    return jsonify(circuit_breaker.states())
+
+@monitoring.route('/monitoring/scraper-metrics')
+@login_required
+def scraper_metrics():
+    # Durées par étape et compteurs par source depuis le démarrage du processus
+    return jsonify(scrape_metrics.snapshot())
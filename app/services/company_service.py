@@ -0,0 +1,192 @@
+"""
+Rattachement des offres à leur entreprise canonique.
+
+Les sites écrivent le même employeur de plusieurs façons ("CAPGEMINI",
+"Capgemini", "Cap Gemini SAS") et chaque offre en gardait sa propre copie.
+Chaque variante de nom est désormais rattachée une fois pour toutes à une
+entreprise canonique (table company, variantes dans company_alias), qui
+porte le nom affiché et le logo. Les variantes déjà vues sont gardées en
+mémoire (LRU borné) : la résolution d'un employeur récurrent ne coûte
+alors aucune requête.
+"""
+
+import re
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.models.company import Company, CompanyAlias
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Nombre de variantes de noms gardées en mémoire
+CACHE_SIZE = 10000
+
+# Logos génériques (logo du site ou logo par défaut) qui ne représentent pas l'entreprise
+GENERIC_LOGOS = (
+    'https://www.pole-emploi.fr/themes/custom/pef/logo.svg',
+    'https://logo.clearbit.com/company.com'
+)
+
+
+def company_key(name):
+    """
+    Calcule la clé de rapprochement d'un nom d'entreprise.
+
+    Args:
+        name (str): Nom d'entreprise nettoyé
+
+    Returns:
+        str: Nom sans accents, en minuscules, réduit aux lettres et chiffres
+    """
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    return re.sub(r'[\W_]+', '', name.casefold())[:100]
+
+
+class CompanyResolver:
+    """
+    Résolution des variantes de noms vers les entreprises canoniques, avec cache LRU.
+    """
+
+    def __init__(self, cache_size=CACHE_SIZE):
+        """
+        Args:
+            cache_size (int): Nombre de variantes gardées en mémoire
+        """
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _cached(self, raw_name):
+        """Retourne l'entreprise d'une variante gardée en mémoire, ou None."""
+        with self._lock:
+            entry = self._cache.get(raw_name)
+            if entry is not None:
+                self._cache.move_to_end(raw_name)
+            return entry
+
+    def _remember(self, raw_name, entry):
+        """Garde en mémoire l'entreprise d'une variante en évinçant la plus ancienne si besoin."""
+        with self._lock:
+            self._cache[raw_name] = entry
+            self._cache.move_to_end(raw_name)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache (ex: après une fusion d'entreprises en base)."""
+        with self._lock:
+            self._cache.clear()
+
+    def resolve(self, raw_name, logo=None):
+        """
+        Retourne l'entreprise canonique d'une variante de nom.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Args:
+            raw_name (str): Nom de l'entreprise extrait de l'offre (nettoyé par clean_company_name)
+            logo (str, optional): Logo proposé par le site
+
+        Returns:
+            tuple: (identifiant, nom affiché, logo) de l'entreprise
+        """
+        return self.resolve_many({raw_name: logo})[raw_name]
+
+    def resolve_many(self, companies):
+        """
+        Retourne les entreprises canoniques d'un lot de variantes, en créant les manquantes.
+        Doit être appelé dans un contexte d'application Flask ; les créations sont validées.
+
+        Args:
+            companies (dict): {nom extrait de l'offre, nettoyé: logo proposé ou None}
+
+        Returns:
+            dict: {nom extrait: (identifiant, nom affiché, logo)}
+        """
+        resolved = {}
+        missing = {}
+        for raw_name, logo in companies.items():
+            entry = self._cached(raw_name)
+            if entry is not None:
+                resolved[raw_name] = entry
+            else:
+                missing[raw_name] = logo
+        if not missing:
+            return resolved
+
+        try:
+            found = self._load_or_create(missing)
+        except IntegrityError:
+            # Un autre processus a créé la même entreprise entre-temps : relire la base
+            db.session.rollback()
+            found = self._load_or_create(missing)
+
+        for raw_name, entry in found.items():
+            self._remember(raw_name, entry)
+            resolved[raw_name] = entry
+        return resolved
+
+    def _load_or_create(self, companies):
+        """
+        Charge ou crée en base les entreprises d'un lot de variantes inconnues du cache.
+
+        Args:
+            companies (dict): {nom extrait: logo proposé ou None}
+
+        Returns:
+            dict: {nom extrait: (identifiant, nom affiché, logo)}
+        """
+        raw_names = list(companies)
+        aliases = {
+            alias.raw_name: alias.company_id
+            for alias in CompanyAlias.query.filter(CompanyAlias.raw_name.in_(raw_names)).all()
+        }
+
+        # Variantes jamais vues : rapprochement par clé avec les entreprises existantes
+        keys = {raw_name: company_key(raw_name) or raw_name.lower() for raw_name in raw_names if raw_name not in aliases}
+        by_key = {
+            company.key: company
+            for company in Company.query.filter(Company.key.in_(set(keys.values()))).all()
+        } if keys else {}
+        by_id = {
+            company.id: company
+            for company in Company.query.filter(Company.id.in_(set(aliases.values()))).all()
+        } if aliases else {}
+
+        found = {}
+        for raw_name in raw_names:
+            logo = companies[raw_name]
+            if raw_name in aliases:
+                company = by_id[aliases[raw_name]]
+            else:
+                company = by_key.get(keys[raw_name])
+                if company is None:
+                    company = Company(name=raw_name[:100], key=keys[raw_name])
+                    by_key[company.key] = company
+                    db.session.add(company)
+                db.session.add(CompanyAlias(raw_name=raw_name[:200], company=company))
+
+            if logo and not company.logo and logo not in GENERIC_LOGOS:
+                company.logo = logo
+            found[raw_name] = company
+
+        # Identifiants lus avant la validation, qui expire les objets chargés
+        created = sum(isinstance(obj, Company) for obj in db.session.new)
+        pending = bool(db.session.new or db.session.dirty)
+        if pending:
+            db.session.flush()
+        entries = {raw_name: (company.id, company.name, company.logo) for raw_name, company in found.items()}
+        if pending:
+            db.session.commit()
+        if created:
+            logger.info(f"Ajout de {created} nouvelles entreprises")
+        return entries
+
+# Instance globale utilisée par les sauvegardes d'offres
+company_resolver = CompanyResolver()
@@ -0,0 +1,339 @@
+"""
+Crawler planifié alimenté par les recherches populaires.
+
+À chaque cycle, les couples (terme de recherche, lieu) de SearchHistory sont
+classés par popularité et récence, puis les recherches dont les résultats ne
+sont plus frais sont scrapées via ScraperManager (par l'intermédiaire du
+pool de tâches, pour partager la file et l'historique des ScrapeTask avec
+/jobs/refresh). Le nombre de pages demandées par cycle est borné par un
+budget global, qui compte les pages de résultats et les pages d'offres
+récupérées par l'enrichissement : les recherches les plus demandées sont
+scrapées en profondeur, les suivantes avec moins de pages, et le reste
+attend le cycle suivant. Le plan est établi sur une estimation majorante ;
+pendant le cycle, les pages réellement récupérées (métriques du scraping)
+sont décomptées du budget avant chaque recherche.
+
+Utilisation :
+    python -m app.services.crawler_daemon [--once]
+"""
+
+import time
+import logging
+import argparse
+from datetime import datetime, timedelta
+
+from sqlalchemy import func
+
+from app import create_app, db
+from app.models.search_history import SearchHistory
+from app.models.scrape_task import ScrapeTask
+from app.config.scraper_config import SCRAPER_CONFIG, ENRICHMENT_CONFIG
+from app.services.scrape_tasks import scrape_task_runner
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Délai entre deux cycles (secondes)
+INTERVAL = 1800
+
+# Nombre maximal de pages demandées par cycle (résultats et pages d'offres), toutes sources confondues
+PAGE_BUDGET = 1200
+
+# Âge au-delà duquel les résultats d'une recherche sont rafraîchis (secondes)
+MAX_AGE = 3600
+
+# Fenêtre d'historique prise en compte (jours) et demi-vie de la popularité (heures)
+HISTORY_DAYS = 14
+HALF_LIFE_HOURS = 48
+
+
+def _search_key(query, location):
+    """
+    Normalise un couple (terme de recherche, lieu) pour le regroupement.
+
+    Args:
+        query (str): Terme de recherche
+        location (str): Lieu de recherche
+
+    Returns:
+        tuple: (terme, lieu) en minuscules, sans espaces superflus
+    """
+    return (query or '').strip().lower(), (location or '').strip().lower()
+
+
+def rank_searches(history_days=HISTORY_DAYS, half_life_hours=HALF_LIFE_HOURS, limit=100):
+    """
+    Classe les recherches de l'historique par popularité et récence.
+    Doit être appelé dans un contexte d'application Flask.
+
+    Le score d'une recherche est son nombre d'occurrences sur la fenêtre,
+    atténué de moitié toutes les half_life_hours depuis sa dernière occurrence.
+
+    Args:
+        history_days (int): Fenêtre d'historique prise en compte (jours)
+        half_life_hours (float): Demi-vie de la popularité (heures)
+        limit (int): Nombre maximal de recherches retournées
+
+    Returns:
+        list: Tuples (terme, lieu, score) triés par score décroissant
+    """
+    now = datetime.utcnow()
+    query_key = func.lower(func.trim(func.coalesce(SearchHistory.search_query, '')))
+    location_key = func.lower(func.trim(func.coalesce(SearchHistory.location_filter, '')))
+
+    # Agrégation en base : une ligne par recherche distincte
+    rows = db.session.query(
+        query_key, location_key,
+        func.count(SearchHistory.id), func.max(SearchHistory.search_date)
+    ).filter(
+        SearchHistory.search_date >= now - timedelta(days=history_days)
+    ).group_by(query_key, location_key).all()
+
+    ranked = []
+    for query, location, count, last_search in rows:
+        if not query and not location:
+            continue
+        age_hours = max((now - last_search).total_seconds() / 3600, 0) if last_search else history_days * 24
+        ranked.append((query, location, count * 0.5 ** (age_hours / half_life_hours)))
+
+    ranked.sort(key=lambda item: item[2], reverse=True)
+    return ranked[:limit]
+
+
+def last_crawls():
+    """
+    Retourne la date du dernier scraping réussi de chaque recherche.
+    Doit être appelé dans un contexte d'application Flask.
+
+    Returns:
+        dict: {(terme, lieu): date de fin}
+    """
+    rows = db.session.query(
+        ScrapeTask.search_query, ScrapeTask.location_filter, func.max(ScrapeTask.finished_at)
+    ).filter(ScrapeTask.status == 'done').group_by(
+        ScrapeTask.search_query, ScrapeTask.location_filter
+    ).all()
+
+    crawls = {}
+    for query, location, finished_at in rows:
+        key = _search_key(query, location)
+        if finished_at and (key not in crawls or finished_at > crawls[key]):
+            crawls[key] = finished_at
+    return crawls
+
+
+def page_cost(config):
+    """
+    Estime le nombre de pages demandées pour une page de résultats d'une source :
+    la page elle-même et, si l'enrichissement est actif, la page de chacune de ses offres.
+    Majorant : les offres déjà enrichies ne sont pas récupérées de nouveau.
+
+    Args:
+        config (dict): Configuration de la source
+
+    Returns:
+        int: Nombre de pages
+    """
+    cost = 1
+    if ENRICHMENT_CONFIG.get('enabled') and config.get('selectors', {}).get('detail_description'):
+        cost += config.get('pagination', {}).get('page_size', 0)
+    return cost
+
+
+def depth_cost():
+    """
+    Estime le nombre de pages demandées pour une page de résultats sur chaque source.
+
+    Returns:
+        int: Nombre de pages
+    """
+    return sum(page_cost(config) for config in SCRAPER_CONFIG.values())
+
+
+def pages_fetched(summary):
+    """
+    Compte les pages réellement récupérées par un scraping (résultats et pages d'offres).
+
+    Args:
+        summary (dict): Métriques du scraping par source (voir ScrapeMetrics.snapshot)
+
+    Returns:
+        int: Nombre de pages
+    """
+    return sum(
+        source_metrics['counters'].get('pages', 0) + source_metrics['counters'].get('detail_pages', 0)
+        for source_metrics in summary.values()
+    )
+
+
+def pages_per_search(depth=None):
+    """
+    Estime le nombre de pages demandées pour une recherche sur toutes les sources
+    (pages de résultats et pages d'offres).
+
+    Args:
+        depth (int, optional): Nombre maximal de pages par source. Par défaut, celui de la configuration.
+
+    Returns:
+        int: Nombre de pages
+    """
+    total = 0
+    for config in SCRAPER_CONFIG.values():
+        max_pages = config.get('pagination', {}).get('max_pages', 1)
+        total += (min(depth, max_pages) if depth else max_pages) * page_cost(config)
+    return total
+
+
+def plan_crawls(ranked, crawls, page_budget=PAGE_BUDGET, max_age=MAX_AGE):
+    """
+    Choisit les recherches à scraper pendant le cycle et leur profondeur.
+
+    Args:
+        ranked (list): Recherches classées (terme, lieu, score)
+        crawls (dict): Date du dernier scraping de chaque recherche
+        page_budget (int): Nombre maximal de pages pour le cycle
+        max_age (int): Âge au-delà duquel une recherche est rafraîchie (secondes)
+
+    Returns:
+        list: Tuples (terme, lieu, profondeur) ; profondeur None pour la profondeur configurée
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=max_age)
+    full_cost = pages_per_search()
+    # Coût d'une page de résultats sur chaque source
+    cost = depth_cost()
+
+    plan = []
+    remaining = page_budget
+    for query, location, _ in ranked:
+        last_crawl = crawls.get((query, location))
+        if last_crawl and last_crawl > stale_before:
+            continue
+
+        if remaining >= full_cost:
+            depth = None
+        else:
+            # Budget insuffisant pour la profondeur complète : moins de pages par source
+            depth = remaining // cost
+            if depth < 1:
+                break
+
+        plan.append((query, location, depth))
+        remaining -= pages_per_search(depth)
+
+    return plan
+
+
+class CrawlerDaemon:
+    """
+    Boucle de scraping planifié des recherches populaires.
+    """
+
+    def __init__(self, interval=INTERVAL, page_budget=PAGE_BUDGET, max_age=MAX_AGE,
+                 history_days=HISTORY_DAYS, half_life_hours=HALF_LIFE_HOURS):
+        """
+        Args:
+            interval (int): Délai entre deux cycles (secondes)
+            page_budget (int): Nombre maximal de pages par cycle (résultats et pages d'offres)
+            max_age (int): Âge au-delà duquel une recherche est rafraîchie (secondes)
+            history_days (int): Fenêtre d'historique prise en compte (jours)
+            half_life_hours (float): Demi-vie de la popularité (heures)
+        """
+        self.interval = interval
+        self.page_budget = page_budget
+        self.max_age = max_age
+        self.history_days = history_days
+        self.half_life_hours = half_life_hours
+
+    @classmethod
+    def from_config(cls, config):
+        """
+        Crée le crawler à partir de la configuration de l'application.
+
+        Args:
+            config (dict): Configuration Flask
+
+        Returns:
+            CrawlerDaemon: Crawler configuré
+        """
+        return cls(
+            interval=config.get('CRAWLER_INTERVAL', INTERVAL),
+            page_budget=config.get('CRAWLER_PAGE_BUDGET', PAGE_BUDGET),
+            max_age=config.get('CRAWLER_MAX_AGE', MAX_AGE),
+            history_days=config.get('CRAWLER_HISTORY_DAYS', HISTORY_DAYS),
+            half_life_hours=config.get('CRAWLER_HALF_LIFE_HOURS', HALF_LIFE_HOURS)
+        )
+
+    def run_cycle(self):
+        """
+        Exécute un cycle : classement, planification puis scraping des recherches retenues.
+        Les pages récupérées par chaque recherche sont décomptées du budget : une recherche
+        dont l'estimation dépasse le budget restant est scrapée avec moins de pages, et
+        le cycle s'arrête quand le budget est épuisé.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        ranked = rank_searches(self.history_days, self.half_life_hours)
+        plan = plan_crawls(ranked, last_crawls(), self.page_budget, self.max_age)
+        logger.info(f"Cycle du crawler : {len(plan)} recherche(s) à rafraîchir sur {len(ranked)}")
+
+        new_jobs_count = 0
+        remaining = self.page_budget
+        for query, location, depth in plan:
+            if remaining < pages_per_search(depth):
+                # Pages récupérées au-delà de l'estimation du plan : moins de pages par source
+                depth = remaining // depth_cost()
+                if depth < 1:
+                    logger.info(f"Budget de {self.page_budget} pages épuisé, recherches restantes reportées")
+                    break
+
+            summary = {}
+            task = scrape_task_runner.run(query, location, max_pages=depth, summary=summary)
+            remaining -= pages_fetched(summary)
+            if task is None:
+                logger.info(f"Recherche '{query}' à '{location}' déjà en cours, ignorée")
+                continue
+            if task.status == 'done':
+                new_jobs_count += task.new_jobs_count
+        return new_jobs_count
+
+    def run_forever(self, app):
+        """
+        Exécute les cycles indéfiniment.
+
+        Args:
+            app (Flask): Application utilisée pour le contexte de base de données
+        """
+        while True:
+            started = time.monotonic()
+            try:
+                with app.app_context():
+                    new_jobs_count = self.run_cycle()
+                logger.info(f"Cycle du crawler terminé : {new_jobs_count} nouvelle(s) offre(s)")
+            except Exception as e:
+                logger.error(f"Erreur lors du cycle du crawler: {str(e)}")
+            time.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+
+def main():
+    """
+    Point d'entrée : lance le crawler planifié.
+    """
+    parser = argparse.ArgumentParser(description="Scraping planifié des recherches populaires")
+    parser.add_argument('--once', action='store_true', help="Exécuter un seul cycle puis quitter")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    app = create_app()
+    daemon = CrawlerDaemon.from_config(app.config)
+
+    if args.once:
+        with app.app_context():
+            daemon.run_cycle()
+    else:
+        daemon.run_forever(app)
+
+
+if __name__ == "__main__":
+    main()
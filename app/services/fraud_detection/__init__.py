@@ -2,6 +2,7 @@
 Package de détection de fraude pour les offres d'emploi.
 """
 
-from .fraud_detector import predict_job_fraud, fraud_detector
+from .fraud_detector import predict_job_fraud, predict_jobs_fraud, fraud_detector
+from .contact_extractor import extract_contacts, find_suspicious_contacts
 
-__all__ = ['predict_job_fraud', 'fraud_detector']
+__all__ = ['predict_job_fraud', 'predict_jobs_fraud', 'fraud_detector', 'extract_contacts', 'find_suspicious_contacts']
@@ -0,0 +1,273 @@
+"""
+Analyse de fraude asynchrone des offres enregistrées.
+
+Les offres sont insérées avec fraud_status='pending' dès le scraping ; un
+thread d'arrière-plan récupère les offres en attente par lots, les analyse
+avec un seul appel au modèle par lot et enregistre fraud_probability et
+fraud_indicators. Le temps de réponse de /jobs/refresh ne dépend plus du
+modèle de détection.
+
+Plusieurs processus peuvent analyser les offres en même temps :
+- chaque lot est d'abord réservé (fraud_status='scoring', jeton fraud_claim,
+  réservation valable CLAIM_TIMEOUT secondes pour reprendre les lots d'un
+  processus arrêté en cours d'analyse) ;
+- le résultat n'est écrit que si l'offre porte toujours le jeton : une offre
+  remise en attente par le scraper entre-temps (contenu modifié) est
+  analysée de nouveau au lieu de recevoir le score de l'ancien contenu ;
+- une offre dont l'analyse échoue est reportée (délai doublé à chaque
+  échec) puis abandonnée (fraud_status='failed') après MAX_ATTEMPTS échecs.
+"""
+
+import json
+import uuid
+import threading
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, or_
+
+from app import db
+from app.models.job import Job
+from .fraud_detector import predict_jobs_fraud
+
+# Nombre d'offres analysées par lot
+BATCH_SIZE = 100
+
+# Délai maximal entre deux vérifications des offres en attente (secondes)
+POLL_INTERVAL = 30
+
+# Durée d'une réservation avant qu'un autre processus puisse reprendre l'offre (secondes)
+CLAIM_TIMEOUT = 300
+
+# Nombre d'échecs d'analyse avant d'abandonner une offre
+MAX_ATTEMPTS = 5
+
+# Premier délai avant une nouvelle tentative après un échec (secondes)
+RETRY_DELAY = 60
+
+
+def job_to_dict(job):
+    """
+    Convertit une offre enregistrée en dictionnaire pour le détecteur de fraude.
+
+    Args:
+        job (Job): Offre d'emploi
+
+    Returns:
+        dict: Dictionnaire d'offre
+    """
+    return {
+        'title': job.title,
+        'company_name': job.company_name,
+        'description': job.description,
+        'location': job.location,
+        'salary': job.salary,
+        'work_type': job.work_type,
+        'education_required': job.education_required,
+        'experience_required': job.experience_required,
+        'benefits': job.benefits,
+        'application_link': job.application_link,
+        'source_url': job.source_url,
+        'source': job.source
+    }
+
+
+class BackgroundFraudScorer:
+    """
+    Thread d'arrière-plan qui analyse les offres en attente.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, poll_interval=POLL_INTERVAL):
+        """
+        Initialise le service sans démarrer le thread.
+
+        Args:
+            batch_size (int): Nombre d'offres analysées par lot
+            poll_interval (int): Délai maximal entre deux vérifications (secondes)
+        """
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self._app = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, app):
+        """
+        Démarre le thread d'analyse (sans effet s'il est déjà démarré).
+
+        Args:
+            app (Flask): Application utilisée pour le contexte de base de données
+        """
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._app = app
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='fraud-scorer', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5):
+        """
+        Arrête le thread d'analyse.
+
+        Args:
+            timeout (float): Délai d'attente maximal (secondes)
+        """
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        """Indique si le thread d'analyse est actif."""
+        return bool(self._thread and self._thread.is_alive())
+
+    def notify(self):
+        """
+        Signale que de nouvelles offres sont en attente d'analyse.
+        """
+        self._wake.set()
+
+    def _run(self):
+        """
+        Boucle principale : analyse les offres en attente à chaque signal ou délai écoulé.
+        """
+        while not self._stop.is_set():
+            try:
+                with self._app.app_context():
+                    self.drain()
+            except Exception as e:
+                print(f"Erreur lors de l'analyse de fraude en arrière-plan: {str(e)}")
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+
+    def drain(self, max_batches=None):
+        """
+        Analyse les offres en attente par lots jusqu'à ce qu'il n'en reste plus.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Args:
+            max_batches (int, optional): Nombre maximal de lots à traiter
+
+        Returns:
+            int: Nombre d'offres analysées
+        """
+        scored = 0
+        batches = 0
+        while not self._stop.is_set() and (max_batches is None or batches < max_batches):
+            claim, jobs = self._claim()
+            if not jobs:
+                break
+
+            scored += self._score(claim, jobs)
+            batches += 1
+
+        return scored
+
+    @staticmethod
+    def _claimable(now):
+        """Condition SQL des offres à analyser : en attente, ou réservation expirée."""
+        return or_(
+            and_(Job.fraud_status == 'pending', or_(Job.fraud_retry_at.is_(None), Job.fraud_retry_at <= now)),
+            and_(Job.fraud_status == 'scoring', Job.fraud_retry_at <= now)
+        )
+
+    def _claim(self):
+        """
+        Réserve un lot d'offres à analyser.
+        Une offre réservée entre-temps par un autre processus n'est pas reprise.
+
+        Returns:
+            tuple: (jeton de la réservation, offres réservées)
+        """
+        now = datetime.utcnow()
+        claim = uuid.uuid4().hex
+        candidates = [
+            job_id for job_id, in Job.query.with_entities(Job.id)
+            .filter(self._claimable(now)).order_by(Job.id.asc()).limit(self.batch_size).all()
+        ]
+        if not candidates:
+            return claim, []
+
+        try:
+            claimed = [
+                job_id for job_id in candidates
+                if Job.query.filter(Job.id == job_id, self._claimable(now)).update({
+                    'fraud_status': 'scoring',
+                    'fraud_claim': claim,
+                    'fraud_retry_at': now + timedelta(seconds=CLAIM_TIMEOUT)
+                }, synchronize_session=False) == 1
+            ]
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if not claimed:
+            return claim, []
+        return claim, Job.query.filter(Job.id.in_(claimed), Job.fraud_claim == claim).all()
+
+    def _score(self, claim, jobs):
+        """
+        Analyse un lot réservé et enregistre les scores des offres encore réservées.
+
+        Args:
+            claim (str): Jeton de la réservation
+            jobs (list): Offres réservées
+
+        Returns:
+            int: Nombre d'offres analysées
+        """
+        try:
+            results = predict_jobs_fraud([job_to_dict(job) for job in jobs])
+            failed = []
+        except Exception as e:
+            print(f"Erreur lors de l'analyse d'un lot de {len(jobs)} offres: {str(e)}")
+            # Analyser les offres une à une pour isoler celles qui échouent
+            results, failed = [], []
+            for job in jobs:
+                try:
+                    results.append(predict_jobs_fraud([job_to_dict(job)])[0])
+                except Exception as job_error:
+                    print(f"Erreur lors de l'analyse de l'offre {job.id}: {str(job_error)}")
+                    results.append(None)
+                    failed.append(job)
+
+        # Les objets chargés ne sont plus utilisés : les écritures sont conditionnées au jeton
+        job_ids = [job.id for job in jobs]
+        attempts = {job.id: job.fraud_attempts or 0 for job in failed}
+        db.session.expunge_all()
+
+        scored = 0
+        try:
+            for job_id, result in zip(job_ids, results):
+                mine = Job.query.filter(Job.id == job_id, Job.fraud_status == 'scoring', Job.fraud_claim == claim)
+                if result is None:
+                    attempt = attempts[job_id] + 1
+                    mine.update({
+                        'fraud_status': 'failed' if attempt >= MAX_ATTEMPTS else 'pending',
+                        'fraud_claim': None,
+                        'fraud_attempts': attempt,
+                        'fraud_retry_at': datetime.utcnow() + timedelta(seconds=RETRY_DELAY * 2 ** (attempt - 1))
+                    }, synchronize_session=False)
+                    continue
+                scored += mine.update({
+                    'fraud_probability': result['fraud_probability'],
+                    'fraud_indicators': json.dumps(result['indicators']) if result.get('indicators') is not None else None,
+                    'fraud_status': 'scored',
+                    'fraud_claim': None,
+                    'fraud_attempts': 0,
+                    'fraud_retry_at': None
+                }, synchronize_session=False)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        return scored
+
+
+# Instance globale utilisée par l'application
+background_scorer = BackgroundFraudScorer()
@@ -0,0 +1,165 @@
+"""
+Analyse de fraude en masse d'un fichier d'offres.
+
+Le fichier (CSV ou NDJSON au format fake_job_postings.csv) est lu par blocs ;
+chaque bloc est analysé avec un seul appel au modèle et les résultats annotés
+sont produits au fur et à mesure. La mémoire utilisée ne dépend que de la
+taille d'un bloc, pas de celle du fichier.
+"""
+
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+
+import pandas as pd
+
+from .fraud_detector import job_from_posting, predict_jobs_fraud
+
+# Nombre d'offres lues et analysées par bloc
+CHUNK_SIZE = 1000
+
+# Formats d'entrée acceptés, par extension de fichier
+INPUT_FORMATS = {
+    '.csv': 'csv',
+    '.ndjson': 'ndjson',
+    '.jsonl': 'ndjson'
+}
+
+# Colonnes du fichier de résultats
+RESULT_FIELDS = ['job_id', 'title', 'location', 'fraud_probability', 'risk_level', 'indicators']
+
+# Source enregistrée par le suivi de dérive pour les analyses en masse
+BULK_SOURCE = 'bulk'
+
+
+def detect_format(filename):
+    """
+    Détermine le format d'un fichier d'offres à partir de son extension.
+
+    Args:
+        filename (str): Nom du fichier
+
+    Returns:
+        str ou None: 'csv', 'ndjson' ou None si le format n'est pas reconnu
+    """
+    return INPUT_FORMATS.get(os.path.splitext(filename or '')[1].lower())
+
+
+def iter_posting_chunks(source, input_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Lit un fichier d'offres par blocs.
+
+    Args:
+        source (str ou file): Chemin ou flux du fichier
+        input_format (str): 'csv' ou 'ndjson'
+        chunk_size (int): Nombre d'offres par bloc
+
+    Yields:
+        list: Offres du bloc (dictionnaires au format fake_job_postings.csv)
+    """
+    if input_format == 'csv':
+        # dtype=str pour conserver les identifiants et fourchettes de salaire tels quels
+        reader = pd.read_csv(source, chunksize=chunk_size, dtype=str)
+    elif input_format == 'ndjson':
+        reader = pd.read_json(source, lines=True, chunksize=chunk_size, dtype=False)
+    else:
+        raise ValueError(f"Format de fichier non supporté: {input_format}")
+
+    for chunk in reader:
+        yield chunk.to_dict('records')
+
+
+def check_posting_chunks(source, input_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Analyse un fichier d'offres bloc par bloc.
+
+    Args:
+        source (str ou file): Chemin ou flux du fichier
+        input_format (str): 'csv' ou 'ndjson'
+        chunk_size (int): Nombre d'offres par bloc
+
+    Yields:
+        list: Résultats du bloc (un dictionnaire par offre, colonnes RESULT_FIELDS)
+    """
+    for postings in iter_posting_chunks(source, input_format, chunk_size):
+        jobs = [job_from_posting(posting) for posting in postings]
+        for job in jobs:
+            job['source'] = BULK_SOURCE
+
+        results = predict_jobs_fraud(jobs)
+        yield [{
+            'job_id': job['job_id'],
+            'title': job['title'],
+            'location': job['location'],
+            'fraud_probability': round(result['fraud_probability'], 4),
+            'risk_level': result['risk_level'],
+            'indicators': [indicator['name'] for indicator in result['indicators']]
+        } for job, result in zip(jobs, results)]
+
+
+def stream_results(source, input_format='csv', output_format='csv', chunk_size=CHUNK_SIZE):
+    """
+    Produit les résultats de l'analyse sous forme de texte, bloc par bloc.
+
+    Args:
+        source (str ou file): Chemin ou flux du fichier
+        input_format (str): 'csv' ou 'ndjson'
+        output_format (str): 'csv' ou 'ndjson'
+        chunk_size (int): Nombre d'offres par bloc
+
+    Yields:
+        str: Portion du fichier de résultats (en-tête puis un bloc de lignes)
+    """
+    if output_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=RESULT_FIELDS, lineterminator='\n')
+        writer.writeheader()
+        yield buffer.getvalue()
+
+        for rows in check_posting_chunks(source, input_format, chunk_size):
+            buffer.seek(0)
+            buffer.truncate()
+            for row in rows:
+                writer.writerow(dict(row, indicators='|'.join(row['indicators'])))
+            yield buffer.getvalue()
+
+    elif output_format == 'ndjson':
+        for rows in check_posting_chunks(source, input_format, chunk_size):
+            yield ''.join(json.dumps(row, ensure_ascii=False) + '\n' for row in rows)
+
+    else:
+        raise ValueError(f"Format de sortie non supporté: {output_format}")
+
+
+def main():
+    """
+    Point d'entrée : analyse un fichier d'offres et écrit les résultats.
+    """
+    parser = argparse.ArgumentParser(description="Analyse de fraude en masse d'un fichier d'offres")
+    parser.add_argument('input', help="Fichier CSV ou NDJSON au format fake_job_postings.csv")
+    parser.add_argument('--input-format', choices=['csv', 'ndjson'],
+                        help="Format du fichier d'entrée (déduit de l'extension par défaut)")
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv', help="Format des résultats")
+    parser.add_argument('--output', help="Fichier de résultats (sortie standard par défaut)")
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+
+    input_format = args.input_format or detect_format(args.input)
+    if input_format is None:
+        parser.error("Format du fichier d'entrée inconnu, utilisez --input-format")
+
+    output = open(args.output, 'w', encoding='utf-8', newline='') if args.output else sys.stdout
+    try:
+        for part in stream_results(args.input, input_format, args.format, args.chunk_size):
+            output.write(part)
+            output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+if __name__ == "__main__":
+    main()
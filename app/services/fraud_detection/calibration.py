@@ -0,0 +1,192 @@
+"""
+Calibration des scores de fraude.
+
+Le score combiné (0.7 * modèle + 0.3 * règles) n'est pas une probabilité.
+Une régression isotonique (ou de Platt) est ajustée hors ligne sur un jeu
+étiqueté au format fake_job_postings.csv, puis exportée sous forme de table
+de correspondance compacte : à l'exécution, calibrer un score revient à une
+simple lecture dans un tableau.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+
+import numpy as np
+
+# Chemin vers la table de calibration exportée
+CALIBRATION_PATH = os.path.join(os.path.dirname(__file__), 'calibration.json')
+
+# Nombre de points de la table (pas de 0.001 sur [0, 1])
+TABLE_SIZE = 1001
+
+# Version de la conversion des offres du jeu étiqueté (job_from_posting).
+# Une table ajustée avec une autre conversion a vu une autre distribution de
+# scores que celle des offres analysées : elle est ignorée et doit être réajustée.
+FEATURES_VERSION = 2
+
+
+class ScoreCalibrator:
+    """
+    Applique une table de calibration chargée à la première utilisation.
+    """
+
+    def __init__(self, path=None):
+        """
+        Initialise le calibrateur sans charger la table.
+
+        Args:
+            path (str, optional): Chemin de la table. Par défaut CALIBRATION_PATH.
+        """
+        self.path = path or CALIBRATION_PATH
+        self._table = None
+        self._model_version = None
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """
+        Charge la table de calibration si elle existe.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, encoding='utf-8') as f:
+                        data = json.load(f)
+                    if data.get('features') != FEATURES_VERSION:
+                        raise ValueError("table ajustée avec une ancienne conversion des offres, à réajuster")
+                    self._table = np.asarray(data['table'], dtype=np.float64)
+                    self._model_version = data.get('model_version')
+                    print(f"Table de calibration chargée depuis {self.path} ({data.get('method')})", file=sys.stderr)
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Erreur lors du chargement de la table de calibration: {str(e)}", file=sys.stderr)
+                self._table = None
+            self._loaded = True
+
+    @property
+    def version(self):
+        """Version du modèle pour laquelle la table a été ajustée (None si aucune table)."""
+        if not self._loaded:
+            self._load()
+        return self._model_version if self._table is not None else None
+
+    def is_available(self, model_version):
+        """
+        Indique si la table correspond à la version du modèle utilisée.
+
+        Args:
+            model_version (str): Version du modèle de détection
+
+        Returns:
+            bool: True si la table peut être appliquée
+        """
+        if not self._loaded:
+            self._load()
+        return self._table is not None and self._model_version in (None, model_version)
+
+    def calibrate(self, scores, model_version):
+        """
+        Convertit des scores combinés en probabilités calibrées.
+
+        Args:
+            scores (float ou array-like): Scores combinés entre 0 et 1
+            model_version (str): Version du modèle ayant produit les scores
+
+        Returns:
+            float ou np.ndarray: Probabilités calibrées (scores inchangés sans table)
+        """
+        if not self.is_available(model_version):
+            return scores
+        indices = np.rint(np.clip(scores, 0.0, 1.0) * (len(self._table) - 1)).astype(np.intp)
+        calibrated = self._table[indices]
+        return float(calibrated) if np.ndim(calibrated) == 0 else calibrated
+
+
+def fit_calibration_table(scores, labels, method='isotonic'):
+    """
+    Ajuste une calibration et l'échantillonne sur TABLE_SIZE points.
+
+    Args:
+        scores (array-like): Scores combinés entre 0 et 1
+        labels (array-like): Étiquettes (1 = frauduleuse)
+        method (str): 'isotonic' ou 'platt'
+
+    Returns:
+        np.ndarray: Probabilités calibrées pour chaque point de la grille
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels, dtype=np.int64)
+    grid = np.linspace(0.0, 1.0, TABLE_SIZE)
+
+    if method == 'isotonic':
+        from sklearn.isotonic import IsotonicRegression
+        regressor = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds='clip')
+        regressor.fit(scores, labels)
+        return regressor.predict(grid)
+
+    if method == 'platt':
+        from sklearn.linear_model import LogisticRegression
+        regressor = LogisticRegression()
+        regressor.fit(scores.reshape(-1, 1), labels)
+        return regressor.predict_proba(grid.reshape(-1, 1))[:, 1]
+
+    raise ValueError(f"Méthode de calibration inconnue: {method}")
+
+
+def export_calibration_table(table, method, model_version, path=None):
+    """
+    Écrit la table de calibration au format JSON.
+
+    Args:
+        table (array-like): Probabilités calibrées sur la grille
+        method (str): Méthode utilisée
+        model_version (str): Version du modèle calibré
+        path (str, optional): Chemin de destination. Par défaut CALIBRATION_PATH.
+    """
+    with open(path or CALIBRATION_PATH, 'w', encoding='utf-8') as f:
+        json.dump({
+            'method': method,
+            'model_version': model_version,
+            'features': FEATURES_VERSION,
+            'table': [round(float(p), 4) for p in table]
+        }, f)
+
+
+def main():
+    """
+    Point d'entrée : ajuste la calibration sur un fichier fake_job_postings.csv.
+    """
+    import pandas as pd
+    from app import create_app
+    from .fraud_detector import fraud_detector, job_from_posting
+
+    parser = argparse.ArgumentParser(description="Calibration hors ligne des scores de fraude")
+    parser.add_argument('dataset', help="Fichier CSV au format fake_job_postings.csv (avec la colonne 'fraudulent')")
+    parser.add_argument('--method', choices=['isotonic', 'platt'], default='isotonic')
+    parser.add_argument('--output', default=CALIBRATION_PATH)
+    args = parser.parse_args()
+
+    scores, labels = [], []
+    # Contexte d'application : la règle des salaires utilise les percentiles en base,
+    # comme lors des analyses en production
+    with create_app().app_context():
+        for chunk in pd.read_csv(args.dataset, chunksize=5000):
+            chunk = chunk.dropna(subset=['fraudulent'])
+            # Même conversion que l'analyse en masse : les informations sur l'entreprise
+            # viennent du profil et du logo, comme le nom pour les offres scrapées
+            jobs = [job_from_posting(row) for row in chunk.to_dict('records')]
+            # Scores bruts, avant calibration
+            scores.extend(fraud_detector.blended_scores(jobs))
+            labels.extend(chunk['fraudulent'].astype(int).tolist())
+
+    table = fit_calibration_table(scores, labels, args.method)
+    export_calibration_table(table, args.method, fraud_detector.model_version, args.output)
+    print(f"Table de calibration ({args.method}, {len(scores)} offres) écrite dans {args.output}")
+
+
+if __name__ == "__main__":
+    main()
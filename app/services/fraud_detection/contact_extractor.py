@@ -0,0 +1,254 @@
+"""
+Extraction des coordonnées de contact présentes dans les offres d'emploi
+et comparaison avec des listes de blocage (messageries personnelles,
+adresses jetables, domaines frauduleux connus).
+
+Les listes sont chargées à la demande depuis des fichiers texte compressés
+(un domaine par ligne) et indexées dans des ensembles hachés : la recherche
+d'un domaine coûte O(nombre de labels du domaine), quelle que soit la taille
+des listes.
+"""
+
+import gzip
+import os
+import re
+import sys
+import threading
+import urllib.parse
+
+# Répertoire contenant les listes de blocage (<catégorie>.txt.gz)
+BLOCKLIST_DIR = os.environ.get(
+    'FRAUD_BLOCKLIST_DIR',
+    os.path.join(os.path.dirname(__file__), 'data', 'blocklists')
+)
+
+# Catégories de listes de blocage reconnues
+PERSONAL_MAIL = 'personal_mail'
+DISPOSABLE_MAIL = 'disposable_mail'
+SCAM_DOMAINS = 'scam_domains'
+
+# Ordre de priorité lorsqu'un domaine apparaît dans plusieurs listes
+CATEGORY_PRIORITY = [SCAM_DOMAINS, DISPOSABLE_MAIL, PERSONAL_MAIL]
+
+# Messageries fréquemment utilisées par les fausses offres pour sortir des plateformes
+MESSENGERS = ['whatsapp', 'telegram', 'signal', 'skype', 'wechat', 'viber']
+
+# Expression unique pour extraire tous les contacts en une seule passe.
+# Une messagerie n'est retenue que suivie d'un identifiant (@pseudo) ou d'un
+# numéro : une simple mention ("Skype for Business", "signal processing") n'est pas un contact.
+CONTACT_PATTERN = re.compile(
+    r'(?P<url>\bhttps?://[^\s<>"\')]+|\bwww\.[^\s<>"\')]+)'
+    r'|(?P<email>\b[\w.+-]+@(?P<email_domain>[\w-]+(?:\.[\w-]+)+))'
+    r'|(?P<messenger>\b(?:' + '|'.join(MESSENGERS) + r')\b)\s*(?:[:\-]|au|at|on|sur)?\s*'
+    r'(?P<handle>@[\w.]{3,}|\+?\d[\d\s.\-]{7,}\d)',
+    re.IGNORECASE
+)
+
+
+def _domain_from_url(url):
+    """
+    Extrait le nom de domaine d'une URL.
+
+    Args:
+        url (str): URL complète ou commençant par www.
+
+    Returns:
+        str: Domaine en minuscules (sans port) ou chaîne vide
+    """
+    if not url.lower().startswith(('http://', 'https://')):
+        url = f"http://{url}"
+    try:
+        return (urllib.parse.urlparse(url).hostname or '').lower().rstrip('.')
+    except ValueError:
+        return ''
+
+
+def extract_contacts(text):
+    """
+    Extrait les emails, identifiants de messagerie et URLs d'un texte.
+
+    Un numéro de téléphone seul n'est pas relevé : il n'est suspect que donné
+    comme identifiant de messagerie ("WhatsApp +33 6 ...").
+
+    Args:
+        text (str): Texte de l'offre (description, lien de candidature...)
+
+    Returns:
+        dict: Dictionnaire avec les clés 'emails', 'handles' et 'urls'.
+              Les emails et URLs sont des tuples (valeur, domaine).
+    """
+    contacts = {'emails': [], 'handles': [], 'urls': []}
+    if not text:
+        return contacts
+
+    for match in CONTACT_PATTERN.finditer(text):
+        if match.group('url'):
+            url = match.group('url').rstrip('.,;:')
+            contacts['urls'].append((url, _domain_from_url(url)))
+        elif match.group('email'):
+            contacts['emails'].append((match.group('email'), match.group('email_domain').lower()))
+        elif match.group('messenger'):
+            contacts['handles'].append((match.group('messenger').lower(), match.group('handle')))
+
+    return contacts
+
+
+class DomainBlocklist:
+    """
+    Index des domaines bloqués, chargé à la première utilisation.
+
+    Chaque domaine est stocké dans un ensemble haché par catégorie ; un domaine
+    est considéré comme bloqué si lui-même ou l'un de ses domaines parents
+    figure dans une liste (mail.scam.com correspond à scam.com).
+    """
+
+    def __init__(self, directory=None):
+        """
+        Initialise l'index sans charger les listes.
+
+        Args:
+            directory (str, optional): Répertoire des listes. Par défaut BLOCKLIST_DIR.
+        """
+        self.directory = directory or BLOCKLIST_DIR
+        self._domains = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """
+        Charge toutes les listes <catégorie>.txt.gz du répertoire.
+
+        Returns:
+            dict: Dictionnaire {catégorie: set(domaines)}
+        """
+        domains = {}
+        if not os.path.isdir(self.directory):
+            print(f"Répertoire des listes de blocage introuvable: {self.directory}", file=sys.stderr)
+            return domains
+
+        for filename in sorted(os.listdir(self.directory)):
+            if not filename.endswith('.txt.gz'):
+                continue
+            category = filename[:-len('.txt.gz')]
+            try:
+                with gzip.open(os.path.join(self.directory, filename), 'rt', encoding='utf-8') as f:
+                    domains[category] = {
+                        line.strip().lower() for line in f
+                        if line.strip() and not line.startswith('#')
+                    }
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Erreur lors du chargement de la liste {filename}: {str(e)}", file=sys.stderr)
+        return domains
+
+    @property
+    def domains(self):
+        """Listes de blocage indexées, chargées au premier accès."""
+        if self._domains is None:
+            with self._lock:
+                if self._domains is None:
+                    self._domains = self._load()
+        return self._domains
+
+    def lookup(self, domain):
+        """
+        Cherche la catégorie de blocage d'un domaine ou de l'un de ses parents.
+
+        Args:
+            domain (str): Nom de domaine à vérifier
+
+        Returns:
+            str ou None: Catégorie de la liste correspondante ou None
+        """
+        if not domain:
+            return None
+
+        labels = domain.lower().rstrip('.').split('.')
+        # Domaine complet puis suffixes successifs (a.b.com, b.com) ; le TLD seul est ignoré
+        suffixes = ['.'.join(labels[i:]) for i in range(len(labels) - 1)]
+        domains = self.domains
+        for category in CATEGORY_PRIORITY + [c for c in domains if c not in CATEGORY_PRIORITY]:
+            entries = domains.get(category)
+            if entries and any(suffix in entries for suffix in suffixes):
+                return category
+        return None
+
+
+# Instance globale partagée par le détecteur de fraude
+domain_blocklist = DomainBlocklist()
+
+
+def find_suspicious_contacts(text, source_url=None, blocklist=None):
+    """
+    Extrait les contacts d'un texte et retourne ceux qui sont suspects.
+
+    Un contact répété dans l'offre (ou URL source reprise dans la description)
+    n'est retourné qu'une fois par catégorie.
+
+    Args:
+        text (str): Texte de l'offre
+        source_url (str, optional): URL source de l'offre
+        blocklist (DomainBlocklist, optional): Index à utiliser. Par défaut l'index global.
+
+    Returns:
+        list: Liste de tuples (contact, catégorie) pour chaque contact suspect, sans doublon
+    """
+    blocklist = blocklist or domain_blocklist
+    contacts = extract_contacts(text)
+    # {(contact normalisé, catégorie): (contact, catégorie)}, dans l'ordre d'apparition
+    suspicious = {}
+
+    for email, domain in contacts['emails']:
+        category = blocklist.lookup(domain)
+        if category:
+            suspicious.setdefault((email.lower(), category), (email, category))
+
+    urls = list(contacts['urls'])
+    if source_url:
+        urls.append((source_url, _domain_from_url(source_url)))
+    for url, domain in urls:
+        category = blocklist.lookup(domain)
+        # Un lien vers un webmail n'est pas suspect en soi, seule l'adresse email l'est
+        if category and category != PERSONAL_MAIL:
+            suspicious.setdefault((url.lower().rstrip('/'), category), (url, category))
+
+    for messenger, handle in contacts['handles']:
+        # Un numéro est comparé sans ses séparateurs ("06 12 34 56 78" = "06.12.34.56.78")
+        key = (messenger, re.sub(r'[\s.\-]', '', handle).lower())
+        suspicious.setdefault((key, 'messenger'), (f"{messenger} {handle}", 'messenger'))
+
+    return list(suspicious.values())
+
+
+def build_blocklist(source_path, category, directory=None):
+    """
+    Construit un fichier de liste compact à partir d'une liste brute (un domaine par ligne).
+
+    Args:
+        source_path (str): Chemin du fichier texte source
+        category (str): Catégorie de la liste (nom du fichier produit)
+        directory (str, optional): Répertoire de destination. Par défaut BLOCKLIST_DIR.
+
+    Returns:
+        int: Nombre de domaines écrits
+    """
+    directory = directory or BLOCKLIST_DIR
+    os.makedirs(directory, exist_ok=True)
+
+    with open(source_path, encoding='utf-8') as f:
+        domains = sorted({
+            line.strip().lower().lstrip('*.') for line in f
+            if line.strip() and not line.startswith('#')
+        })
+
+    with gzip.open(os.path.join(directory, f"{category}.txt.gz"), 'wt', encoding='utf-8') as f:
+        f.write('\n'.join(domains))
+        f.write('\n')
+
+    return len(domains)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m app.services.fraud_detection.contact_extractor <liste.txt> <catégorie>")
+        sys.exit(1)
+    count = build_blocklist(sys.argv[1], sys.argv[2])
+    print(f"{count} domaines écrits dans la liste '{sys.argv[2]}'")
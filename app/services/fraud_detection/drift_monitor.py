@@ -0,0 +1,319 @@
+"""
+Suivi en continu de la distribution des scores de fraude.
+
+Chaque prédiction met à jour, en O(1) et en mémoire constante, un histogramme
+à intervalles fixes et des moments glissants par (source, jour, version du
+modèle). Les agrégats sont périodiquement fusionnés dans la table
+FraudScoreStats par un thread dédié, ce qui permet de détecter une dérive sans parcourir la table
+des offres.
+"""
+
+import sys
+import json
+import math
+import atexit
+import threading
+from datetime import datetime, timezone
+
+# Nombre d'intervalles de l'histogramme sur [0, 1]
+NUM_BUCKETS = 20
+
+# Intervalle entre deux écritures en base (secondes)
+FLUSH_INTERVAL = 60
+
+# Seuils usuels du Population Stability Index
+PSI_WARNING = 0.1
+PSI_ALERT = 0.25
+
+
+class ScoreAccumulator:
+    """
+    Histogramme et moments d'une série de scores.
+    """
+
+    __slots__ = ('count', 'mean', 'm2', 'min_score', 'max_score', 'buckets')
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min_score=None, max_score=None, buckets=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min_score = min_score
+        self.max_score = max_score
+        self.buckets = list(buckets) if buckets else [0] * NUM_BUCKETS
+
+    def add(self, score):
+        """
+        Ajoute un score (algorithme de Welford).
+
+        Args:
+            score (float): Score de fraude entre 0 et 1
+        """
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.min_score = score if self.min_score is None else min(self.min_score, score)
+        self.max_score = score if self.max_score is None else max(self.max_score, score)
+        self.buckets[min(int(score * NUM_BUCKETS), NUM_BUCKETS - 1)] += 1
+
+    def merge(self, other):
+        """
+        Fusionne un autre accumulateur dans celui-ci (formule de Chan).
+
+        Args:
+            other (ScoreAccumulator): Accumulateur à fusionner
+        """
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        for bound in ('min_score', 'max_score'):
+            values = [v for v in (getattr(self, bound), getattr(other, bound)) if v is not None]
+            setattr(self, bound, (min if bound == 'min_score' else max)(values))
+        if len(self.buckets) != len(other.buckets):
+            self.buckets = list(other.buckets)
+        else:
+            self.buckets = [a + b for a, b in zip(self.buckets, other.buckets)]
+
+
+def population_stability_index(reference, current, epsilon=1e-4):
+    """
+    Calcule le PSI entre deux histogrammes de même découpage.
+
+    Args:
+        reference (list): Compteurs de référence
+        current (list): Compteurs observés
+        epsilon (float): Proportion minimale pour éviter log(0)
+
+    Returns:
+        float ou None: PSI, ou None si l'un des histogrammes est vide
+    """
+    ref_total, cur_total = sum(reference), sum(current)
+    if not ref_total or not cur_total or len(reference) != len(current):
+        return None
+
+    psi = 0.0
+    for ref_count, cur_count in zip(reference, current):
+        ref_pct = max(ref_count / ref_total, epsilon)
+        cur_pct = max(cur_count / cur_total, epsilon)
+        psi += (cur_pct - ref_pct) * math.log(cur_pct / ref_pct)
+    return psi
+
+
+class FraudDriftMonitor:
+    """
+    Moniteur en mémoire des scores de fraude, vidé périodiquement en base.
+
+    Les écritures sont faites par un thread dédié, démarré au premier score
+    enregistré dans un contexte d'application, sur une connexion distincte :
+    record() ne touche jamais à la session de l'appelant (lot d'offres en
+    cours d'enregistrement, analyse en arrière-plan...).
+    """
+
+    def __init__(self, flush_interval=FLUSH_INTERVAL):
+        """
+        Initialise le moniteur.
+
+        Args:
+            flush_interval (int): Intervalle entre deux écritures en base (secondes)
+        """
+        self.flush_interval = flush_interval
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._app = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    def record(self, score, source=None, model_version=None):
+        """
+        Enregistre un score de fraude (en mémoire uniquement).
+
+        Args:
+            score (float): Score de fraude entre 0 et 1
+            source (str, optional): Source de l'offre (Indeed, LinkedIn...)
+            model_version (str, optional): Version du modèle ayant produit le score
+        """
+        key = (
+            source or 'inconnue',
+            datetime.now(timezone.utc).date(),
+            model_version or 'rules'
+        )
+        score = min(max(float(score), 0.0), 1.0)
+
+        with self._lock:
+            accumulator = self._pending.get(key)
+            if accumulator is None:
+                accumulator = self._pending[key] = ScoreAccumulator()
+            accumulator.add(score)
+
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        """
+        Démarre le thread d'écriture périodique, rattaché à l'application courante.
+        Ne fait rien hors d'un contexte d'application Flask.
+        """
+        from flask import current_app, has_app_context
+        if not has_app_context():
+            return
+
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._app = current_app._get_current_object()
+            self._thread = threading.Thread(target=self._run, name='fraud-drift-flush', daemon=True)
+            self._thread.start()
+        # Écrire les derniers agrégats à l'arrêt du processus
+        atexit.register(self.stop)
+
+    def _run(self):
+        """Boucle du thread d'écriture."""
+        while not self._stop.wait(self.flush_interval):
+            self.flush()
+
+    def stop(self):
+        """Arrête le thread d'écriture et écrit les agrégats en attente."""
+        self._stop.set()
+        self.flush()
+
+    def flush(self, app=None):
+        """
+        Fusionne les agrégats en attente dans la table FraudScoreStats,
+        dans une transaction propre (la session de l'appelant n'est pas utilisée).
+
+        Args:
+            app (Flask, optional): Application à utiliser. Par défaut, celle du
+                                   contexte courant ou celle du thread d'écriture.
+
+        Returns:
+            int: Nombre de clés écrites
+        """
+        from flask import current_app, has_app_context
+        if app is None:
+            app = current_app._get_current_object() if has_app_context() else self._app
+        if app is None:
+            return 0
+
+        # Une seule écriture à la fois, les autres threads continuent à agréger
+        if not self._flush_lock.acquire(blocking=False):
+            return 0
+
+        try:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            if not pending:
+                return 0
+
+            from sqlalchemy import select
+            from app import db
+            from app.models.fraud_score_stats import FraudScoreStats
+
+            table = FraudScoreStats.__table__
+            try:
+                with app.app_context(), db.engine.begin() as conn:
+                    for (source, day, model_version), delta in pending.items():
+                        key_filter = (
+                            (table.c.source == source) & (table.c.day == day)
+                            & (table.c.model_version == model_version)
+                        )
+                        row = conn.execute(
+                            select(table.c.id, table.c.count, table.c.mean, table.c.m2,
+                                   table.c.min_score, table.c.max_score, table.c.histogram).where(key_filter)
+                        ).first()
+                        stored = ScoreAccumulator()
+                        if row is not None:
+                            try:
+                                buckets = json.loads(row.histogram or '[]')
+                            except ValueError:
+                                buckets = []
+                            stored = ScoreAccumulator(row.count, row.mean, row.m2, row.min_score, row.max_score, buckets)
+                        stored.merge(delta)
+                        values = {
+                            'count': stored.count,
+                            'mean': stored.mean,
+                            'm2': stored.m2,
+                            'min_score': stored.min_score,
+                            'max_score': stored.max_score,
+                            'histogram': json.dumps(stored.buckets)
+                        }
+                        if row is None:
+                            conn.execute(table.insert().values(
+                                source=source, day=day, model_version=model_version, **values
+                            ))
+                        else:
+                            conn.execute(table.update().where(table.c.id == row.id).values(**values))
+                return len(pending)
+            except Exception as e:
+                print(f"Erreur lors de l'enregistrement des statistiques de fraude: {str(e)}", file=sys.stderr)
+                # Remettre les agrégats en attente pour la prochaine écriture
+                with self._lock:
+                    for key, delta in pending.items():
+                        self._pending.setdefault(key, ScoreAccumulator()).merge(delta)
+                return 0
+        finally:
+            self._flush_lock.release()
+
+
+def drift_report(rows):
+    """
+    Construit un rapport de dérive à partir de lignes FraudScoreStats.
+
+    Pour chaque couple (source, version du modèle), le dernier jour est comparé
+    à l'ensemble des jours précédents de la période.
+
+    Args:
+        rows (list): Lignes FraudScoreStats triées par jour croissant
+
+    Returns:
+        list: Liste de dictionnaires décrivant chaque série
+    """
+    series = {}
+    for row in rows:
+        series.setdefault((row.source, row.model_version), []).append(row)
+
+    report = []
+    for (source, model_version), days in sorted(series.items()):
+        latest = days[-1]
+        reference = ScoreAccumulator()
+        for row in days[:-1]:
+            reference.merge(ScoreAccumulator(
+                row.count, row.mean, row.m2, row.min_score, row.max_score, row.get_histogram()
+            ))
+
+        psi = population_stability_index(reference.buckets, latest.get_histogram()) if reference.count else None
+        if psi is None:
+            status = 'insuffisant'
+        elif psi >= PSI_ALERT:
+            status = 'alerte'
+        elif psi >= PSI_WARNING:
+            status = 'surveillance'
+        else:
+            status = 'stable'
+
+        report.append({
+            'source': source,
+            'model_version': model_version,
+            'psi': psi,
+            'status': status,
+            'days': [{
+                'day': row.day.isoformat(),
+                'count': row.count,
+                'mean': row.mean,
+                'std': math.sqrt(row.variance),
+                'min': row.min_score,
+                'max': row.max_score,
+                'histogram': row.get_histogram()
+            } for row in days]
+        })
+
+    return report
+
+
+# Instance globale utilisée par le détecteur de fraude
+drift_monitor = FraudDriftMonitor()
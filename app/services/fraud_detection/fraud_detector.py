@@ -4,12 +4,23 @@ Utilise un modèle RandomForest entraîné pour prédire si une offre est potent
 """
 
 import os
+import sys
 import re
+import json
+import math
+import hashlib
+import threading
+from collections import OrderedDict
 import numpy as np
 import pandas as pd
 import joblib
 from sklearn.base import BaseEstimator, TransformerMixin
 
+from .contact_extractor import find_suspicious_contacts, SCAM_DOMAINS
+from .drift_monitor import drift_monitor
+from .salary_stats import salary_stats
+from .calibration import ScoreCalibrator
+
 # Chemin vers le modèle sauvegardé
 MODEL_PATH = os.path.join(os.path.dirname(__file__), 'rf_pipeline.pkl')
 
@@ -49,21 +60,122 @@ FRAUD_INDICATORS = {
     }
 }
 
+# Nombre de prédictions conservées dans le cache par empreinte
+CACHE_SIZE = 10000
+
+# Champs d'une offre pris en compte par le modèle et les règles
+FINGERPRINT_FIELDS = [
+    'title', 'company_name', 'company_profile', 'department', 'location', 'description',
+    'requirements', 'benefits', 'work_type', 'experience_required', 'education_required',
+    'salary', 'application_link', 'source_url', 'has_company_info'
+]
+
+
+def job_fingerprint(job):
+    """
+    Calcule l'empreinte d'une offre à partir des champs utilisés pour la prédiction.
+
+    Args:
+        job (dict): Dictionnaire contenant les informations de l'offre d'emploi
+
+    Returns:
+        str: Empreinte SHA-1 hexadécimale
+    """
+    payload = json.dumps([job.get(field) for field in FINGERPRINT_FIELDS], default=str, ensure_ascii=False)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+
+def get_risk_level(score):
+    """
+    Détermine le niveau de risque correspondant à une probabilité de fraude.
+
+    Args:
+        score (float): Probabilité de fraude entre 0 et 1
+
+    Returns:
+        tuple: (niveau de risque, classe CSS)
+    """
+    if score < 0.2:
+        return "Très faible", "success"
+    elif score < 0.4:
+        return "Faible", "info"
+    elif score < 0.6:
+        return "Moyen", "warning"
+    elif score < 0.8:
+        return "Élevé", "danger"
+    else:
+        return "Très élevé", "danger"
+
+
+def job_from_posting(posting):
+    """
+    Convertit une ligne au format fake_job_postings.csv en dictionnaire d'offre.
+
+    Args:
+        posting (dict): Ligne du fichier (colonnes title, company_profile, description...)
+
+    Returns:
+        dict: Dictionnaire d'offre utilisable par le détecteur
+    """
+    def value(key):
+        v = posting.get(key)
+        if v is None or (isinstance(v, float) and math.isnan(v)):
+            return ''
+        return str(v)
+
+    # Le fichier n'a pas de nom d'entreprise : le profil et le logo en tiennent lieu.
+    # Sans ces colonnes, l'information est inconnue et la règle n'est pas appliquée.
+    if 'company_profile' in posting or 'has_company_logo' in posting:
+        has_logo = value('has_company_logo').strip() in ('1', '1.0', 'True', 'true')
+        has_company_info = bool(value('company_profile').strip()) or has_logo
+    else:
+        has_company_info = None
+
+    # Utiliser la borne basse de la fourchette de salaire si elle est numérique ("40000-60000")
+    salary_bound = value('salary_range').split('-')[0].strip()
+    salary = int(salary_bound) if salary_bound.isdigit() else None
+
+    return {
+        'job_id': value('job_id'),
+        'title': value('title'),
+        'company_name': '',
+        'company_profile': value('company_profile'),
+        'has_company_info': has_company_info,
+        'department': value('department'),
+        'location': value('location'),
+        'description': value('description'),
+        'requirements': value('requirements'),
+        'benefits': value('benefits'),
+        'work_type': value('employment_type'),
+        'experience_required': value('required_experience'),
+        'education_required': value('required_education'),
+        'salary': salary,
+        'application_link': '',
+        'source_url': ''
+    }
+
+
 class FraudDetector:
     """
     Classe pour détecter les offres d'emploi frauduleuses.
     """
 
-    def __init__(self, model_path=None):
+    def __init__(self, model_path=None, calibrator=None):
         """
         Initialise le détecteur de fraude.
 
         Args:
             model_path (str, optional): Chemin vers le modèle sauvegardé.
                                        Si None, utilise le modèle par défaut.
+            calibrator (ScoreCalibrator, optional): Calibrateur des scores.
+                                       Si None, utilise la table de calibration par défaut.
         """
         self.model_path = model_path or MODEL_PATH
         self.model = None
+        self.model_version = 'rules'
+        self.calibrator = calibrator or ScoreCalibrator()
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
         self.load_model()
 
     def load_model(self):
@@ -74,36 +186,39 @@ class FraudDetector:
         try:
             if os.path.exists(self.model_path):
                 self.model = joblib.load(self.model_path)
-                print(f"Modèle de détection de fraude chargé depuis {self.model_path}")
+                with open(self.model_path, 'rb') as f:
+                    self.model_version = hashlib.sha1(f.read()).hexdigest()[:12]
+                print(f"Modèle de détection de fraude chargé depuis {self.model_path}", file=sys.stderr)
             else:
-                print(f"Modèle non trouvé à {self.model_path}, utilisation de l'approche basée sur des règles")
+                print(f"Modèle non trouvé à {self.model_path}, utilisation de l'approche basée sur des règles", file=sys.stderr)
                 self.model = None
+                self.model_version = 'rules'
         except Exception as e:
-            print(f"Erreur lors du chargement du modèle: {str(e)}")
+            print(f"Erreur lors du chargement du modèle: {str(e)}", file=sys.stderr)
             self.model = None
+            self.model_version = 'rules'
 
-    def prepare_job_data(self, job):
+    def prepare_jobs_data(self, jobs):
         """
-        Prépare les données d'une offre d'emploi pour la prédiction.
+        Prépare les données de plusieurs offres d'emploi pour une prédiction groupée.
 
         Args:
-            job (dict): Dictionnaire contenant les informations de l'offre d'emploi
+            jobs (list): Liste de dictionnaires contenant les informations des offres
 
         Returns:
-            pd.DataFrame: DataFrame contenant les données préparées
+            pd.DataFrame: DataFrame contenant une ligne préparée par offre
         """
-        # Créer un DataFrame avec une seule ligne
         job_data = pd.DataFrame({
-            'title': [job.get('title', '')],
-            'location': [job.get('location', '')],
-            'department': [''],  # Non disponible dans notre modèle
-            'company_profile': [''],  # Non disponible dans notre modèle
-            'description': [job.get('description', '')],
-            'requirements': [''],  # Non disponible dans notre modèle
-            'benefits': [job.get('benefits', '')],
-            'employment_type': [job.get('work_type', '')],
-            'required_experience': [str(job.get('experience_required', ''))],
-            'required_education': [job.get('education_required', '')]
+            'title': [job.get('title', '') for job in jobs],
+            'location': [job.get('location', '') for job in jobs],
+            'department': [job.get('department', '') for job in jobs],  # Absent des offres scrapées
+            'company_profile': [job.get('company_profile', '') for job in jobs],  # Absent des offres scrapées
+            'description': [job.get('description', '') for job in jobs],
+            'requirements': [job.get('requirements', '') for job in jobs],  # Absent des offres scrapées
+            'benefits': [job.get('benefits', '') for job in jobs],
+            'employment_type': [job.get('work_type', '') for job in jobs],
+            'required_experience': [str(job.get('experience_required', '')) for job in jobs],
+            'required_education': [job.get('education_required', '') for job in jobs]
         })
 
         # Créer la colonne combined_text
@@ -124,67 +239,143 @@ class FraudDetector:
         job_data['benefits_length'] = job_data['benefits'].fillna('').apply(len)
 
         # Extraire state, city et Country à partir de location
-        if 'location' in job_data.columns:
-            job_data[['city', 'state', 'Country']] = job_data['location'].str.split(',', expand=True, n=2)
-            for col in ['city', 'state', 'Country']:
-                if col in job_data.columns:
-                    job_data[col] = job_data[col].fillna('Unknown').str.strip()
+        # (reindex garantit trois colonnes même si aucun lieu ne contient de virgule)
+        location_parts = job_data['location'].fillna('').str.split(',', expand=True, n=2).reindex(columns=range(3))
+        job_data[['city', 'state', 'Country']] = location_parts.values
+        for col in ['city', 'state', 'Country']:
+            job_data[col] = job_data[col].fillna('Unknown').str.strip()
 
         return job_data
 
-    def predict_fraud(self, job):
+    def prepare_job_data(self, job):
         """
-        Prédit si une offre d'emploi est frauduleuse.
+        Prépare les données d'une offre d'emploi pour la prédiction.
 
         Args:
             job (dict): Dictionnaire contenant les informations de l'offre d'emploi
 
         Returns:
-            dict: Dictionnaire contenant la prédiction et les explications
+            pd.DataFrame: DataFrame contenant les données préparées
         """
-        # Préparer les données
-        job_data = self.prepare_job_data(job)
+        return self.prepare_jobs_data([job])
 
-        # Calculer le score basé sur des règles (utilisé si le modèle n'est pas disponible)
-        rule_based_score, indicators = self._rule_based_fraud_score(job)
+    def _model_scores(self, jobs):
+        """
+        Calcule les scores du modèle pour plusieurs offres en un seul appel.
 
-        # Si le modèle est disponible, utiliser sa prédiction
-        model_score = None
+        Args:
+            jobs (list): Liste de dictionnaires d'offres
+
+        Returns:
+            np.ndarray ou None: Scores du modèle, ou None si le modèle est indisponible
+        """
         try:
             if self.model and hasattr(self.model, 'predict_proba'):
-                model_score = self.model.predict_proba(job_data)[0, 1]
+                return self.model.predict_proba(self.prepare_jobs_data(jobs))[:, 1]
         except Exception as e:
-            print(f"Erreur lors de la prédiction avec le modèle: {str(e)}")
+            print(f"Erreur lors de la prédiction avec le modèle: {str(e)}", file=sys.stderr)
+        return None
 
-        # Combiner les scores (donner plus de poids au modèle s'il est disponible)
-        if model_score is not None:
-            final_score = 0.7 * model_score + 0.3 * rule_based_score
-        else:
-            final_score = rule_based_score
-
-        # Classer le niveau de risque
-        if final_score < 0.2:
-            risk_level = "Très faible"
-            risk_class = "success"
-        elif final_score < 0.4:
-            risk_level = "Faible"
-            risk_class = "info"
-        elif final_score < 0.6:
-            risk_level = "Moyen"
-            risk_class = "warning"
-        elif final_score < 0.8:
-            risk_level = "Élevé"
-            risk_class = "danger"
-        else:
-            risk_level = "Très élevé"
-            risk_class = "danger"
+    def blended_scores(self, jobs):
+        """
+        Calcule les scores combinés (modèle et règles), avant calibration.
+
+        Args:
+            jobs (list): Liste de dictionnaires d'offres
+
+        Returns:
+            list: Scores combinés entre 0 et 1
+        """
+        return [score for score, _, _ in self._blend(jobs)]
 
-        return {
-            'fraud_probability': final_score,
-            'risk_level': risk_level,
-            'risk_class': risk_class,
-            'indicators': indicators
-        }
+    def _blend(self, jobs):
+        """
+        Combine les scores du modèle et des règles pour plusieurs offres.
+
+        Args:
+            jobs (list): Liste de dictionnaires d'offres
+
+        Returns:
+            list: Tuples (score combiné, indicateurs, version du modèle utilisé)
+        """
+        model_scores = self._model_scores(jobs)
+        results = []
+        for i, job in enumerate(jobs):
+            rule_based_score, indicators = self._rule_based_fraud_score(job)
+            # Donner plus de poids au modèle s'il est disponible
+            if model_scores is not None:
+                results.append((0.7 * float(model_scores[i]) + 0.3 * rule_based_score, indicators, self.model_version))
+            else:
+                results.append((rule_based_score, indicators, 'rules'))
+        return results
+
+    def predict_fraud_batch(self, jobs):
+        """
+        Prédit si plusieurs offres d'emploi sont frauduleuses, avec un seul appel au modèle.
+
+        Args:
+            jobs (list): Liste de dictionnaires contenant les informations des offres
+
+        Returns:
+            list: Un dictionnaire de prédiction par offre, dans le même ordre
+        """
+        results = [None] * len(jobs)
+        # Les scores dépendent aussi des percentiles de salaires (rechargés périodiquement)
+        # et de la table de calibration : leur version fait partie de la clé
+        versions = (salary_stats.version, self.calibrator.version)
+        keys = [(job_fingerprint(job),) + versions for job in jobs]
+
+        # Réutiliser les prédictions déjà calculées pour des offres identiques
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    results[i] = cached
+
+        missing = [i for i, result in enumerate(results) if result is None]
+        if missing:
+            blended = self._blend([jobs[i] for i in missing])
+            # La table n'est appliquée que si elle a été ajustée pour le modèle ayant produit les scores
+            calibrated = self.calibrator.calibrate(
+                np.array([score for score, _, _ in blended]), blended[0][2]
+            )
+            for i, (_, indicators, model_version), final_score in zip(missing, blended, calibrated):
+                final_score = float(final_score)
+                risk_level, risk_class = get_risk_level(final_score)
+                results[i] = {
+                    'fraud_probability': final_score,
+                    'risk_level': risk_level,
+                    'risk_class': risk_class,
+                    'indicators': indicators,
+                    'model_version': model_version
+                }
+
+            with self._cache_lock:
+                for i in missing:
+                    self._cache[keys[i]] = results[i]
+                while len(self._cache) > CACHE_SIZE:
+                    self._cache.popitem(last=False)
+
+            # Suivre la distribution des scores pour détecter une dérive du modèle
+            # (seuls les scores calculés ici : une offre déjà en cache est déjà comptée)
+            for i in missing:
+                drift_monitor.record(results[i]['fraud_probability'], source=jobs[i].get('source'),
+                                     model_version=results[i]['model_version'])
+
+        return [dict(result) for result in results]
+
+    def predict_fraud(self, job):
+        """
+        Prédit si une offre d'emploi est frauduleuse.
+
+        Args:
+            job (dict): Dictionnaire contenant les informations de l'offre d'emploi
+
+        Returns:
+            dict: Dictionnaire contenant la prédiction et les explications
+        """
+        return self.predict_fraud_batch([job])[0]
 
     def _rule_based_fraud_score(self, job):
         """
@@ -200,8 +391,13 @@ class FraudDetector:
         score = 0.0
         active_indicators = []
 
-        # Vérifier les informations de l'entreprise
-        if not job.get('company_name') or len(job.get('company_name', '')) < 3:
+        # Vérifier les informations de l'entreprise (has_company_info n'est fourni
+        # que par job_from_posting ; None signifie que le fichier ne les contient pas)
+        if 'has_company_info' in job:
+            missing_company_info = job['has_company_info'] is False
+        else:
+            missing_company_info = not job.get('company_name') or len(job.get('company_name', '')) < 3
+        if missing_company_info:
             score += FRAUD_INDICATORS['missing_company_info']['weight']
             active_indicators.append({
                 'name': 'missing_company_info',
@@ -269,36 +465,33 @@ class FraudDetector:
                     'description': FRAUD_INDICATORS['no_requirements']['description']
                 })
 
-        # Vérifier si le salaire est trop élevé pour le poste
+        # Vérifier si le salaire est trop élevé pour le poste (percentiles locaux, puis règle fixe)
         salary = job.get('salary')
-        if salary and isinstance(salary, (int, float)) and salary > 100000:
+        if salary and isinstance(salary, (int, float)):
             title = job.get('title', '').lower()
-            if 'junior' in title or 'débutant' in title or 'stagiaire' in title:
+            is_junior = 'junior' in title or 'débutant' in title or 'stagiaire' in title
+            if salary_stats.is_outlier(title, job.get('location', ''), salary) or (salary > 100000 and is_junior):
                 score += FRAUD_INDICATORS['too_good_to_be_true']['weight']
                 active_indicators.append({
                     'name': 'too_good_to_be_true',
                     'description': FRAUD_INDICATORS['too_good_to_be_true']['description']
                 })
 
-        # Vérifier si l'URL source est suspecte
-        source_url = job.get('source_url', '')
-        if source_url:
-            suspicious_domains = ['example.com', 'test.com', 'fake.com', 'scam.com']
-            if any(domain in source_url for domain in suspicious_domains):
-                score += 0.9  # Score très élevé pour les domaines suspects
-                active_indicators.append({
-                    'name': 'suspicious_contact',
-                    'description': FRAUD_INDICATORS['suspicious_contact']['description']
-                })
-
-        # Ajouter un score de base pour s'assurer que les offres ont un niveau de risque minimum
-        # Cela permet d'avoir des offres avec différents niveaux de risque pour la démonstration
-        import random
-        base_score = 0.4  # Score de base minimum plus élevé
-        random_score = random.uniform(0.2, 0.6)  # Variation aléatoire plus importante
-        score = max(score + random_score, base_score)  # Prendre le maximum entre le score calculé et le score de base
+        # Vérifier les contacts (emails, messageries, URLs) et l'URL source
+        contact_text = ' '.join(filter(None, [description, job.get('application_link', '')]))
+        suspicious_contacts = find_suspicious_contacts(contact_text, job.get('source_url', ''))
+        if suspicious_contacts:
+            if any(category == SCAM_DOMAINS for _, category in suspicious_contacts):
+                score += 0.9  # Score très élevé pour les domaines frauduleux connus
+            else:
+                score += FRAUD_INDICATORS['suspicious_contact']['weight']
+            active_indicators.append({
+                'name': 'suspicious_contact',
+                'description': FRAUD_INDICATORS['suspicious_contact']['description'],
+                'details': [contact for contact, _ in suspicious_contacts]
+            })
 
-        # Normaliser le score entre 0 et 1
+        # Normaliser le score entre 0 et 1 (score déterministe, calibré ensuite)
         score = min(score, 1.0)
 
         return score, active_indicators
@@ -318,3 +511,15 @@ def predict_job_fraud(job):
         dict: Dictionnaire contenant la prédiction et les explications
     """
     return fraud_detector.predict_fraud(job)
+
+def predict_jobs_fraud(jobs):
+    """
+    Fonction utilitaire pour prédire la fraude sur plusieurs offres en un seul appel au modèle.
+
+    Args:
+        jobs (list): Liste de dictionnaires contenant les informations des offres
+
+    Returns:
+        list: Un dictionnaire de prédiction par offre, dans le même ordre
+    """
+    return fraud_detector.predict_fraud_batch(jobs)
@@ -0,0 +1,432 @@
+"""
+Statistiques de salaires par famille de postes et par lieu.
+
+Les salaires observés sont agrégés dans des esquisses de quantiles à
+intervalles logarithmiques (précision relative constante, mémoire bornée,
+fusion possible). Les percentiles sont précalculés et gardés en mémoire :
+la règle « trop beau pour être vrai » compare un salaire à son percentile
+local en O(1), sans requête d'agrégation par offre.
+
+Chaque processus n'écrit que les salaires qu'il a observés depuis sa
+dernière écriture : ils sont fusionnés dans les esquisses de la base, qui
+cumulent ainsi les observations de tous les workers. Le cache est rechargé
+depuis la base toutes les RELOAD_INTERVAL secondes.
+"""
+
+import math
+import re
+import sys
+import time
+import threading
+import unicodedata
+
+from flask import has_app_context
+from sqlalchemy import select
+
+from app import db
+from app.models.job import Job
+from app.models.salary_stats import SalaryStats
+
+# Précision relative des esquisses (2,5 % d'erreur maximale sur un quantile)
+RELATIVE_ACCURACY = 0.025
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = math.log(GAMMA)
+
+# Salaires annuels plausibles (en dehors, la valeur est ignorée)
+MIN_SALARY = 1000
+MAX_SALARY = 10000000
+
+# Un salaire est suspect au-delà de OUTLIER_FACTOR fois le 90e percentile local
+OUTLIER_FACTOR = 1.5
+
+# Nombre minimal de salaires observés pour qu'un percentile soit utilisé
+MIN_SAMPLES = 20
+
+# Intervalle de rechargement du cache depuis la base (secondes)
+RELOAD_INTERVAL = 300
+
+# Clé utilisée pour les statistiques toutes localisations confondues
+ANY_LOCATION = '*'
+
+# Mots ignorés pour déterminer la famille d'un poste
+TITLE_STOPWORDS = {
+    'h', 'f', 'hf', 'fh', 'x', 'm', 'w', 'de', 'du', 'des', 'en', 'et', 'le', 'la', 'les',
+    'un', 'une', 'a', 'au', 'pour', 'avec', 'the', 'of', 'and', 'in', 'for',
+    'junior', 'senior', 'confirme', 'experimente', 'debutant', 'stagiaire', 'stage',
+    'alternance', 'alternant', 'apprenti', 'cdi', 'cdd', 'freelance', 'interim',
+    'lead', 'principal', 'jr', 'sr'
+}
+
+
+def _strip_accents(text):
+    """
+    Supprime les accents et passe le texte en minuscules.
+
+    Args:
+        text (str): Texte à normaliser
+
+    Returns:
+        str: Texte sans accents en minuscules
+    """
+    text = unicodedata.normalize('NFKD', text or '')
+    return ''.join(c for c in text if not unicodedata.combining(c)).lower()
+
+
+def normalize_title_family(title):
+    """
+    Détermine la famille d'un poste à partir de son titre.
+
+    Args:
+        title (str): Titre de l'offre
+
+    Returns:
+        str: Famille du poste (deux premiers mots significatifs) ou chaîne vide
+    """
+    words = re.findall(r'[a-z0-9+#]+', _strip_accents(title))
+    significant = [w for w in words if w not in TITLE_STOPWORDS and not w.isdigit()]
+    return ' '.join(significant[:2])
+
+
+def normalize_location(location):
+    """
+    Normalise un lieu en conservant la ville.
+
+    Args:
+        location (str): Lieu de l'offre (ex: "Paris (75)", "Lyon, France")
+
+    Returns:
+        str: Ville normalisée ou chaîne vide
+    """
+    city = _strip_accents(location).split(',')[0]
+    city = re.sub(r'\(.*?\)|\b\d+(?:er|eme|e)?\b', ' ', city)
+    return re.sub(r'\s+', ' ', city).strip(' -')
+
+
+class SalarySketch:
+    """
+    Esquisse de quantiles à intervalles logarithmiques.
+    """
+
+    __slots__ = ('count', 'buckets')
+
+    def __init__(self, count=0, buckets=None):
+        self.count = count
+        self.buckets = dict(buckets) if buckets else {}
+
+    def add(self, value):
+        """
+        Ajoute un salaire à l'esquisse.
+
+        Args:
+            value (float): Salaire annuel
+        """
+        index = int(math.ceil(math.log(value) / LOG_GAMMA))
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+        self.count += 1
+
+    def merge(self, other):
+        """
+        Fusionne une autre esquisse dans celle-ci.
+
+        Args:
+            other (SalarySketch): Esquisse à fusionner
+        """
+        for index, count in other.buckets.items():
+            self.buckets[index] = self.buckets.get(index, 0) + count
+        self.count += other.count
+
+    def quantile(self, q):
+        """
+        Calcule un quantile approché.
+
+        Args:
+            q (float): Quantile entre 0 et 1
+
+        Returns:
+            float ou None: Valeur approchée du quantile ou None si l'esquisse est vide
+        """
+        if not self.count:
+            return None
+
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self.buckets):
+            seen += self.buckets[index]
+            if seen > rank:
+                # Milieu de l'intervalle ]gamma^(i-1), gamma^i]
+                return 2 * GAMMA ** index / (GAMMA + 1)
+        return 2 * GAMMA ** max(self.buckets) / (GAMMA + 1)
+
+
+class SalaryStatsTable:
+    """
+    Cache en mémoire de la table SalaryStats, mis à jour de façon incrémentale.
+    """
+
+    def __init__(self):
+        self._sketches = {}
+        self._percentiles = {}
+        # Salaires observés par ce processus et pas encore écrits en base
+        self._deltas = {}
+        self._loaded = False
+        self._loaded_at = 0.0
+        # Incrémentée à chaque rechargement et quand observe() change un percentile
+        # utilisé par is_outlier (invalide les prédictions mises en cache)
+        self._version = 0
+        self._lock = threading.Lock()
+        # Sérialise les rechargements et les écritures : un rechargement ne lit jamais la base
+        # pendant qu'une écriture est en cours (salaires ni en attente ni encore en base)
+        self._reload_lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        """
+        Charge la table SalaryStats en mémoire au premier accès, puis la recharge
+        toutes les RELOAD_INTERVAL secondes (observations des autres workers).
+        Nécessite un contexte d'application Flask.
+
+        Returns:
+            bool: True si les statistiques sont disponibles
+        """
+        if self._loaded and time.monotonic() - self._loaded_at < RELOAD_INTERVAL:
+            return True
+
+        if not has_app_context():
+            return self._loaded
+
+        # Un seul rechargement à la fois : les autres threads utilisent le cache actuel
+        if not self._reload_lock.acquire(blocking=not self._loaded):
+            return self._loaded
+        try:
+            if self._loaded and time.monotonic() - self._loaded_at < RELOAD_INTERVAL:
+                return True
+            table = SalaryStats.__table__
+            try:
+                # Connexion distincte : la session de l'appelant n'est pas utilisée
+                with db.engine.connect() as conn:
+                    rows = conn.execute(select(
+                        table.c.title_family, table.c.location_key, table.c.count, table.c.sketch, table.c.p90
+                    )).all()
+            except Exception as e:
+                print(f"Erreur lors du chargement des statistiques de salaires: {str(e)}", file=sys.stderr)
+                return self._loaded
+
+            sketches, percentiles = {}, {}
+            for family, location_key, count, sketch, p90 in rows:
+                key = (family, location_key)
+                sketches[key] = SalarySketch(count, SalaryStats.decode_sketch(sketch))
+                percentiles[key] = (p90, count)
+
+            with self._lock:
+                # Les salaires pas encore écrits restent pris en compte
+                for key, delta in self._deltas.items():
+                    sketch = sketches.setdefault(key, SalarySketch())
+                    sketch.merge(delta)
+                    percentiles[key] = (sketch.quantile(0.9), sketch.count)
+                self._sketches = sketches
+                self._percentiles = percentiles
+                self._loaded = True
+                self._loaded_at = time.monotonic()
+                self._version += 1
+            return True
+        finally:
+            self._reload_lock.release()
+
+    @property
+    def version(self):
+        """Numéro de version des percentiles (0 si jamais chargés)."""
+        return self._version
+
+    @staticmethod
+    def _effective(entry):
+        """Percentile réellement utilisé pour une entrée (p90, nombre), None sous MIN_SAMPLES."""
+        p90, count = entry
+        return p90 if p90 and count >= MIN_SAMPLES else None
+
+    def observe(self, title, location, salary):
+        """
+        Ajoute le salaire d'une offre aux statistiques de sa famille de postes.
+
+        Args:
+            title (str): Titre de l'offre
+            location (str): Lieu de l'offre
+            salary (int): Salaire annuel
+        """
+        if not isinstance(salary, (int, float)) or not MIN_SALARY <= salary <= MAX_SALARY:
+            return
+        family = normalize_title_family(title)
+        if not family or not self._ensure_loaded():
+            return
+
+        city = normalize_location(location)
+        keys = [(family, ANY_LOCATION)] + ([(family, city)] if city else [])
+
+        with self._lock:
+            changed = False
+            for key in keys:
+                sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = SalarySketch()
+                sketch.add(salary)
+                previous = self._percentiles.get(key, (None, 0))
+                self._percentiles[key] = (sketch.quantile(0.9), sketch.count)
+                # Les esquisses étant à intervalles, le percentile ne change que rarement
+                changed = changed or self._effective(previous) != self._effective(self._percentiles[key])
+                delta = self._deltas.get(key)
+                if delta is None:
+                    delta = self._deltas[key] = SalarySketch()
+                delta.add(salary)
+            if changed:
+                self._version += 1
+
+    def percentile(self, title, location):
+        """
+        Retourne le 90e percentile local le plus précis disponible.
+
+        Args:
+            title (str): Titre de l'offre
+            location (str): Lieu de l'offre
+
+        Returns:
+            float ou None: 90e percentile (lieu puis toutes localisations) ou None
+        """
+        family = normalize_title_family(title)
+        if not family or not self._ensure_loaded():
+            return None
+
+        city = normalize_location(location)
+        for key in ((family, city), (family, ANY_LOCATION)):
+            p90 = self._effective(self._percentiles.get(key, (None, 0)))
+            if p90:
+                return p90
+        return None
+
+    def is_outlier(self, title, location, salary):
+        """
+        Indique si un salaire est anormalement élevé par rapport au marché local.
+
+        Args:
+            title (str): Titre de l'offre
+            location (str): Lieu de l'offre
+            salary (int): Salaire annuel
+
+        Returns:
+            bool: True si le salaire dépasse OUTLIER_FACTOR fois le 90e percentile
+        """
+        if not isinstance(salary, (int, float)) or salary <= 0:
+            return False
+        p90 = self.percentile(title, location)
+        return p90 is not None and salary > OUTLIER_FACTOR * p90
+
+    def flush(self):
+        """
+        Fusionne les salaires observés depuis la dernière écriture dans la table SalaryStats,
+        sur une connexion distincte (la session de l'appelant n'est pas utilisée).
+        Doit être appelé dans un contexte d'application Flask.
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        # Les salaires retirés de self._deltas ne sont en base qu'après la validation :
+        # aucun rechargement ne doit avoir lieu entre les deux
+        with self._reload_lock:
+            return self._flush_locked()
+
+    def _flush_locked(self):
+        """
+        Écrit les salaires en attente (voir flush). Appelé avec _reload_lock acquis.
+
+        Returns:
+            int: Nombre de lignes écrites
+        """
+        with self._lock:
+            deltas, self._deltas = self._deltas, {}
+
+        if not deltas:
+            return 0
+
+        table = SalaryStats.__table__
+        merged = {}
+        try:
+            with db.engine.begin() as conn:
+                for (family, location_key), delta in deltas.items():
+                    key_filter = (table.c.title_family == family) & (table.c.location_key == location_key)
+                    row = conn.execute(
+                        select(table.c.id, table.c.count, table.c.sketch).where(key_filter).with_for_update()
+                    ).first()
+                    stored = SalarySketch(row.count, SalaryStats.decode_sketch(row.sketch)) if row else SalarySketch()
+                    stored.merge(delta)
+                    values = {
+                        'count': stored.count,
+                        'sketch': SalaryStats.encode_sketch(stored.buckets),
+                        'p50': stored.quantile(0.5),
+                        'p90': stored.quantile(0.9)
+                    }
+                    if row is None:
+                        conn.execute(table.insert().values(title_family=family, location_key=location_key, **values))
+                    else:
+                        conn.execute(table.update().where(table.c.id == row.id).values(**values))
+                    merged[(family, location_key)] = stored
+        except Exception as e:
+            print(f"Erreur lors de l'enregistrement des statistiques de salaires: {str(e)}", file=sys.stderr)
+            # Remettre les salaires en attente pour la prochaine écriture
+            with self._lock:
+                for key, delta in deltas.items():
+                    self._deltas.setdefault(key, SalarySketch()).merge(delta)
+            return 0
+
+        # Les esquisses de la base incluent les salaires observés par les autres workers
+        with self._lock:
+            changed = False
+            for key, stored in merged.items():
+                sketch = SalarySketch(stored.count, stored.buckets)
+                pending = self._deltas.get(key)
+                if pending is not None:
+                    sketch.merge(pending)
+                self._sketches[key] = sketch
+                previous = self._percentiles.get(key, (None, 0))
+                self._percentiles[key] = (sketch.quantile(0.9), sketch.count)
+                changed = changed or self._effective(previous) != self._effective(self._percentiles[key])
+            if changed:
+                self._version += 1
+        return len(merged)
+
+    def rebuild_from_jobs(self):
+        """
+        Reconstruit toutes les statistiques à partir des salaires de la table Job.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Returns:
+            int: Nombre de salaires pris en compte
+        """
+        with self._lock:
+            self._sketches = {}
+            self._percentiles = {}
+            self._deltas = {}
+            self._loaded = True
+            self._loaded_at = time.monotonic()
+            self._version += 1
+
+        SalaryStats.query.delete()
+        db.session.commit()
+
+        count = 0
+        rows = Job.query.with_entities(Job.title, Job.location, Job.salary).filter(Job.salary.isnot(None))
+        for title, location, salary in rows.yield_per(1000):
+            self.observe(title, location, salary)
+            count += 1
+
+        self.flush()
+        return count
+
+
+# Instance globale utilisée par le détecteur de fraude
+salary_stats = SalaryStatsTable()
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    app = create_app()
+    with app.app_context():
+        total = salary_stats.rebuild_from_jobs()
+        print(f"Statistiques de salaires reconstruites à partir de {total} offres")
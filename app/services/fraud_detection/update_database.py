@@ -6,6 +6,25 @@ import os
 import sys
 import sqlite3
 
+# Rend source_url unique : les doublons sont fusionnés dans l'offre la plus ancienne
+UNIQUE_SOURCE_URL_STATEMENTS = (
+    "CREATE TEMP TABLE job_duplicate AS "
+    "SELECT job.id AS id, kept.keep_id AS keep_id FROM job "
+    "JOIN (SELECT source_url, MIN(id) AS keep_id FROM job WHERE source_url IS NOT NULL "
+    "GROUP BY source_url HAVING COUNT(*) > 1) kept ON job.source_url = kept.source_url "
+    "WHERE job.id <> kept.keep_id",
+    "INSERT OR IGNORE INTO job_skills (job_id, skill_id) "
+    "SELECT d.keep_id, js.skill_id FROM job_skills js JOIN job_duplicate d ON js.job_id = d.id",
+    "INSERT OR IGNORE INTO history_jobs (history_id, job_id) "
+    "SELECT hj.history_id, d.keep_id FROM history_jobs hj JOIN job_duplicate d ON hj.job_id = d.id",
+    "DELETE FROM job_skills WHERE job_id IN (SELECT id FROM job_duplicate)",
+    "DELETE FROM history_jobs WHERE job_id IN (SELECT id FROM job_duplicate)",
+    "DELETE FROM job WHERE id IN (SELECT id FROM job_duplicate)",
+    "DROP TABLE job_duplicate",
+    "DROP INDEX IF EXISTS ix_job_source_url",
+    "CREATE UNIQUE INDEX ix_job_source_url ON job (source_url)",
+)
+
 def update_database():
     """
     Met à jour la base de données pour ajouter les colonnes de détection de fraude.
@@ -61,6 +80,43 @@ def update_database():
             print("Ajout de la colonne 'fraud_indicators'...")
             cursor.execute("ALTER TABLE job ADD COLUMN fraud_indicators TEXT")
 
+        if 'fraud_status' not in column_names:
+            print("Ajout de la colonne 'fraud_status'...")
+            cursor.execute("ALTER TABLE job ADD COLUMN fraud_status VARCHAR(20) DEFAULT 'scored'")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_fraud_status ON job (fraud_status)")
+
+        for column, ddl in (('fraud_claim', 'VARCHAR(32)'), ('fraud_retry_at', 'DATETIME'),
+                            ('fraud_attempts', 'INTEGER DEFAULT 0')):
+            if column not in column_names:
+                print(f"Ajout de la colonne '{column}'...")
+                cursor.execute(f"ALTER TABLE job ADD COLUMN {column} {ddl}")
+
+        if 'source' not in column_names:
+            print("Ajout de la colonne 'source'...")
+            cursor.execute("ALTER TABLE job ADD COLUMN source VARCHAR(50)")
+
+        if 'enriched_date' not in column_names:
+            print("Ajout de la colonne 'enriched_date'...")
+            cursor.execute("ALTER TABLE job ADD COLUMN enriched_date DATETIME")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_source_url ON job (source_url)")
+
+        if 'company_id' not in column_names:
+            print("Ajout de la colonne 'company_id'...")
+            cursor.execute("ALTER TABLE job ADD COLUMN company_id INTEGER REFERENCES company (id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS ix_job_company_id ON job (company_id)")
+
+        cursor.execute("PRAGMA table_info(scrape_task)")
+        scrape_task_columns = [column[1] for column in cursor.fetchall()]
+        if scrape_task_columns and 'updated_at' not in scrape_task_columns:
+            print("Ajout de la colonne 'updated_at' à la table 'scrape_task'...")
+            cursor.execute("ALTER TABLE scrape_task ADD COLUMN updated_at DATETIME")
+
+        cursor.execute("PRAGMA index_list(job)")
+        if not any(index[1] == 'ix_job_source_url' and index[2] for index in cursor.fetchall()):
+            print("Suppression des offres en double et index unique sur 'source_url'...")
+            for statement in UNIQUE_SOURCE_URL_STATEMENTS:
+                cursor.execute(statement)
+
         # Valider les modifications
         conn.commit()
         conn.close()
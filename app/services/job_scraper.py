@@ -5,50 +5,20 @@ import re
 import random
 import time
 import urllib.parse
+import concurrent.futures
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.job import Job
 from app.models.profile import Skill
-from app.services.fraud_detection import predict_job_fraud
+from app.services.fraud_detection import predict_jobs_fraud
+from app.services.fraud_detection.salary_stats import salary_stats
+from app.services.scraper.skill_matcher import get_skill_matcher
+# Nettoyage mémorisé, partagé avec les scrapers
+from app.services.scraper.utils import clean_company_name, parse_posted_date
+from app.services.company_service import company_resolver
 
-def clean_company_name(company_name):
-    """
-    Nettoie le nom d'une entreprise en supprimant les caractères spéciaux et les mots inutiles.
-
-    Args:
-        company_name (str): Nom de l'entreprise à nettoyer
-
-    Returns:
-        str: Nom de l'entreprise nettoyé
-    """
-    if not company_name:
-        return "Entreprise non spécifiée"
-
-    # Supprimer les caractères spéciaux et les mots inutiles
-    company_name = company_name.replace("·", "").replace("•", "").strip()
-    company_name = re.sub(r'\s+', ' ', company_name)  # Remplacer les espaces multiples par un seul espace
-
-    # Supprimer les suffixes courants
-    suffixes = [
-        r'\bSAS\b', r'\bSARL\b', r'\bSA\b', r'\bEURL\b', r'\bSNC\b', r'\bSCS\b', r'\bSCA\b',
-        r'\bInc\b', r'\bLLC\b', r'\bLtd\b', r'\bLimited\b', r'\bCorp\b', r'\bCorporation\b',
-        r'\bGmbH\b', r'\bAG\b', r'\bBV\b', r'\bPLC\b', r'\bSpA\b', r'\bOy\b', r'\bAB\b',
-        r'\bGroup\b', r'\bGroupe\b', r'\bHolding\b', r'\bConsulting\b', r'\bConsultants\b'
-    ]
-
-    for suffix in suffixes:
-        company_name = re.sub(suffix, '', company_name, flags=re.IGNORECASE)
-
-    # Supprimer les caractères spéciaux à la fin
-    company_name = re.sub(r'[,\.;:\-_]+$', '', company_name)
-
-    # Supprimer les espaces en début et fin
-    company_name = company_name.strip()
-
-    # Si le nom est vide après nettoyage, retourner une valeur par défaut
-    if not company_name:
-        return "Entreprise non spécifiée"
-
-    return company_name
+# Nombre d'offres enregistrées par transaction
+SAVE_BATCH_SIZE = 50
 
 def extract_salary_from_text(text):
     """
@@ -169,30 +139,11 @@ def extract_skills_from_description(description):
     Returns:
         list: Liste des compétences extraites
     """
-    # Liste de compétences techniques courantes
-    common_skills = [
-        # Langages de programmation
-        'Python', 'Java', 'JavaScript', 'C++', 'C#', 'PHP', 'Ruby', 'Swift', 'Kotlin', 'Go', 'Rust',
-        # Frameworks et bibliothèques
-        'React', 'Angular', 'Vue.js', 'Django', 'Flask', 'Spring', 'Laravel', 'Node.js', 'Express',
-        'TensorFlow', 'PyTorch', 'Scikit-learn', 'Pandas', 'NumPy',
-        # Bases de données
-        'SQL', 'MySQL', 'PostgreSQL', 'MongoDB', 'Oracle', 'SQLite', 'Redis', 'Elasticsearch',
-        # DevOps et Cloud
-        'Docker', 'Kubernetes', 'AWS', 'Azure', 'GCP', 'Jenkins', 'Git', 'CI/CD',
-        # Data Science et IA
-        'Machine Learning', 'Deep Learning', 'NLP', 'Computer Vision', 'Data Mining',
-        'Big Data', 'Hadoop', 'Spark', 'Data Visualization', 'Tableau', 'Power BI',
-        # Autres
-        'Agile', 'Scrum', 'REST API', 'GraphQL', 'Microservices', 'UX/UI', 'Responsive Design'
-    ]
-
-    found_skills = []
-    for skill in common_skills:
-        if re.search(r'\b' + re.escape(skill) + r'\b', description, re.IGNORECASE):
-            found_skills.append(skill)
+    if not description:
+        return []
 
-    return found_skills
+    # Même référentiel et même automate que les scrapers (voir scraper/skill_matcher.py)
+    return get_skill_matcher().find(description)
 
 def scrape_indeed_jobs(query='', location=''):
     """
@@ -357,84 +308,146 @@ def save_job_to_db(job_data):
     Returns:
         tuple: (Job, bool) L'objet Job créé ou mis à jour et un booléen indiquant si l'offre est nouvelle
     """
-    # Vérifier si l'offre existe déjà (par URL source)
-    existing_job = Job.query.filter_by(source_url=job_data['source_url']).first()
-
-    # Analyser l'offre pour détecter les fraudes
-    fraud_result = predict_job_fraud(job_data)
-
-    if existing_job:
-        # Mise à jour de l'offre existante
-        existing_job.title = job_data['title']
-        existing_job.company_name = job_data['company_name']
-        existing_job.company_logo = job_data['company_logo']
-        existing_job.description = job_data['description']
-        existing_job.location = job_data['location']
-        existing_job.salary = job_data['salary']
-        existing_job.work_type = job_data['work_type']
-        existing_job.education_required = job_data['education_required']
-        existing_job.experience_required = job_data['experience_required']
-        existing_job.benefits = job_data['benefits']
-        existing_job.application_link = job_data['application_link']
-        existing_job.scraped_date = datetime.now(timezone.utc)
-
-        # Mise à jour des informations de fraude (si les colonnes existent)
-        try:
-            if hasattr(existing_job, 'fraud_probability'):
-                existing_job.fraud_probability = fraud_result['fraud_probability']
-                existing_job.set_fraud_indicators(fraud_result['indicators'])
-        except Exception as e:
-            print(f"Avertissement: Impossible de mettre à jour les informations de fraude: {str(e)}")
-
-        # Mise à jour des compétences
-        existing_job.skills = []
-        for skill_name in job_data['skills']:
-            skill = Skill.query.filter_by(name=skill_name).first()
-            if not skill:
-                skill = Skill(name=skill_name)
-                db.session.add(skill)
-            existing_job.skills.append(skill)
-
-        db.session.commit()
-        return existing_job, False
-    else:
-        # Création d'une nouvelle offre
-        new_job = Job(
-            title=job_data['title'],
-            company_name=job_data['company_name'],
-            company_logo=job_data['company_logo'],
-            description=job_data['description'],
-            location=job_data['location'],
-            salary=job_data['salary'],
-            work_type=job_data['work_type'],
-            education_required=job_data['education_required'],
-            experience_required=job_data['experience_required'],
-            benefits=job_data['benefits'],
-            application_link=job_data['application_link'],
-            source_url=job_data['source_url'],
-            posted_date=datetime.now(timezone.utc),  # Dans une application réelle, on extrairait cette date du site
-            scraped_date=datetime.now(timezone.utc)
-        )
-
-        # Définir les informations de fraude (si les colonnes existent)
-        try:
-            if hasattr(new_job, 'fraud_probability'):
-                new_job.fraud_probability = fraud_result['fraud_probability']
-                new_job.set_fraud_indicators(fraud_result['indicators'])
-        except Exception as e:
-            print(f"Avertissement: Impossible de définir les informations de fraude: {str(e)}")
-
-        # Ajout des compétences
-        for skill_name in job_data['skills']:
-            skill = Skill.query.filter_by(name=skill_name).first()
-            if not skill:
-                skill = Skill(name=skill_name)
-                db.session.add(skill)
-            new_job.skills.append(skill)
-
-        db.session.add(new_job)
-        db.session.commit()
-        return new_job, True
+    return save_jobs_to_db([job_data])[0]
+
+def save_jobs_to_db(jobs_data):
+    """
+    Sauvegarde un lot d'offres d'emploi dans la base de données.
+
+    Les offres existantes et les compétences du lot sont chargées en une
+    requête chacune, et le lot est validé en une seule transaction. En cas
+    de conflit d'unicité avec un autre scraping, le lot est rejoué une fois.
+
+    Args:
+        jobs_data (list): Liste des données d'offres d'emploi
+
+    Returns:
+        list: Tuples (Job, bool) dans l'ordre du lot, le booléen indiquant si l'offre est nouvelle
+    """
+    if not jobs_data:
+        return []
+
+    # Analyser le lot pour détecter les fraudes en un seul appel au modèle
+    fraud_results = predict_jobs_fraud(jobs_data)
+
+    try:
+        return _write_jobs_to_db(jobs_data, fraud_results)
+    except IntegrityError:
+        # Un autre scraping a créé une compétence ou une offre du lot entre-temps
+        db.session.rollback()
+        print("Conflit d'enregistrement, nouvel essai du lot après relecture de la base")
+        return _write_jobs_to_db(jobs_data, fraud_results)
+
+def _write_jobs_to_db(jobs_data, fraud_results):
+    """
+    Charge ou crée les compétences et les offres d'un lot puis valide la transaction.
+
+    Args:
+        jobs_data (list): Liste des données d'offres d'emploi
+        fraud_results (list): Prédictions de fraude, dans l'ordre du lot
+
+    Returns:
+        list: Tuples (Job, bool) dans l'ordre du lot, le booléen indiquant si l'offre est nouvelle
+    """
+    # Entreprises canoniques du lot (validées à part : la résolution peut relire la base après un conflit)
+    companies = company_resolver.resolve_many({
+        job_data['company_name']: job_data.get('company_logo') for job_data in jobs_data
+    })
+
+    # Offres et compétences déjà en base pour ce lot
+    urls = {job_data['source_url'] for job_data in jobs_data}
+    existing_jobs = {job.source_url: job for job in Job.query.filter(Job.source_url.in_(urls)).all()}
+
+    skill_names = {name for job_data in jobs_data for name in job_data['skills']}
+    skills = {
+        skill.name: skill for skill in Skill.query.filter(Skill.name.in_(skill_names)).all()
+    } if skill_names else {}
+    for skill_name in skill_names - set(skills):
+        skills[skill_name] = Skill(name=skill_name)
+        db.session.add(skills[skill_name])
+
+    results = []
+    for job_data, fraud_result in zip(jobs_data, fraud_results):
+        company_id, company_name, company_logo = companies[job_data['company_name']]
+        company_logo = company_logo or job_data['company_logo']
+
+        existing_job = existing_jobs.get(job_data['source_url'])
+        if existing_job:
+            # Mise à jour de l'offre existante
+            existing_job.title = job_data['title']
+            existing_job.company_id = company_id
+            existing_job.company_name = company_name
+            existing_job.company_logo = company_logo
+            existing_job.description = job_data['description']
+            existing_job.location = job_data['location']
+            existing_job.salary = job_data['salary']
+            existing_job.work_type = job_data['work_type']
+            existing_job.education_required = job_data['education_required']
+            existing_job.experience_required = job_data['experience_required']
+            existing_job.benefits = job_data['benefits']
+            existing_job.application_link = job_data['application_link']
+            existing_job.scraped_date = datetime.now(timezone.utc)
+
+            # Mise à jour des informations de fraude (si les colonnes existent)
+            try:
+                if hasattr(existing_job, 'fraud_probability'):
+                    existing_job.fraud_probability = fraud_result['fraud_probability']
+                    existing_job.set_fraud_indicators(fraud_result['indicators'])
+            except Exception as e:
+                print(f"Avertissement: Impossible de mettre à jour les informations de fraude: {str(e)}")
+
+            # Mise à jour des compétences
+            existing_job.skills = [skills[skill_name] for skill_name in job_data['skills']]
+
+            results.append((existing_job, False))
+        else:
+            # Création d'une nouvelle offre
+            new_job = Job(
+                title=job_data['title'],
+                company_id=company_id,
+                company_name=company_name,
+                company_logo=company_logo,
+                description=job_data['description'],
+                location=job_data['location'],
+                salary=job_data['salary'],
+                work_type=job_data['work_type'],
+                education_required=job_data['education_required'],
+                experience_required=job_data['experience_required'],
+                benefits=job_data['benefits'],
+                application_link=job_data['application_link'],
+                source_url=job_data['source_url'],
+                # Date affichée sur la carte, à défaut la date du scraping
+                posted_date=job_data.get('posted_date') or datetime.now(timezone.utc),
+                scraped_date=datetime.now(timezone.utc)
+            )
+
+            # Définir les informations de fraude (si les colonnes existent)
+            try:
+                if hasattr(new_job, 'fraud_probability'):
+                    new_job.fraud_probability = fraud_result['fraud_probability']
+                    new_job.set_fraud_indicators(fraud_result['indicators'])
+            except Exception as e:
+                print(f"Avertissement: Impossible de définir les informations de fraude: {str(e)}")
+
+            # Ajout des compétences
+            new_job.skills = [skills[skill_name] for skill_name in job_data['skills']]
+
+            db.session.add(new_job)
+            # Une même URL peut apparaître deux fois dans le lot : la seconde met à jour la première
+            existing_jobs[new_job.source_url] = new_job
+            results.append((new_job, True))
+
+    # Valeurs lues avant la validation (les objets sont ensuite expirés)
+    salaries = [(job.title, job.location, job.salary) for job, is_new in results if is_new]
+
+    db.session.commit()
+
+    # Mettre à jour les statistiques de salaires une fois les offres enregistrées
+    # (un lot rejoué après un conflit n'est pas compté deux fois)
+    for title, location, salary in salaries:
+        salary_stats.observe(title, location, salary)
+    salary_stats.flush()
+    return results
 
 def generate_mock_jobs(query='', location='', count=20):
     """
@@ -824,6 +837,7 @@ def scrape_linkedin_jobs(query='', location=''):
                 # Extraire la date de publication
                 date_element = card.select_one('time.job-search-card__listdate') or card.select_one('time')
                 posted_date = date_element.get_text(strip=True) if date_element else "Récemment"
+                posted_at = (parse_posted_date(date_element.get('datetime')) or parse_posted_date(posted_date)) if date_element else None
 
                 # Extraire la description (snippet)
                 description = f"Offre pour le poste de {title} chez {company_name} à {location_val}. Publiée {posted_date}."
@@ -842,7 +856,8 @@ def scrape_linkedin_jobs(query='', location=''):
                     'benefits': 'Non spécifié',
                     'application_link': job_url,
                     'source_url': job_url,
-                    'skills': [query] if query else ['Non spécifié']
+                    'skills': [query] if query else ['Non spécifié'],
+                    'posted_date': posted_at
                 }
 
                 jobs.append(job)
@@ -959,6 +974,7 @@ def scrape_monster_jobs(query='', location=''):
                 # Extraire la date de publication
                 date_element = card.select_one('span.job-cardstyle__JobCardDate-sc-1mbmxes-5') or card.select_one('time')
                 posted_date = date_element.get_text(strip=True) if date_element else "Récemment"
+                posted_at = (parse_posted_date(date_element.get('datetime')) or parse_posted_date(posted_date)) if date_element else None
 
                 # Extraire la description (snippet)
                 description_element = card.select_one('span.job-cardstyle__JobCardSnippet-sc-1mbmxes-11') or card.select_one('p.job-card-snippet')
@@ -978,7 +994,8 @@ def scrape_monster_jobs(query='', location=''):
                     'benefits': 'Non spécifié',
                     'application_link': job_url,
                     'source_url': job_url,
-                    'skills': extract_skills_from_description(description) or [query] if query else ['Non spécifié']
+                    'skills': extract_skills_from_description(description) or [query] if query else ['Non spécifié'],
+                    'posted_date': posted_at
                 }
 
                 jobs.append(job)
@@ -1010,23 +1027,20 @@ def scrape_jobs(query='', location=''):
     """
     all_jobs = []
 
-    # Récupérer les offres depuis LinkedIn (priorité haute)
-    linkedin_jobs = scrape_linkedin_jobs(query, location)
-    if linkedin_jobs:
-        print(f"Trouvé {len(linkedin_jobs)} offres sur LinkedIn pour '{query}' à '{location}'.")
-        all_jobs.extend(linkedin_jobs)
-
-    # Récupérer les offres depuis Monster
-    monster_jobs = scrape_monster_jobs(query, location)
-    if monster_jobs:
-        print(f"Trouvé {len(monster_jobs)} offres sur Monster pour '{query}' à '{location}'.")
-        all_jobs.extend(monster_jobs)
-
-    # Récupérer les offres depuis Indeed
-    indeed_jobs = scrape_indeed_jobs(query, location)
-    if indeed_jobs:
-        print(f"Trouvé {len(indeed_jobs)} offres sur Indeed pour '{query}' à '{location}'.")
-        all_jobs.extend(indeed_jobs)
+    # Récupérer les offres de LinkedIn (priorité haute), Monster et Indeed en parallèle,
+    # en conservant cet ordre dans les résultats
+    sources = [
+        ('LinkedIn', scrape_linkedin_jobs),
+        ('Monster', scrape_monster_jobs),
+        ('Indeed', scrape_indeed_jobs)
+    ]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = [(label, executor.submit(scrape, query, location)) for label, scrape in sources]
+        for label, future in futures:
+            source_jobs = future.result()
+            if source_jobs:
+                print(f"Trouvé {len(source_jobs)} offres sur {label} pour '{query}' à '{location}'.")
+                all_jobs.extend(source_jobs)
 
     # Si on n'a pas assez d'offres, essayer Pôle Emploi
     if len(all_jobs) < 15:
@@ -1064,11 +1078,10 @@ def scrape_jobs(query='', location=''):
         print(f"Aucune offre réelle trouvée pour '{query}' à '{location}' après filtrage.")
         return 0
 
-    # Sauvegarder les offres en base de données
+    # Sauvegarder les offres en base de données, par lots
     new_jobs_count = 0
-    for job_data in filtered_jobs:
-        _, is_new = save_job_to_db(job_data)
-        if is_new:
-            new_jobs_count += 1
+    for start in range(0, len(filtered_jobs), SAVE_BATCH_SIZE):
+        results = save_jobs_to_db(filtered_jobs[start:start + SAVE_BATCH_SIZE])
+        new_jobs_count += sum(1 for _, is_new in results if is_new)
 
     return new_jobs_count
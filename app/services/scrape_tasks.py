@@ -0,0 +1,407 @@
+"""
+Exécution des rafraîchissements d'offres en arrière-plan.
+
+/jobs/refresh n'exécute plus le scraping dans la requête HTTP : il enregistre
+une tâche ScrapeTask et la confie à un pool de threads dédié. Le client suit
+l'avancement (par source) sur /jobs/refresh/<id>/status puis est redirigé
+vers les résultats. Les workers web restent disponibles quel que soit le
+nombre de scrapings en cours.
+
+La table scrape_task sert de file d'attente persistante : les tâches en
+attente sont reprises au démarrage. Une tâche en cours signale qu'elle est
+vivante (updated_at) toutes les HEARTBEAT_INTERVAL secondes ; sans signe de
+vie depuis STALE_AFTER secondes (processus arrêté ou tué), elle est remise en
+file par le prochain submit, run ou resume, quel que soit le processus.
+Plusieurs processus peuvent partager la file, une tâche n'étant réservée
+que par un seul d'entre eux.
+"""
+
+import json
+import time
+import logging
+import threading
+import concurrent.futures
+from datetime import datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import func
+
+from app import db
+from app.models.scrape_task import ScrapeTask
+from app.services.scraper.scraper_manager import get_scraper_manager
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Nombre de scrapings exécutés simultanément
+MAX_WORKERS = 2
+
+# Intervalle entre deux signes de vie d'une tâche en cours (secondes)
+HEARTBEAT_INTERVAL = 60
+
+# Une tâche 'running' sans signe de vie depuis plus longtemps est considérée comme interrompue (secondes)
+STALE_AFTER = 300
+
+# Délai minimal entre deux enregistrements de l'avancement (secondes)
+PROGRESS_INTERVAL = 1.0
+
+
+class TaskProgress:
+    """
+    Avancement d'une tâche, mis à jour par les threads des scrapers.
+    """
+
+    def __init__(self, app, task_id, sources):
+        """
+        Args:
+            app (Flask): Application utilisée pour le contexte de base de données
+            task_id (str): Identifiant de la tâche
+            sources (list): Noms des sources scrapées
+        """
+        self.app = app
+        self.task_id = task_id
+        self.sources = {name: {'state': 'queued', 'found': 0} for name in sources}
+        self.new_jobs_count = 0
+        self._last_write = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat = None
+
+    def start_heartbeat(self, interval=HEARTBEAT_INTERVAL):
+        """
+        Enregistre l'avancement à intervalle régulier, même sans nouvelle offre
+        (attente d'un scraping partagé, limitation de débit, enrichissement).
+
+        Args:
+            interval (float): Intervalle entre deux signes de vie (secondes)
+        """
+        def beat():
+            while not self._stop.wait(interval):
+                self.write(force=True)
+
+        self._heartbeat = threading.Thread(target=beat, name=f'scrape-task-heartbeat-{self.task_id}', daemon=True)
+        self._heartbeat.start()
+
+    def stop_heartbeat(self):
+        """Arrête les signes de vie périodiques."""
+        self._stop.set()
+        if self._heartbeat is not None:
+            self._heartbeat.join()
+            self._heartbeat = None
+
+    def update(self, source, state, found):
+        """
+        Met à jour l'avancement d'une source (appelé depuis le thread du scraper).
+
+        Args:
+            source (str): Nom de la source
+            state (str): 'running', 'done' ou 'failed'
+            found (int): Nombre d'offres trouvées jusqu'ici
+        """
+        with self._lock:
+            changed = self.sources.get(source, {}).get('state') != state
+            self.sources[source] = {'state': state, 'found': found}
+        # Les changements d'état sont enregistrés immédiatement, les compteurs au plus une fois par intervalle
+        self.write(force=changed)
+
+    def saved(self, new_jobs_count):
+        """
+        Enregistre le nombre de nouvelles offres après la sauvegarde d'un lot.
+
+        Args:
+            new_jobs_count (int): Nombre total de nouvelles offres ajoutées
+        """
+        with self._lock:
+            self.new_jobs_count = new_jobs_count
+        self.write()
+
+    def write(self, force=False):
+        """
+        Enregistre l'avancement dans la tâche.
+
+        Un contexte d'application propre est utilisé : la session de
+        l'appelant (et son lot d'offres en cours) n'est pas affectée.
+
+        Args:
+            force (bool): Si True, ignore le délai minimal entre deux enregistrements
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_write < PROGRESS_INTERVAL:
+                return
+            self._last_write = now
+            values = {
+                'progress': json.dumps(self.sources),
+                'new_jobs_count': self.new_jobs_count,
+                'updated_at': datetime.utcnow()
+            }
+
+        try:
+            with self.app.app_context():
+                ScrapeTask.query.filter_by(id=self.task_id).update(values)
+                db.session.commit()
+        except Exception as e:
+            logger.warning(f"Impossible d'enregistrer l'avancement de la tâche {self.task_id}: {str(e)}")
+
+
+class ScrapeTaskRunner:
+    """
+    Pool de threads exécutant les tâches de scraping.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, stale_after=STALE_AFTER):
+        """
+        Initialise le pool sans le démarrer.
+
+        Args:
+            max_workers (int): Nombre de scrapings exécutés simultanément
+            stale_after (int): Délai sans signe de vie au-delà duquel une tâche 'running' est reprise (secondes)
+        """
+        self.max_workers = max_workers
+        self.stale_after = stale_after
+        self._app = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def start(self, app, resume=True):
+        """
+        Démarre le pool (sans effet s'il est déjà démarré).
+
+        Args:
+            app (Flask): Application utilisée pour le contexte de base de données
+            resume (bool): Si True, reprend les tâches en attente de la file persistante
+        """
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._app = app
+            self._executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix='scrape-task'
+            )
+        if resume:
+            with app.app_context():
+                self.resume()
+
+    def stop(self, wait=False):
+        """
+        Arrête le pool. Les tâches non commencées restent dans la file persistante.
+
+        Args:
+            wait (bool): Si True, attend la fin des tâches en cours
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    @property
+    def running(self):
+        """Indique si le pool est démarré."""
+        return self._executor is not None
+
+    def submit(self, query, location, user_id=None):
+        """
+        Enregistre une tâche de scraping et la confie au pool.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Une recherche identique déjà en attente ou en cours est réutilisée ; une tâche
+        interrompue est d'abord remise dans le pool.
+
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            user_id (int, optional): Utilisateur à l'origine de la demande
+
+        Returns:
+            ScrapeTask: Tâche enregistrée
+        """
+        for task_id in self._requeue_stale():
+            self._enqueue(task_id)
+
+        task = ScrapeTask.query.filter(
+            ScrapeTask.search_query == query,
+            ScrapeTask.location_filter == location,
+            ScrapeTask.status.in_(('queued', 'running'))
+        ).order_by(ScrapeTask.created_at.desc()).first()
+        if task:
+            return task
+
+        task = ScrapeTask(search_query=query, location_filter=location, user_id=user_id)
+        db.session.add(task)
+        db.session.commit()
+
+        self._enqueue(task.id)
+        return task
+
+    def resume(self):
+        """
+        Reprend les tâches en attente et celles interrompues par un arrêt du processus.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Returns:
+            int: Nombre de tâches remises dans le pool
+        """
+        self._requeue_stale()
+
+        task_ids = [task_id for (task_id,) in db.session.query(ScrapeTask.id)
+                    .filter(ScrapeTask.status == 'queued').order_by(ScrapeTask.created_at.asc())]
+        for task_id in task_ids:
+            self._enqueue(task_id)
+        if task_ids:
+            logger.info(f"{len(task_ids)} tâche(s) de scraping reprise(s)")
+        return len(task_ids)
+
+    def _requeue_stale(self):
+        """
+        Remet en file les tâches 'running' sans signe de vie depuis stale_after secondes.
+        Doit être appelé dans un contexte d'application Flask.
+
+        Returns:
+            list: Identifiants des tâches remises en file
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self.stale_after)
+        stale = (ScrapeTask.status == 'running',
+                 func.coalesce(ScrapeTask.updated_at, ScrapeTask.started_at) < stale_before)
+        task_ids = [task_id for (task_id,) in db.session.query(ScrapeTask.id).filter(*stale)]
+        if not task_ids:
+            return []
+
+        # Condition répétée : une tâche qui a redonné signe de vie entre-temps n'est pas reprise
+        ScrapeTask.query.filter(ScrapeTask.id.in_(task_ids), *stale).update(
+            {'status': 'queued'}, synchronize_session=False
+        )
+        db.session.commit()
+        logger.warning(f"{len(task_ids)} tâche(s) de scraping interrompue(s) remise(s) en file")
+        return task_ids
+
+    def _enqueue(self, task_id):
+        """
+        Confie une tâche au pool (elle reste en file persistante si le pool est arrêté).
+
+        Args:
+            task_id (str): Identifiant de la tâche
+        """
+        executor = self._executor
+        if executor is None:
+            logger.warning(f"Pool de scraping arrêté : la tâche {task_id} reste en attente")
+            return
+        executor.submit(self._run, task_id)
+
+    def _claim(self, task_id):
+        """
+        Réserve une tâche en attente pour ce processus.
+
+        Args:
+            task_id (str): Identifiant de la tâche
+
+        Returns:
+            bool: True si la tâche a été réservée, False si un autre worker l'a prise
+        """
+        now = datetime.utcnow()
+        claimed = ScrapeTask.query.filter_by(id=task_id, status='queued').update(
+            {'status': 'running', 'started_at': now, 'updated_at': now}, synchronize_session=False
+        )
+        db.session.commit()
+        return claimed == 1
+
+    def run(self, query, location, max_pages=None, summary=None):
+        """
+        Enregistre et exécute une tâche de scraping dans le thread appelant.
+        Utilisé par le crawler planifié. Doit être appelé dans un contexte d'application Flask.
+
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages par site
+            summary (dict, optional): Reçoit les métriques du scraping par source
+                                      (voir ScraperManager.scrape_all)
+
+        Returns:
+            ScrapeTask ou None: Tâche exécutée, ou None si une recherche identique est déjà en cours
+        """
+        self._requeue_stale()
+
+        task = ScrapeTask.query.filter(
+            ScrapeTask.search_query == query,
+            ScrapeTask.location_filter == location,
+            ScrapeTask.status.in_(('queued', 'running'))
+        ).order_by(ScrapeTask.created_at.desc()).first()
+        if task is not None and task.status == 'running':
+            return None
+
+        # Une tâche identique en attente (ou interrompue) est exécutée ici plutôt que dupliquée
+        if task is None:
+            task = ScrapeTask(search_query=query, location_filter=location)
+            db.session.add(task)
+            db.session.commit()
+
+        task_id = task.id
+        if not self._claim(task_id):
+            # Réservée entre-temps par un autre worker
+            return None
+        self._execute(task_id, max_pages, summary)
+        return db.session.get(ScrapeTask, task_id)
+
+    def _run(self, task_id):
+        """
+        Exécute une tâche de scraping dans un thread du pool.
+
+        Args:
+            task_id (str): Identifiant de la tâche
+        """
+        with self._app.app_context():
+            try:
+                claimed = self._claim(task_id)
+            except Exception as e:
+                logger.error(f"Impossible de réserver la tâche de scraping {task_id}: {str(e)}")
+                return
+            if claimed:
+                self._execute(task_id)
+
+    def _execute(self, task_id, max_pages=None, summary=None):
+        """
+        Exécute une tâche réservée et enregistre son résultat.
+
+        Args:
+            task_id (str): Identifiant de la tâche
+            max_pages (int, optional): Nombre maximal de pages par site
+            summary (dict, optional): Reçoit les métriques du scraping par source
+        """
+        app = self._app or current_app._get_current_object()
+        try:
+            task = db.session.get(ScrapeTask, task_id)
+
+            manager = get_scraper_manager()
+            progress = TaskProgress(app, task_id, list(manager.scrapers))
+            progress.write(force=True)
+
+            progress.start_heartbeat()
+            try:
+                new_jobs_count, run_summary = manager.scrape_all(
+                    task.search_query, task.location_filter, max_pages=max_pages, progress=progress,
+                    with_summary=True
+                )
+            finally:
+                progress.stop_heartbeat()
+            if summary is not None:
+                summary.update(run_summary)
+
+            task = db.session.get(ScrapeTask, task_id)
+            task.status = 'done'
+            task.new_jobs_count = new_jobs_count
+            task.set_progress(progress.sources)
+        except Exception as e:
+            logger.error(f"Erreur lors de la tâche de scraping {task_id}: {str(e)}")
+            db.session.rollback()
+            task = db.session.get(ScrapeTask, task_id)
+            if task is None:
+                return
+            task.status = 'failed'
+            task.error = str(e)
+
+        task.finished_at = datetime.utcnow()
+        db.session.commit()
+
+
+# Instance globale utilisée par l'application
+scrape_task_runner = ScrapeTaskRunner()
@@ -0,0 +1,260 @@
+"""
+Sélecteurs CSS précompilés avec ordre de repli adaptatif.
+
+Chaque liste de sélecteurs de SCRAPER_CONFIG[...]['selectors'] est compilée
+une seule fois par scraper (soupsieve). Quand le sélecteur de tête échoue
+PROMOTE_AFTER_MISSES fois de suite alors qu'un sélecteur de repli trouve un
+élément, ce dernier passe en tête : après un changement de balisage d'un
+site, le sélecteur qui fonctionne est essayé en premier au lieu d'être
+atteint après tous les sélecteurs devenus inutiles. Un échec isolé du
+sélecteur spécifique (carte sans ce champ) ne fait pas passer devant lui un
+sélecteur générique. Les statistiques (nombre de succès, date du dernier
+succès, date de promotion) sont enregistrées sur disque pour que l'ordre
+survive aux redémarrages.
+
+Les cartes d'offres font exception : une même page peut mélanger plusieurs
+balisages (tests A/B des sites), elles sont donc cherchées avec tous les
+sélecteurs à la fois (select_all).
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+
+import soupsieve
+
+from app.config.scraper_config import state_path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Fichier de persistance des statistiques
+SELECTOR_STATS_PATH = os.environ.get('SCRAPER_SELECTOR_STATS', state_path('selector_stats.json'))
+
+# Échecs consécutifs du sélecteur de tête avant promotion d'un sélecteur de repli
+PROMOTE_AFTER_MISSES = 5
+
+
+class SelectorStatsStore:
+    """
+    Statistiques de succès des sélecteurs, par source et par champ.
+    """
+
+    def __init__(self, path=SELECTOR_STATS_PATH):
+        """
+        Args:
+            path (str): Fichier de persistance (None pour ne rien enregistrer)
+        """
+        self.path = path
+        self._data = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _ensure_loaded(self):
+        """
+        Charge les statistiques enregistrées au premier accès.
+        """
+        if self._data is not None:
+            return
+        with self._lock:
+            if self._data is not None:
+                return
+            data = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, encoding='utf-8') as f:
+                        data = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Impossible de lire les statistiques de sélecteurs {self.path}: {str(e)}")
+            self._data = data
+
+    def get(self, source, field):
+        """
+        Retourne les statistiques des sélecteurs d'un champ.
+
+        Args:
+            source (str): Nom de la source (ex: 'indeed')
+            field (str): Nom du champ (ex: 'title')
+
+        Returns:
+            dict: {sélecteur: {'hits': int, 'last_hit': float, 'promoted': float}}
+        """
+        self._ensure_loaded()
+        return dict(self._data.get(source, {}).get(field, {}))
+
+    def record(self, source, field, selector):
+        """
+        Enregistre un succès d'un sélecteur.
+
+        Args:
+            source (str): Nom de la source
+            field (str): Nom du champ
+            selector (str): Sélecteur ayant trouvé un élément
+        """
+        self._ensure_loaded()
+        with self._lock:
+            stats = self._data.setdefault(source, {}).setdefault(field, {}).setdefault(
+                selector, {'hits': 0, 'last_hit': 0}
+            )
+            stats['hits'] += 1
+            stats['last_hit'] = time.time()
+            self._dirty = True
+
+    def promote(self, source, field, selector):
+        """
+        Enregistre le passage d'un sélecteur en tête de sa liste.
+
+        Args:
+            source (str): Nom de la source
+            field (str): Nom du champ
+            selector (str): Sélecteur promu
+        """
+        self._ensure_loaded()
+        with self._lock:
+            stats = self._data.setdefault(source, {}).setdefault(field, {}).setdefault(
+                selector, {'hits': 0, 'last_hit': 0}
+            )
+            stats['promoted'] = time.time()
+            self._dirty = True
+
+    def save(self):
+        """
+        Enregistre les statistiques sur disque si elles ont changé (écriture atomique).
+        """
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            snapshot = json.dumps(self._data)
+            self._dirty = False
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(snapshot)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer les statistiques de sélecteurs {self.path}: {str(e)}")
+
+
+class AdaptiveSelector:
+    """
+    Liste de sélecteurs de repli compilés, le dernier sélecteur promu en tête.
+    """
+
+    def __init__(self, source, field, selectors, store):
+        """
+        Args:
+            source (str): Nom de la source
+            field (str): Nom du champ
+            selectors (list): Sélecteurs CSS dans l'ordre de la configuration
+            store (SelectorStatsStore): Statistiques persistantes
+        """
+        self.source = source
+        self.field = field
+        self.store = store
+
+        compiled = [(selector, soupsieve.compile(selector)) for selector in selectors]
+        # Ordre initial : dernier sélecteur promu d'abord, puis ordre de la configuration
+        stats = store.get(source, field)
+        self._order = sorted(compiled, key=lambda item: -stats.get(item[0], {}).get('promoted', 0))
+        # Tous les sélecteurs à la fois, résultats dans l'ordre du document (select_all)
+        self._union = soupsieve.compile(', '.join(selectors)) if selectors else None
+        # Échecs consécutifs du sélecteur de tête
+        self._misses = 0
+
+    @property
+    def selectors(self):
+        """Sélecteurs dans l'ordre où ils sont essayés."""
+        return [selector for selector, _ in self._order]
+
+    def _hit(self, index):
+        """
+        Enregistre le succès du sélecteur à la position donnée. Un sélecteur
+        de repli n'est placé en tête qu'après PROMOTE_AFTER_MISSES échecs
+        consécutifs du sélecteur de tête.
+
+        Args:
+            index (int): Position du sélecteur dans l'ordre courant
+        """
+        order = self._order
+        selector, compiled = order[index]
+        self.store.record(self.source, self.field, selector)
+        if not index:
+            self._misses = 0
+            return
+        self._misses += 1
+        if self._misses >= PROMOTE_AFTER_MISSES:
+            # Nouvelle liste plutôt que modification en place (lectures concurrentes)
+            self._order = [order[index]] + order[:index] + order[index + 1:]
+            self._misses = 0
+            self.store.promote(self.source, self.field, selector)
+            logger.info(f"Sélecteur '{selector}' placé en tête pour {self.source}.{self.field}")
+
+    def select_one(self, element):
+        """
+        Retourne le premier élément trouvé par l'un des sélecteurs.
+
+        Args:
+            element: Élément BeautifulSoup à interroger
+
+        Returns:
+            Élément BeautifulSoup ou None
+        """
+        if not element:
+            return None
+        for index, (_, compiled) in enumerate(self._order):
+            result = compiled.select_one(element)
+            if result:
+                self._hit(index)
+                return result
+        return None
+
+    def select(self, element):
+        """
+        Retourne les éléments trouvés par le premier sélecteur qui en trouve.
+
+        Args:
+            element: Élément BeautifulSoup à interroger
+
+        Returns:
+            tuple: (sélecteur utilisé ou None, liste des éléments)
+        """
+        if not element:
+            return None, []
+        for index, (selector, compiled) in enumerate(self._order):
+            results = compiled.select(element)
+            if results:
+                self._hit(index)
+                return selector, results
+        return None, []
+
+    def select_all(self, element):
+        """
+        Retourne les éléments trouvés par l'ensemble des sélecteurs, dans l'ordre du document.
+        Un élément contenu dans un autre élément trouvé n'est pas retourné.
+
+        Args:
+            element: Élément BeautifulSoup à interroger
+
+        Returns:
+            tuple: (sélecteurs ayant trouvé un élément, liste des éléments)
+        """
+        if not element or self._union is None:
+            return [], []
+        results = self._union.select(element)
+        found = {id(result) for result in results}
+        results = [result for result in results if not any(id(parent) in found for parent in result.parents)]
+
+        used = []
+        for selector, compiled in self._order:
+            if any(compiled.match(result) for result in results):
+                used.append(selector)
+                self.store.record(self.source, self.field, selector)
+        return used, results
+
+
+# Statistiques partagées par tous les scrapers
+selector_stats = SelectorStatsStore()
@@ -0,0 +1,216 @@
+"""
+Moteur de récupération asynchrone des pages.
+
+Alternative au mode par threads de ScraperManager : toutes les requêtes
+(plusieurs sources, plusieurs recherches) partagent une seule boucle
+d'événements et un seul pool de connexions aiohttp. Les limites de
+concurrence globale et par hôte remplacent un thread par requête.
+"""
+
+import asyncio
+import logging
+import urllib.parse
+
+import aiohttp
+
+from app.config.scraper_config import ASYNC_ENGINE_CONFIG
+from app.services.scraper.utils import check_robots_permission, async_rate_limit
+from app.services.scraper.http_cache import http_cache, decode_body
+from app.services.scraper.circuit_breaker import circuit_breaker
+from app.services.scraper import metrics
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+class AsyncFetchEngine:
+    """
+    Récupère des pages web de façon asynchrone avec des limites de concurrence.
+
+    S'utilise comme gestionnaire de contexte asynchrone :
+
+        async with AsyncFetchEngine() as engine:
+            html = await engine.fetch(url, headers)
+    """
+
+    def __init__(self, max_connections=None, max_per_host=None, timeout=None,
+                 retries=None, backoff_factor=None):
+        """
+        Initialise le moteur (la session HTTP est créée à l'entrée du contexte).
+
+        Args:
+            max_connections (int, optional): Nombre maximal de requêtes simultanées
+            max_per_host (int, optional): Nombre maximal de requêtes simultanées par hôte
+            timeout (float, optional): Délai maximal d'une requête (secondes)
+            retries (int, optional): Nombre de tentatives en cas d'échec
+            backoff_factor (float, optional): Facteur de temporisation entre les tentatives
+        """
+        config = ASYNC_ENGINE_CONFIG
+        self.max_connections = max_connections or config['max_connections']
+        self.max_per_host = max_per_host or config['max_per_host']
+        self.timeout = timeout or config['timeout']
+        self.retries = retries if retries is not None else config['retries']
+        self.backoff_factor = backoff_factor if backoff_factor is not None else config['backoff_factor']
+        self.status_forcelist = config['status_forcelist']
+
+        self._session = None
+        self._global_semaphore = None
+        self._host_semaphores = {}
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_per_host)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._global_semaphore = asyncio.Semaphore(self.max_connections)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self._session.close()
+        self._session = None
+
+    def _host_semaphore(self, host):
+        """
+        Retourne le sémaphore limitant les requêtes simultanées vers un hôte.
+
+        Args:
+            host (str): Nom d'hôte
+
+        Returns:
+            asyncio.Semaphore: Sémaphore de l'hôte
+        """
+        semaphore = self._host_semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._host_semaphores[host] = asyncio.Semaphore(self.max_per_host)
+        return semaphore
+
+    async def fetch(self, url, headers=None, rate_limit_config=None, cache_ttl=0, source=None, revalidate=False):
+        """
+        Récupère le contenu HTML d'une page.
+
+        Args:
+            url (str): URL à récupérer
+            headers (dict, optional): En-têtes HTTP
+            rate_limit_config (dict, optional): Configuration de limitation de débit de la source
+            cache_ttl (int): Durée minimale de fraîcheur des pages en cache (secondes)
+            source (str, optional): Nom de la source, dont le disjoncteur et les métriques comptent les requêtes
+            revalidate (bool): True pour interroger le site même si la page en cache est fraîche
+                (requête de test du disjoncteur)
+
+        Returns:
+            str ou None: Contenu de la page ou None en cas d'erreur
+        """
+        loop = asyncio.get_running_loop()
+        user_agent = (headers or {}).get('User-Agent', 'Mozilla/5.0')
+
+        # Une page fraîche est servie par le cache, sans requête ni consommation du débit
+        # (lecture et décompression sur disque : dans un thread, comme robots.txt)
+        entry = await loop.run_in_executor(None, http_cache.lookup, url)
+        if entry and entry.is_fresh(cache_ttl) and not revalidate:
+            http_cache.record_hit()
+            return entry.text
+
+        try:
+            # La lecture de robots.txt est bloquante : elle est faite dans un thread
+            allowed = await loop.run_in_executor(None, check_robots_permission, url, user_agent)
+            if not allowed:
+                logger.warning(f"Scraping non autorisé pour {url} selon robots.txt")
+                return None
+
+            # Appliquer la limitation de débit de l'hôte (partagée par tout le processus)
+            with metrics.timed(source or 'async', 'rate_limit'):
+                await async_rate_limit(rate_limit_config, url)
+
+            host = urllib.parse.urlparse(url).netloc
+            async with self._host_semaphore(host), self._global_semaphore:
+                with metrics.timed(source or 'async', 'fetch'):
+                    html = await self._get_with_retries(url, headers, entry)
+            metrics.incr(source or 'async', 'pages')
+            metrics.incr(source or 'async', 'bytes', len(html.encode('utf-8')))
+            return html
+
+        except Exception as e:
+            logger.error(f"Erreur lors de la récupération de {url}: {str(e)}")
+            metrics.incr(source or 'async', 'fetch_errors')
+            if source:
+                # Écriture SQLite (BEGIN IMMEDIATE, attente possible) : hors de la boucle d'événements
+                await loop.run_in_executor(None, circuit_breaker.record_error, source, e)
+            return None
+
+    async def _get_with_retries(self, url, headers, entry=None):
+        """
+        Effectue la requête GET en réessayant sur les erreurs réseau et serveur.
+
+        Args:
+            url (str): URL à récupérer
+            headers (dict): En-têtes HTTP
+            entry (CacheEntry, optional): Entrée du cache à revalider
+
+        Returns:
+            str: Contenu de la page
+        """
+        loop = asyncio.get_running_loop()
+        request_headers = dict(headers or {})
+        if entry:
+            request_headers.update(entry.conditional_headers())
+
+        for attempt in range(self.retries + 1):
+            try:
+                logger.info(f"Récupération de {url}")
+                async with self._session.get(url, headers=request_headers) as response:
+                    if entry and response.status == 304:
+                        await loop.run_in_executor(None, http_cache.touch, entry)
+                        http_cache.record_hit(revalidated=True)
+                        return entry.text
+                    if response.status in self.status_forcelist and attempt < self.retries:
+                        raise aiohttp.ClientResponseError(
+                            response.request_info, response.history, status=response.status
+                        )
+                    response.raise_for_status()
+                    body = await response.read()
+                    http_cache.record_miss()
+                    # Compression, écriture et éviction périodique du cache : dans un thread
+                    await loop.run_in_executor(None, http_cache.store, url, response.headers, body)
+                    return decode_body(body, response.headers)
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                retryable = not isinstance(e, aiohttp.ClientResponseError) or e.status in self.status_forcelist
+                if not retryable or attempt >= self.retries:
+                    raise
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+
+async def scrape_sources(scrapers, searches, engine=None, max_pages=None, crawls=None):
+    """
+    Scrape plusieurs recherches sur plusieurs sources dans une seule boucle d'événements.
+
+    Args:
+        scrapers (dict): Dictionnaire {nom: scraper}
+        searches (list): Liste de tuples (terme de recherche, lieu)
+        engine (AsyncFetchEngine, optional): Moteur à utiliser. Si None, un moteur est créé.
+        max_pages (int, optional): Nombre maximal de pages par source
+        crawls (list, optional): Reçoit les parcours terminés, dont la marque avance après l'enregistrement
+
+    Returns:
+        list: Liste de toutes les offres d'emploi scrapées
+    """
+    if engine is None:
+        async with AsyncFetchEngine() as engine:
+            return await scrape_sources(scrapers, searches, engine, max_pages, crawls)
+
+    tasks = []
+    for query, location in searches:
+        for name, scraper in scrapers.items():
+            tasks.append((name, scraper.async_scrape(query, location, engine, max_pages, crawls=crawls)))
+
+    results = await asyncio.gather(*(task for _, task in tasks), return_exceptions=True)
+
+    all_jobs = []
+    for (name, _), result in zip(tasks, results):
+        if isinstance(result, Exception):
+            logger.error(f"Erreur avec le scraper {name}: {str(result)}")
+            continue
+        logger.info(f"Scraper {name}: {len(result)} offres trouvées")
+        all_jobs.extend(result)
+
+    return all_jobs
@@ -2,16 +2,24 @@
 Classe de base pour les scrapers d'offres d'emploi.
 """
 
+import asyncio
 import logging
+import threading
+import concurrent.futures
 from abc import ABC, abstractmethod
 from datetime import datetime, timezone
-from bs4 import BeautifulSoup
 
 from app.services.scraper.utils import (
     create_session, safe_select, check_robots_permission, 
     check_blocked, rate_limit, format_url, extract_salary,
-    extract_experience, extract_skills, clean_company_name
+    extract_experience, extract_skills, clean_company_name, parse_posted_date
 )
+from app.services.scraper.http_cache import http_cache
+from app.services.scraper.html_parser import PageParser
+from app.services.scraper.adaptive_selectors import AdaptiveSelector, selector_stats
+from app.services.scraper.circuit_breaker import circuit_breaker, BLOCKED, HALF_OPEN
+from app.services.scraper.high_water import IncrementalCrawl
+from app.services.scraper import metrics
 
 # Configuration du logger
 logger = logging.getLogger('scraper')
@@ -29,22 +37,177 @@ class BaseScraper(ABC):
             config (dict): Configuration du scraper
         """
         self.config = config
-        self.session = create_session()
+        self.session = create_session(cache_ttl=config.get('cache_ttl', 0))
         self.name = "base"  # À surcharger dans les classes dérivées
+        self.label = "Base"  # Nom affiché dans les logs
+        self.default_location = "France"  # Lieu utilisé si aucun lieu n'est fourni
+        # Parseur limité aux cartes d'offres de la source
+        self.page_parser = PageParser(config.get('selectors', {}).get('cards'))
+        # Parseur des pages d'offres, limité à la description complète
+        self.detail_parser = PageParser(config.get('selectors', {}).get('detail_description'))
+        self._compiled_selectors = None
+        # Le scraper est partagé par les threads du gestionnaire (voir get_scraper_manager)
+        self._compile_lock = threading.Lock()
         
-    @abstractmethod
-    def scrape(self, query, location):
+    @property
+    def compiled_selectors(self):
+        """
+        Sélecteurs de la configuration compilés une seule fois, indexés par champ.
+        La compilation est faite au premier accès, quand self.name est défini.
+        """
+        if self._compiled_selectors is None:
+            self._compile_selectors()
+        return self._compiled_selectors
+        
+    def _compile_selectors(self):
+        """
+        Compile les sélecteurs de la configuration et indexe les listes d'origine.
+        Une seule compilation même si plusieurs threads utilisent le scraper.
+        """
+        with self._compile_lock:
+            if self._compiled_selectors is not None:
+                return
+            selectors_config = self.config.get('selectors', {})
+            compiled = {
+                field: AdaptiveSelector(self.name, field, selectors, selector_stats)
+                for field, selectors in selectors_config.items()
+            }
+            # Index des listes de la configuration, pour _extract_text et _extract_attribute
+            self._selectors_by_list = {
+                tuple(selectors): compiled[field] for field, selectors in selectors_config.items()
+            }
+            self._compiled_selectors = compiled
+        
+    def close(self):
+        """
+        Ferme la session HTTP du scraper et ses connexions persistantes.
+        """
+        self.session.close()
+        
+    def scrape(self, query, location, max_pages=None, incremental=True):
         """
-        Méthode abstraite à implémenter dans les classes dérivées.
+        Scrape les offres d'emploi du site.
         
         Args:
             query (str): Terme de recherche
             location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages de résultats
+            incremental (bool): False pour produire aussi les offres déjà vues (voir iter_jobs)
             
         Returns:
             list: Liste des offres d'emploi scrapées
         """
-        pass
+        return list(self.iter_jobs(query, location, max_pages, incremental))
+        
+    def iter_jobs(self, query, location, max_pages=None, incremental=True, crawls=None):
+        """
+        Parcourt les pages de résultats et produit les offres au fur et à mesure.
+        
+        La page suivante est récupérée dans un thread pendant l'analyse de la
+        page courante : seules deux pages sont en mémoire à un instant donné.
+        Sur une source triée par date, les offres déjà vues lors des parcours
+        précédents sont écartées et la pagination s'arrête dès qu'elles sont
+        atteintes (voir high_water.py). Quand une marque existe, les pages sont
+        récupérées une à une : aucune page au-delà des offres connues n'est
+        demandée, ni décomptée de la limitation de débit.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages. Par défaut, celui de la configuration.
+            incremental (bool): False pour un parcours complet, sans tenir compte des offres déjà vues
+            crawls (list, optional): Reçoit le parcours terminé au lieu de faire avancer la marque :
+                                     l'appelant appelle commit() une fois les offres enregistrées
+            
+        Yields:
+            dict: Données d'une offre d'emploi
+        """
+        max_pages = max_pages or self.pagination.get('max_pages', 1)
+        page_size = self.pagination.get('page_size', 20)
+        seen_urls = set()
+        crawl = IncrementalCrawl(self.name, query, location, self.pagination.get('newest_first', False), incremental)
+        # Avec une marque, la page courante peut être la dernière : pas de récupération anticipée
+        prefetch = not crawl.sequential
+        
+        try:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                query, url = self._search_url(query, location, 0)
+                # Les métriques de la page suivante restent rattachées au scraping en cours
+                fetch = metrics.in_context(self._fetch_html)
+                future = executor.submit(fetch, url)
+            
+                for page in range(max_pages):
+                    html = future.result()
+                    if not html:
+                        logger.error(f"Impossible de récupérer la page {self.label}: {url}")
+                        return
+                    
+                    # Lancer la récupération de la page suivante avant d'analyser celle-ci
+                    current_url = url
+                    has_next = page + 1 < max_pages
+                    if has_next and prefetch:
+                        _, url = self._search_url(query, location, page + 1)
+                        future = executor.submit(fetch, url)
+                    
+                    soup = self._parse_page(html, current_url)
+                    if not soup:
+                        return
+                    
+                    jobs, card_count = self._build_jobs(soup, query, location, current_url, with_count=True)
+                    # Les résultats peuvent se décaler d'une page à l'autre
+                    page_jobs = self._unseen(jobs, seen_urls)
+                    new_jobs, reached = crawl.filter_page(page_jobs)
+                    yield from new_jobs
+                    
+                    # Dernière page : moins de cartes que prévu, aucune offre nouvelle
+                    # ou offres déjà vues lors d'un parcours précédent
+                    if card_count < page_size or not page_jobs or reached:
+                        if has_next and prefetch:
+                            future.cancel()
+                        break
+                    
+                    if has_next and not prefetch:
+                        _, url = self._search_url(query, location, page + 1)
+                        future = executor.submit(fetch, url)
+                    
+            # Parcours terminé sans erreur : la marque de la recherche peut avancer
+            self._finish_crawl(crawl, crawls)
+        finally:
+            # Enregistrer l'ordre des sélecteurs une fois par scraping, pas à chaque page
+            selector_stats.save()
+        
+    @staticmethod
+    def _finish_crawl(crawl, crawls=None):
+        """
+        Fait avancer la marque d'un parcours terminé, ou la confie à l'appelant.
+        
+        Args:
+            crawl (IncrementalCrawl): Parcours terminé
+            crawls (list, optional): Parcours dont la marque avancera après l'enregistrement des offres
+        """
+        if crawls is None:
+            crawl.commit()
+        else:
+            crawls.append(crawl)
+        
+    @staticmethod
+    def _unseen(jobs, seen_urls):
+        """
+        Retourne les offres dont l'URL n'a pas encore été vue pendant le parcours, et les marque comme vues.
+        
+        Args:
+            jobs (list): Offres d'une page
+            seen_urls (set): URLs déjà vues (mis à jour)
+            
+        Returns:
+            list: Offres jamais vues, dans l'ordre de la page
+        """
+        unseen = []
+        for job in jobs:
+            if job.get('source_url') not in seen_urls:
+                seen_urls.add(job.get('source_url'))
+                unseen.append(job)
+        return unseen
         
     def _get_page(self, url):
         """
@@ -56,6 +219,29 @@ class BaseScraper(ABC):
         Returns:
             BeautifulSoup ou None: Objet BeautifulSoup de la page ou None en cas d'erreur
         """
+        html = self._fetch_html(url)
+        return self._parse_page(html, url) if html else None
+        
+    def _fetch_html(self, url, detail=False):
+        """
+        Récupère le contenu HTML d'une page (robots.txt, limitation de débit et cache compris).
+        
+        Args:
+            url (str): URL à récupérer
+            detail (bool): True pour une page d'offre (budget de requêtes 'detail_rate_limit')
+            
+        Returns:
+            str ou None: Contenu de la page ou None en cas d'erreur
+        """
+        # Site connu pour nous bloquer : pas de requête ni de pause de limitation de débit
+        state = circuit_breaker.check(self.name)
+        if state is None:
+            logger.warning(f"Disjoncteur ouvert pour {self.label}, requête ignorée: {url}")
+            return None
+        # Requête de test du disjoncteur : le site doit répondre, pas le cache
+        probe = state == HALF_OPEN
+        headers = dict(self.config['headers'], **{'Cache-Control': 'no-cache'}) if probe else self.config['headers']
+            
         try:
             # Vérifier si le scraping est autorisé
             user_agent = self.config['headers'].get('User-Agent', 'Mozilla/5.0')
@@ -63,28 +249,288 @@ class BaseScraper(ABC):
                 logger.warning(f"Scraping non autorisé pour {url} selon robots.txt")
                 return None
                 
-            # Appliquer la limitation de débit
-            rate_limit(self.config.get('rate_limit'))
+            # Appliquer la limitation de débit (inutile si la page est servie par le cache)
+            if probe or not self._is_cached(url):
+                with metrics.timed(self.name, 'rate_limit'):
+                    if detail:
+                        rate_limit(self.config.get('detail_rate_limit', self.config.get('rate_limit')), url, 'detail')
+                    else:
+                        rate_limit(self.config.get('rate_limit'), url)
                 
             # Effectuer la requête
             logger.info(f"Récupération de {url}")
-            response = self.session.get(url, headers=self.config['headers'], timeout=10)
-            response.raise_for_status()
-            
-            # Parser la page
-            soup = BeautifulSoup(response.text, 'html.parser')
+            with metrics.timed(self.name, 'detail_fetch' if detail else 'fetch'):
+                response = self.session.get(url, headers=headers, timeout=10)
+                response.raise_for_status()
+            metrics.incr(self.name, 'detail_pages' if detail else 'pages')
+            metrics.incr(self.name, 'bytes', len(response.content))
             
-            # Vérifier si nous sommes bloqués
-            if check_blocked(soup, url):
-                logger.error(f"Accès bloqué pour {url}")
-                return None
-                
-            return soup
+            return response.text
             
         except Exception as e:
             logger.error(f"Erreur lors de la récupération de {url}: {str(e)}")
+            metrics.incr(self.name, 'fetch_errors')
+            # 429, 403 et délais dépassés comptent pour le disjoncteur de la source
+            circuit_breaker.record_error(self.name, e)
+            return None
+            
+    def _is_cached(self, url):
+        """
+        Indique si une page peut être servie par le cache HTTP sans requête.
+        
+        Args:
+            url (str): URL de la page
+            
+        Returns:
+            bool: True si la page est en cache et encore fraîche
+        """
+        # Métadonnées seules : le contenu est lu une seule fois, par l'adaptateur de la session
+        entry = http_cache.lookup(url, load_body=False)
+        return entry is not None and entry.is_fresh(self.config.get('cache_ttl', 0))
+        
+    def _parse_page(self, html, url):
+        """
+        Parse le HTML d'une page (cartes d'offres uniquement) et vérifie que l'accès n'est pas bloqué.
+        
+        Args:
+            html (str): Contenu HTML de la page
+            url (str): URL de la page
+            
+        Returns:
+            BeautifulSoup ou None: Objet BeautifulSoup de la page ou None si l'accès est bloqué
+        """
+        with metrics.timed(self.name, 'parse'):
+            soup = self.page_parser.parse(html, self.compiled_selectors['cards'].selectors)
+            blocked = check_blocked(soup, url)
+        
+        # Vérifier si nous sommes bloqués
+        if blocked:
+            logger.error(f"Accès bloqué pour {url}")
+            metrics.incr(self.name, 'blocked')
+            circuit_breaker.record_failure(self.name, BLOCKED)
             return None
             
+        circuit_breaker.record_success(self.name)
+        return soup
+        
+    @property
+    def pagination(self):
+        """Configuration de la pagination de la source (param, first, step, page_size, max_pages, newest_first)."""
+        return self.config.get('pagination', {})
+        
+    def _search_url(self, query, location, page=0):
+        """
+        Construit l'URL d'une page de résultats du site.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            page (int): Numéro de la page (à partir de 0)
+            
+        Returns:
+            tuple: (terme de recherche effectif, URL de recherche)
+        """
+        if not query:
+            query = "développeur"
+            
+        params = dict(self.config['params'])
+        pagination = self.pagination
+        if pagination.get('param'):
+            page_size = pagination.get('page_size', 20)
+            if pagination.get('format'):
+                # Pagination par plage de résultats (ex: "0-19")
+                value = pagination['format'].format(start=page * page_size, end=(page + 1) * page_size - 1)
+            else:
+                value = pagination.get('first', 0) + page * pagination.get('step', 1)
+            params[pagination['param']] = str(value)
+            
+        url = format_url(
+            self.config['base_url'],
+            params,
+            query,
+            location if location else self.default_location
+        )
+        return query, url
+        
+    def _build_jobs(self, soup, query, location, url, with_count=False):
+        """
+        Extrait les offres d'une page de résultats déjà récupérée.
+        
+        Args:
+            soup (BeautifulSoup): Page de résultats
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            url (str): URL de la page
+            with_count (bool): Si True, retourne aussi le nombre de cartes de la page
+            
+        Returns:
+            list ou tuple: Liste des offres extraites (et nombre de cartes si with_count)
+        """
+        job_cards = self._extract_job_cards(soup)
+        logger.info(f"Trouvé {len(job_cards)} offres d'emploi sur {self.label}")
+        
+        jobs = []
+        # Toutes les cartes de la page sont traitées : les doublons entre pages
+        # (décalage des résultats) sont écartés par iter_jobs
+        for i, card in enumerate(job_cards):
+            try:
+                with metrics.timed(self.name, 'build'):
+                    job_data = self._build_job_data(card, query, location, url)
+                if job_data:
+                    jobs.append(job_data)
+            except Exception as e:
+                logger.error(f"Erreur lors de l'extraction de l'offre {self.label} {i+1}: {str(e)}")
+                metrics.incr(self.name, 'build_errors')
+        metrics.incr(self.name, 'jobs', len(jobs))
+        
+        return (jobs, len(job_cards)) if with_count else jobs
+        
+    async def async_scrape(self, query, location, engine, max_pages=None, incremental=True, crawls=None):
+        """
+        Scrape les offres d'emploi du site avec le moteur asynchrone.
+        
+        Les pauses entre requêtes sont gérées par le moteur : aucune pause
+        n'est faite entre les cartes d'une même page. Comme pour iter_jobs,
+        la page suivante est demandée avant l'analyse de la page courante
+        (sauf quand une marque peut arrêter la pagination) et les offres déjà vues lors des parcours précédents sont écartées.
+        L'analyse des pages et les accès bloquants (disjoncteur, marques, statistiques
+        de sélecteurs) sont faits dans un thread : la boucle d'événements continue
+        de servir les requêtes des autres sources pendant ce temps.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            engine (AsyncFetchEngine): Moteur de récupération asynchrone
+            max_pages (int, optional): Nombre maximal de pages. Par défaut, celui de la configuration.
+            incremental (bool): False pour un parcours complet, sans tenir compte des offres déjà vues
+            crawls (list, optional): Reçoit le parcours terminé au lieu de faire avancer la marque (voir iter_jobs)
+            
+        Returns:
+            list: Liste des offres d'emploi scrapées
+        """
+        max_pages = max_pages or self.pagination.get('max_pages', 1)
+        page_size = self.pagination.get('page_size', 20)
+        loop = asyncio.get_running_loop()
+        
+        def in_thread(fn, *args):
+            # Les métriques restent rattachées au scraping en cours
+            return loop.run_in_executor(None, metrics.in_context(fn), *args)
+            
+        def process_page(html, page_url):
+            soup = self._parse_page(html, page_url)
+            if not soup:
+                return None
+            return self._build_jobs(soup, query, location, page_url, with_count=True)
+            
+        crawl = await in_thread(
+            IncrementalCrawl, self.name, query, location, self.pagination.get('newest_first', False), incremental
+        )
+        
+        async def fetch_page(page_url):
+            state = await in_thread(circuit_breaker.check, self.name)
+            if state is None:
+                logger.warning(f"Disjoncteur ouvert pour {self.label}, requête ignorée: {page_url}")
+                return None
+            return await engine.fetch(
+                page_url, self.config['headers'], self.config.get('rate_limit'), self.config.get('cache_ttl', 0),
+                source=self.name, revalidate=state == HALF_OPEN
+            )
+            
+        def fetch(page_url):
+            return asyncio.ensure_future(fetch_page(page_url))
+            
+        query, url = self._search_url(query, location, 0)
+        task = fetch(url)
+        all_jobs, seen_urls = [], set()
+        # Avec une marque, la page courante peut être la dernière : pas de récupération anticipée
+        prefetch = not crawl.sequential
+        
+        try:
+            for page in range(max_pages):
+                html = await task
+                task, current_url = None, url
+                has_next = page + 1 < max_pages
+                if html and has_next and prefetch:
+                    _, url = self._search_url(query, location, page + 1)
+                    task = fetch(url)
+                    
+                processed = await in_thread(process_page, html, current_url) if html else None
+                if not processed:
+                    logger.error(f"Impossible de récupérer la page {self.label}: {current_url}")
+                    return all_jobs
+                    
+                jobs, card_count = processed
+                page_jobs = self._unseen(jobs, seen_urls)
+                new_jobs, reached = crawl.filter_page(page_jobs)
+                all_jobs.extend(new_jobs)
+                
+                # Dernière page : moins de cartes que prévu, aucune offre nouvelle
+                # ou offres déjà vues lors d'un parcours précédent
+                if card_count < page_size or not page_jobs or reached:
+                    break
+                    
+                if has_next and not prefetch:
+                    _, url = self._search_url(query, location, page + 1)
+                    task = fetch(url)
+            # Parcours terminé sans erreur : la marque de la recherche peut avancer
+            await in_thread(self._finish_crawl, crawl, crawls)
+        finally:
+            # Arrêt anticipé : abandonner la page suivante déjà demandée
+            if task is not None and not task.done():
+                task.cancel()
+            # Enregistrer l'ordre des sélecteurs une fois par scraping, pas à chaque page
+            await in_thread(selector_stats.save)
+                
+        return all_jobs
+            
+    def enrich_job(self, job, min_length=0):
+        """
+        Complète une offre avec la description complète de sa page et relance l'extraction
+        (compétences, expérience, niveau d'études).
+        
+        Args:
+            job (dict): Données de l'offre d'emploi
+            min_length (int): Longueur en dessous de laquelle la description est un simple extrait
+            
+        Returns:
+            dict: Offre enrichie (marquée 'enriched'), ou l'offre d'origine si la page est inexploitable
+        """
+        selectors = self.config.get('selectors', {}).get('detail_description')
+        if not selectors or not job.get('source_url'):
+            return job
+        if min_length and len(job.get('description') or '') >= min_length:
+            return job
+            
+        html = self._fetch_html(job['source_url'], detail=True)
+        if not html:
+            return job
+            
+        soup = self.detail_parser.parse(html)
+        if check_blocked(soup, job['source_url']):
+            logger.error(f"Accès bloqué pour {job['source_url']}")
+            metrics.incr(self.name, 'blocked')
+            circuit_breaker.record_failure(self.name, BLOCKED)
+            return job
+        circuit_breaker.record_success(self.name)
+            
+        element = self._select_one(soup, selectors)
+        description = element.get_text(' ', strip=True) if element else ''
+        if len(description) <= len(job.get('description') or ''):
+            return job
+            
+        enriched = dict(job)
+        enriched['description'] = description
+        skills = extract_skills(description)
+        if skills:
+            enriched['skills'] = skills
+        experience = extract_experience(description)
+        if experience is not None:
+            enriched['experience_required'] = experience
+        if hasattr(self, '_extract_education_level'):
+            enriched['education_required'] = self._extract_education_level(description)
+        enriched['enriched'] = True
+        return enriched
+        
     def _extract_job_cards(self, soup):
         """
         Extrait les cartes d'offres d'emploi d'une page.
@@ -98,17 +544,38 @@ class BaseScraper(ABC):
         if not soup:
             return []
             
-        selectors = self.config['selectors']['cards']
-        
-        for selector in selectors:
-            cards = soup.select(selector)
-            if cards:
-                logger.info(f"Trouvé {len(cards)} offres avec le sélecteur '{selector}'")
-                return cards
-                
-        logger.warning(f"Aucune offre trouvée avec les sélecteurs {selectors}")
+        # Une page peut mélanger plusieurs balisages de cartes : tous les sélecteurs sont appliqués
+        with metrics.timed(self.name, 'extract'):
+            selectors, cards = self.compiled_selectors['cards'].select_all(soup)
+        if cards:
+            logger.info(f"Trouvé {len(cards)} offres avec les sélecteurs {selectors}")
+            metrics.incr(self.name, 'cards', len(cards))
+            return cards
+            
+        logger.warning(f"Aucune offre trouvée avec les sélecteurs {self.config['selectors']['cards']}")
+        metrics.incr(self.name, 'card_selector_misses')
         return []
         
+    def _select_one(self, element, selectors):
+        """
+        Applique une liste de sélecteurs, compilée si elle provient de la configuration.
+        
+        Args:
+            element: Élément BeautifulSoup à interroger
+            selectors (list): Liste de sélecteurs CSS
+            
+        Returns:
+            Élément BeautifulSoup ou None: Premier élément trouvé
+        """
+        if self._compiled_selectors is None:
+            self._compile_selectors()
+        compiled = self._selectors_by_list.get(tuple(selectors))
+        result = safe_select(element, selectors) if compiled is None else compiled.select_one(element)
+        if result is None:
+            # Champ absent de la carte : la valeur par défaut sera utilisée
+            metrics.incr(self.name, 'field_selector_misses')
+        return result
+        
     def _extract_text(self, element, selectors, default=""):
         """
         Extrait le texte d'un élément en utilisant plusieurs sélecteurs.
@@ -121,7 +588,7 @@ class BaseScraper(ABC):
         Returns:
             str: Texte extrait ou valeur par défaut
         """
-        result = safe_select(element, selectors)
+        result = self._select_one(element, selectors)
         return result.get_text(strip=True) if result else default
         
     def _extract_attribute(self, element, selectors, attribute, default=""):
@@ -137,9 +604,28 @@ class BaseScraper(ABC):
         Returns:
             str: Attribut extrait ou valeur par défaut
         """
-        result = safe_select(element, selectors)
+        result = self._select_one(element, selectors)
         return result.get(attribute, default) if result else default
-        
+
+    def _extract_posted_date(self, element, selectors, default=""):
+        """
+        Extrait la date de publication d'une carte (attribut datetime en priorité, sinon texte affiché).
+
+        Args:
+            element: Élément BeautifulSoup
+            selectors (list): Liste de sélecteurs CSS
+            default (str): Texte par défaut si aucun élément n'est trouvé
+
+        Returns:
+            tuple: (texte affiché, date de publication UTC ou None)
+        """
+        result = self._select_one(element, selectors)
+        if not result:
+            return default, None
+        text = result.get_text(strip=True)
+        return text, parse_posted_date(result.get('datetime')) or parse_posted_date(text)
+
+    @abstractmethod
     def _build_job_data(self, card, query, location, base_url):
         """
         Construit un dictionnaire de données d'offre d'emploi à partir d'une carte.
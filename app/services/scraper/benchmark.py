@@ -0,0 +1,184 @@
+"""
+Mesure du débit de parsing sur le corpus de pages enregistrées.
+
+Chaque page du corpus (voir fixtures.py) est traitée par le scraper de sa
+source exactement comme une page récupérée en direct : parsing limité aux
+cartes, extraction des cartes puis construction des offres. Les pages d'une
+source sans scraper (ex: google_jobs) sont passées à tous les scrapers et
+mesurent le coût d'une page sans carte exploitable.
+
+Aucune requête réseau n'est faite : les écarts entre deux exécutions
+viennent du code de parsing, du moteur choisi ou des pages du corpus.
+
+Utilisation :
+    python -m app.services.scraper.benchmark [--source indeed] [--repeat 5] [--backend lxml] [--json]
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import tracemalloc
+
+from app.services.scraper.indeed_scraper import IndeedScraper
+from app.services.scraper.linkedin_scraper import LinkedInScraper
+from app.services.scraper.monster_scraper import MonsterScraper
+from app.services.scraper.pole_emploi_scraper import PoleEmploiScraper
+from app.services.scraper.html_parser import PageParser
+from app.services.scraper.fixtures import FIXTURES_DIR, iter_fixtures
+
+# Scrapers mesurés, indexés comme dans ScraperManager
+SCRAPERS = {
+    'indeed': IndeedScraper,
+    'linkedin': LinkedInScraper,
+    'monster': MonsterScraper,
+    'pole_emploi': PoleEmploiScraper
+}
+
+
+def _parse_fixture(scraper, entry, html):
+    """
+    Traite une page comme _parse_page puis _build_jobs, sans détection de blocage ni statistiques.
+
+    Args:
+        scraper (BaseScraper): Scraper de la source
+        entry (dict): Entrée du manifeste
+        html (str): Contenu HTML de la page
+
+    Returns:
+        tuple: (nombre de cartes, nombre d'offres construites)
+    """
+    soup = scraper.page_parser.parse(html, scraper.compiled_selectors['cards'].selectors)
+    cards = scraper._extract_job_cards(soup)
+    jobs = 0
+    for card in cards:
+        try:
+            if scraper._build_job_data(card, entry.get('query', ''), entry.get('location', ''),
+                                       entry.get('url', '')):
+                jobs += 1
+        except Exception:
+            pass
+    return len(cards), jobs
+
+
+def benchmark_scraper(scraper, pages, repeat=3):
+    """
+    Mesure le débit de parsing d'un scraper sur une liste de pages.
+
+    Args:
+        scraper (BaseScraper): Scraper à mesurer
+        pages (list): Tuples (entrée du manifeste, contenu HTML)
+        repeat (int): Nombre de passages sur les pages (le meilleur est retenu)
+
+    Returns:
+        dict: Résultats (pages, cartes, offres, secondes, pages/s, cartes/s, pic mémoire en Ko)
+    """
+    # Premier passage hors mesure : compilation des sélecteurs et imports paresseux
+    for entry, html in pages:
+        _parse_fixture(scraper, entry, html)
+
+    best = None
+    cards = jobs = 0
+    for _ in range(max(repeat, 1)):
+        cards = jobs = 0
+        started = time.perf_counter()
+        for entry, html in pages:
+            page_cards, page_jobs = _parse_fixture(scraper, entry, html)
+            cards += page_cards
+            jobs += page_jobs
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Passage séparé pour la mémoire : tracemalloc fausse les temps mesurés
+    tracemalloc.start()
+    try:
+        for entry, html in pages:
+            _parse_fixture(scraper, entry, html)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'source': scraper.name,
+        'backend': scraper.page_parser.backend,
+        'pages': len(pages),
+        'cards': cards,
+        'jobs': jobs,
+        'seconds': round(best, 6),
+        'pages_per_second': round(len(pages) / best, 1) if best else None,
+        'cards_per_second': round(cards / best, 1) if best else None,
+        'peak_memory_kb': round(peak / 1024, 1)
+    }
+
+
+def run(source=None, repeat=3, backend=None, directory=FIXTURES_DIR):
+    """
+    Mesure le débit de parsing de chaque scraper sur le corpus.
+
+    Args:
+        source (str, optional): Ne mesurer que ce scraper
+        repeat (int): Nombre de passages sur les pages
+        backend (str, optional): Moteur de parsing imposé (voir html_parser.py)
+        directory (str): Répertoire du corpus
+
+    Returns:
+        list: Résultats par scraper (scrapers sans page ignorés)
+    """
+    fixtures = list(iter_fixtures(directory=directory))
+    # Pages des sources sans scraper : utilisées par tous les scrapers
+    shared = [(entry, html) for entry, html in fixtures if entry['source'] not in SCRAPERS]
+
+    results = []
+    for name, scraper_class in SCRAPERS.items():
+        if source and name != source:
+            continue
+        pages = [(entry, html) for entry, html in fixtures if entry['source'] == name] + shared
+        if not pages:
+            continue
+
+        scraper = scraper_class()
+        try:
+            if backend:
+                scraper.page_parser = PageParser(scraper.config.get('selectors', {}).get('cards'), backend)
+            results.append(benchmark_scraper(scraper, pages, repeat))
+        finally:
+            scraper.close()
+    return results
+
+
+def main():
+    """
+    Point d'entrée : affiche le débit de parsing de chaque scraper.
+    """
+    parser = argparse.ArgumentParser(description="Débit de parsing sur le corpus de pages enregistrées")
+    parser.add_argument('--source', help="Ne mesurer que ce scraper")
+    parser.add_argument('--repeat', type=int, default=3, help="Nombre de passages sur les pages")
+    parser.add_argument('--backend', choices=['auto', 'selectolax', 'lxml', 'html.parser'],
+                        help="Moteur de parsing imposé")
+    parser.add_argument('--dir', default=FIXTURES_DIR, help="Répertoire du corpus")
+    parser.add_argument('--json', action='store_true', help="Résultats au format JSON")
+    args = parser.parse_args()
+
+    # Les messages des scrapers (cartes trouvées, sélecteurs) fausseraient l'affichage
+    logging.getLogger('scraper').setLevel(logging.ERROR)
+
+    results = run(args.source, args.repeat, args.backend, args.dir)
+    if not results:
+        print("Aucune page dans le corpus", file=sys.stderr)
+        sys.exit(1)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'source':<12} {'moteur':<12} {'pages':>6} {'cartes':>7} {'offres':>7} "
+          f"{'pages/s':>9} {'cartes/s':>10} {'mémoire':>10}")
+    for result in results:
+        print(f"{result['source']:<12} {result['backend']:<12} {result['pages']:>6} {result['cards']:>7} "
+              f"{result['jobs']:>7} {result['pages_per_second'] or 0:>9} {result['cards_per_second'] or 0:>10} "
+              f"{result['peak_memory_kb']:>8}Ko")
+
+
+if __name__ == "__main__":
+    main()
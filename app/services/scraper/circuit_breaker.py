@@ -0,0 +1,325 @@
+"""
+Disjoncteur par source de scraping.
+
+Quand un site nous bloque (captcha, "Access Denied"), nous limite (HTTP 429)
+ou ne répond plus (délais dépassés répétés), les scrapings suivants le
+sollicitaient de nouveau après la pause complète de limitation de débit.
+Le disjoncteur de la source s'ouvre alors : ses requêtes sont refusées
+immédiatement et scrape_all l'ignore jusqu'à la fin du délai de refroidissement.
+
+États :
+- 'closed' : requêtes autorisées ;
+- 'open' : requêtes refusées jusqu'à opened_until ;
+- 'half_open' : délai écoulé, une seule requête de test est autorisée.
+  Elle est envoyée au site même si la page est en cache (voir check()).
+  Son succès referme le disjoncteur ; son échec le rouvre avec un délai
+  multiplié par CIRCUIT_BREAKER_CONFIG['multiplier'] (borné par max_cooldown).
+
+L'état est conservé dans une base SQLite (SCRAPER_CIRCUIT_DB) partagée par
+tous les workers : un blocage constaté par un processus profite aux autres.
+"""
+
+import os
+import time
+import asyncio
+import sqlite3
+import logging
+import threading
+
+import requests
+from urllib3.exceptions import TimeoutError as Urllib3TimeoutError
+
+from app.config.scraper_config import CIRCUIT_BREAKER_CONFIG, state_path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Chemin de la base SQLite des disjoncteurs (disjoncteur désactivé si vide)
+CIRCUIT_DB = os.environ.get('SCRAPER_CIRCUIT_DB', state_path('circuit_breaker.db'))
+
+# États d'un disjoncteur
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Motifs d'échec
+BLOCKED = 'blocked'
+RATE_LIMITED = 'rate_limited'
+TIMEOUT = 'timeout'
+
+
+def classify_error(error):
+    """
+    Détermine si une erreur de requête doit être comptée par le disjoncteur.
+
+    Args:
+        error (Exception): Erreur levée par requests ou aiohttp
+
+    Returns:
+        str ou None: RATE_LIMITED, BLOCKED, TIMEOUT, ou None pour une erreur ordinaire
+    """
+    # aiohttp expose le code dans error.status, requests dans error.response.status_code
+    status = getattr(error, 'status', None)
+    if status is None and getattr(error, 'response', None) is not None:
+        status = error.response.status_code
+    if status == 429:
+        return RATE_LIMITED
+    if status == 403:
+        return BLOCKED
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, requests.exceptions.Timeout)):
+        return TIMEOUT
+    # Avec Retry (create_session), un délai dépassé arrive comme ConnectionError
+    # enveloppant MaxRetryError(ReadTimeoutError ou ConnectTimeoutError)
+    if isinstance(error, requests.exceptions.ConnectionError) and error.args:
+        reason = getattr(error.args[0], 'reason', error.args[0])
+        if isinstance(reason, Urllib3TimeoutError):
+            return TIMEOUT
+    return None
+
+
+class CircuitBreaker:
+    """
+    Disjoncteurs des sources, partagés entre processus dans une base SQLite.
+    """
+
+    def __init__(self, path=CIRCUIT_DB, config=None):
+        """
+        Args:
+            path (str): Chemin de la base SQLite (None ou vide pour désactiver)
+            config (dict, optional): Configuration. Par défaut CIRCUIT_BREAKER_CONFIG.
+        """
+        self.path = path
+        self.config = config or CIRCUIT_BREAKER_CONFIG
+        self._local = threading.local()
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Indique si le disjoncteur est actif."""
+        return bool(self.path)
+
+    def _connect(self):
+        """
+        Retourne la connexion SQLite du thread courant (la table est créée au premier accès).
+
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        if not self._initialized:
+            with self._lock:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS circuit_breaker ("
+                    "source TEXT PRIMARY KEY, state TEXT NOT NULL, failures INTEGER NOT NULL DEFAULT 0, "
+                    "cooldown REAL NOT NULL DEFAULT 0, opened_until REAL NOT NULL DEFAULT 0, "
+                    "reason TEXT, trips INTEGER NOT NULL DEFAULT 0, updated REAL NOT NULL)"
+                )
+                self._initialized = True
+        return conn
+
+    def _read(self, conn, source):
+        """Lit l'état d'une source (None si elle n'a jamais échoué)."""
+        return conn.execute(
+            "SELECT state, failures, cooldown, opened_until FROM circuit_breaker WHERE source = ?", (source,)
+        ).fetchone()
+
+    def is_open(self, source):
+        """
+        Indique si les requêtes vers une source sont actuellement refusées, sans réserver de requête de test.
+        Utilisé par scrape_all pour ignorer une source avant de lancer son scraper.
+
+        Args:
+            source (str): Nom de la source
+
+        Returns:
+            bool: True si la source doit être ignorée
+        """
+        if not self.enabled:
+            return False
+        try:
+            row = self._read(self._connect(), source)
+        except sqlite3.Error as e:
+            logger.warning(f"Lecture du disjoncteur {source} impossible: {str(e)}")
+            return False
+        if row is None:
+            return False
+        state, _, _, opened_until = row
+        # Ouvert et en refroidissement, ou requête de test déjà en cours
+        return state in (OPEN, HALF_OPEN) and opened_until > time.time()
+
+    def allow(self, source):
+        """
+        Indique si une requête vers une source peut être envoyée.
+
+        Args:
+            source (str): Nom de la source
+
+        Returns:
+            bool: True si la requête peut être envoyée
+        """
+        return self.check(source) is not None
+
+    def check(self, source):
+        """
+        Indique si une requête vers une source peut être envoyée, et si c'est la requête de test.
+
+        À la fin du délai de refroidissement, le premier appelant (tous
+        processus confondus) obtient la requête de test ; les autres sont
+        refusés jusqu'à son résultat. La requête de test ne doit pas être
+        servie par le cache HTTP : seule une réponse du site indique si le
+        blocage est levé.
+
+        Args:
+            source (str): Nom de la source
+
+        Returns:
+            str ou None: CLOSED (requête ordinaire), HALF_OPEN (requête de test) ou None (requête refusée)
+        """
+        if not self.enabled:
+            return CLOSED
+        now = time.time()
+        try:
+            conn = self._connect()
+            row = self._read(conn, source)
+            if row is None or row[0] == CLOSED:
+                return CLOSED
+            if row[3] > now:
+                return None
+            # Réserver la requête de test (une seule réussit, même entre processus)
+            claimed = conn.execute(
+                "UPDATE circuit_breaker SET state = ?, opened_until = ?, updated = ? "
+                "WHERE source = ? AND state != ? AND opened_until <= ?",
+                (HALF_OPEN, now + self.config['probe_timeout'], now, source, CLOSED, now)
+            ).rowcount == 1
+        except sqlite3.Error as e:
+            logger.warning(f"Disjoncteur {source} indisponible: {str(e)}")
+            return CLOSED
+        if not claimed:
+            return None
+        logger.info(f"Disjoncteur {source} semi-ouvert : requête de test")
+        return HALF_OPEN
+
+    def record_success(self, source):
+        """
+        Enregistre une réponse exploitable : referme le disjoncteur et remet les compteurs à zéro.
+
+        Args:
+            source (str): Nom de la source
+        """
+        if not self.enabled:
+            return
+        try:
+            closed = self._connect().execute(
+                "UPDATE circuit_breaker SET state = ?, failures = 0, cooldown = 0, opened_until = 0, updated = ? "
+                "WHERE source = ? AND (state != ? OR failures > 0)",
+                (CLOSED, time.time(), source, CLOSED)
+            ).rowcount
+        except sqlite3.Error as e:
+            logger.warning(f"Mise à jour du disjoncteur {source} impossible: {str(e)}")
+            return
+        if closed:
+            logger.info(f"Disjoncteur {source} réarmé")
+
+    def record_failure(self, source, reason):
+        """
+        Enregistre un échec. Un blocage ou un 429 ouvre le disjoncteur
+        immédiatement ; les délais dépassés l'ouvrent à partir du seuil.
+
+        Args:
+            source (str): Nom de la source
+            reason (str): BLOCKED, RATE_LIMITED ou TIMEOUT
+        """
+        if not self.enabled or reason is None:
+            return
+        now = time.time()
+        config = self.config
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._read(conn, source)
+                state, failures, cooldown, _ = row if row else (CLOSED, 0, 0, 0)
+                failures += 1
+
+                if state == HALF_OPEN:
+                    # Échec de la requête de test : refroidissement plus long
+                    cooldown = min(max(cooldown, config['base_cooldown']) * config['multiplier'],
+                                   config['max_cooldown'])
+                    trip = True
+                elif state == OPEN:
+                    # Réponse d'une requête partie avant l'ouverture : rien de plus à faire
+                    trip = False
+                else:
+                    cooldown = config['base_cooldown']
+                    trip = reason != TIMEOUT or failures >= config['timeout_threshold']
+
+                if trip:
+                    state = OPEN
+                    opened_until = now + cooldown
+                    conn.execute(
+                        "INSERT OR REPLACE INTO circuit_breaker "
+                        "(source, state, failures, cooldown, opened_until, reason, trips, updated) "
+                        "VALUES (?, ?, ?, ?, ?, ?, COALESCE((SELECT trips FROM circuit_breaker WHERE source = ?), 0) + 1, ?)",
+                        (source, state, failures, cooldown, opened_until, reason, source, now)
+                    )
+                else:
+                    conn.execute(
+                        "INSERT INTO circuit_breaker (source, state, failures, cooldown, opened_until, reason, updated) "
+                        "VALUES (?, ?, ?, 0, 0, ?, ?) "
+                        "ON CONFLICT(source) DO UPDATE SET failures = excluded.failures, "
+                        "reason = excluded.reason, updated = excluded.updated",
+                        (source, state, failures, reason, now)
+                    )
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except sqlite3.Error as e:
+            logger.warning(f"Mise à jour du disjoncteur {source} impossible: {str(e)}")
+            return
+        if trip:
+            logger.warning(f"Disjoncteur {source} ouvert ({reason}) pour {int(cooldown)} s")
+
+    def record_error(self, source, error):
+        """
+        Enregistre une erreur de requête si elle relève du disjoncteur (voir classify_error).
+
+        Args:
+            source (str): Nom de la source
+            error (Exception): Erreur levée par la requête
+        """
+        self.record_failure(source, classify_error(error))
+
+    def states(self):
+        """
+        Retourne l'état de tous les disjoncteurs (pour le monitoring).
+
+        Returns:
+            dict: {source: {state, failures, cooldown, retry_in, reason, trips}}
+        """
+        if not self.enabled:
+            return {}
+        now = time.time()
+        rows = self._connect().execute(
+            "SELECT source, state, failures, cooldown, opened_until, reason, trips FROM circuit_breaker"
+        ).fetchall()
+        return {
+            source: {
+                'state': state,
+                'failures': failures,
+                'cooldown': cooldown,
+                'retry_in': max(round(opened_until - now), 0) if state != CLOSED else 0,
+                'reason': reason,
+                'trips': trips
+            }
+            for source, state, failures, cooldown, opened_until, reason, trips in rows
+        }
+
+
+# Instance globale partagée par les scrapers
+circuit_breaker = CircuitBreaker()
@@ -0,0 +1,146 @@
+"""
+Enrichissement des offres par leur page de détail.
+
+Les cartes des pages de résultats ne contiennent qu'un extrait de la
+description (Indeed) voire aucune (LinkedIn) : l'extraction des compétences,
+de l'expérience et du niveau d'études, ainsi que l'analyse de fraude,
+travaillent alors sur un texte presque vide. Cette étape récupère la page
+de chaque offre (source_url), en extrait la description complète et relance
+l'extraction.
+
+L'étape s'intercale entre les scrapers et l'enregistrement : elle consomme
+le flux d'offres et produit les offres enrichies au fur et à mesure, avec un
+nombre borné de pages récupérées simultanément (au total et par site). Les
+offres déjà enrichies lors d'un scraping précédent ne sont pas récupérées
+de nouveau.
+"""
+
+import logging
+import itertools
+import threading
+import urllib.parse
+import concurrent.futures
+
+from app.config.scraper_config import ENRICHMENT_CONFIG
+from app.services.scraper import metrics
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+
+class DetailEnricher:
+    """
+    Étape d'enrichissement des offres, à concurrence bornée.
+    """
+
+    def __init__(self, scrapers, max_workers=None, max_per_host=None, window=None, min_length=None):
+        """
+        Args:
+            scrapers (dict): Dictionnaire {nom: scraper}
+            max_workers (int, optional): Pages récupérées simultanément au total
+            max_per_host (int, optional): Pages récupérées simultanément par site
+            window (int, optional): Nombre maximal d'offres en cours d'enrichissement
+            min_length (int, optional): Longueur en dessous de laquelle une description est un extrait
+        """
+        config = ENRICHMENT_CONFIG
+        # Les offres indiquent leur site par le nom affiché du scraper (job['source'])
+        self.scrapers = {scraper.label: scraper for scraper in scrapers.values()}
+        self.max_workers = max_workers or config['max_workers']
+        self.max_per_host = max_per_host or config['max_per_host']
+        self.window = window or config['window']
+        self.min_length = min_length if min_length is not None else config['min_length']
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+    def _host_semaphore(self, url):
+        """
+        Retourne le sémaphore limitant les récupérations simultanées vers l'hôte d'une URL.
+
+        Args:
+            url (str): URL de la page
+
+        Returns:
+            threading.Semaphore: Sémaphore de l'hôte
+        """
+        host = urllib.parse.urlparse(url).netloc
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = self._host_semaphores[host] = threading.Semaphore(self.max_per_host)
+            return semaphore
+
+    def _enrich_one(self, scraper, job):
+        """
+        Enrichit une offre dans un thread du pool.
+
+        Args:
+            scraper (BaseScraper): Scraper du site de l'offre
+            job (dict): Données de l'offre
+
+        Returns:
+            dict: Offre enrichie, ou l'offre d'origine en cas d'échec
+        """
+        try:
+            with self._host_semaphore(job['source_url']):
+                return scraper.enrich_job(job, self.min_length)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'enrichissement de {job.get('source_url')}: {str(e)}")
+            return job
+
+    def enrich(self, jobs, enriched_urls=None):
+        """
+        Enrichit un flux d'offres en parallèle et produit les offres dès qu'elles sont prêtes.
+
+        L'ordre des offres n'est pas conservé. Au plus `window` offres sont
+        en cours d'enrichissement : le flux d'entrée n'est lu qu'au rythme
+        de la consommation, par paquets de `window` offres.
+
+        Args:
+            jobs (iterable): Offres scrapées
+            enriched_urls (callable, optional): Fonction list(source_url) -> set des URL déjà
+                                                enrichies (ces offres sont produites telles quelles),
+                                                appelée une fois par paquet
+
+        Yields:
+            dict: Données d'une offre, enrichie si possible
+        """
+        enriched_count = 0
+        skipped_count = 0
+        pending = set()
+        jobs = iter(jobs)
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='detail-enricher'
+        ) as executor:
+            while True:
+                chunk = list(itertools.islice(jobs, self.window))
+                if not chunk:
+                    break
+                already_enriched = enriched_urls(
+                    [job['source_url'] for job in chunk if job.get('source_url')]
+                ) if enriched_urls else set()
+
+                for job in chunk:
+                    scraper = self.scrapers.get(job.get('source'))
+                    if scraper is None or not job.get('source_url') or job['source_url'] in already_enriched:
+                        skipped_count += 1
+                        yield job
+                    else:
+                        pending.add(executor.submit(metrics.in_context(self._enrich_one), scraper, job))
+
+                    # Produire les offres prêtes sans attendre ; attendre seulement si la fenêtre est pleine
+                    done, pending = concurrent.futures.wait(
+                        pending, timeout=0 if len(pending) < self.window else None,
+                        return_when=concurrent.futures.FIRST_COMPLETED
+                    )
+                    for future in done:
+                        result = future.result()
+                        enriched_count += bool(result.get('enriched'))
+                        yield result
+
+            for future in concurrent.futures.as_completed(pending):
+                result = future.result()
+                enriched_count += bool(result.get('enriched'))
+                yield result
+
+        logger.info(f"Enrichissement: {enriched_count} offres enrichies, {skipped_count} ignorées")
@@ -0,0 +1,203 @@
+"""
+Corpus de pages de résultats enregistrées.
+
+Les pages sont rangées par source dans SCRAPER_FIXTURES_DIR
+(scraper_fixtures/ par défaut) et décrites dans manifest.json (URL, requête,
+lieu, numéro de page, date d'enregistrement). Le corpus permet de mesurer
+et de vérifier le parsing hors ligne (voir benchmark.py).
+
+Enregistrement de nouvelles pages :
+    python -m app.services.scraper.fixtures record indeed "développeur python" Paris --pages 2
+    python -m app.services.scraper.fixtures import page.html --source linkedin --query python
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import unicodedata
+from datetime import datetime, timezone
+
+# Répertoire du corpus (à la racine du projet par défaut)
+FIXTURES_DIR = os.environ.get(
+    'SCRAPER_FIXTURES_DIR',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))),
+                 'scraper_fixtures')
+)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def _slugify(text):
+    """
+    Convertit un texte en nom de fichier (minuscules, sans accents ni espaces).
+
+    Args:
+        text (str): Texte à convertir
+
+    Returns:
+        str: Identifiant utilisable dans un nom de fichier
+    """
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'page'
+
+
+def load_manifest(directory=FIXTURES_DIR):
+    """
+    Charge la description du corpus.
+
+    Args:
+        directory (str): Répertoire du corpus
+
+    Returns:
+        list: Entrées {file, source, url, query, location, page, recorded_at}
+    """
+    path = os.path.join(directory, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _save_manifest(entries, directory=FIXTURES_DIR):
+    """
+    Enregistre la description du corpus.
+
+    Args:
+        entries (list): Entrées du corpus
+        directory (str): Répertoire du corpus
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+        f.write('\n')
+
+
+def add_fixture(html, source, url='', query='', location='', page=0, directory=FIXTURES_DIR):
+    """
+    Ajoute une page au corpus (une page existante de même nom est remplacée).
+
+    Args:
+        html (str): Contenu HTML de la page
+        source (str): Nom de la source (ex: 'indeed')
+        url (str): URL de la page
+        query (str): Terme de recherche
+        location (str): Lieu de recherche
+        page (int): Numéro de la page de résultats (à partir de 0)
+        directory (str): Répertoire du corpus
+
+    Returns:
+        dict: Entrée ajoutée au manifeste
+    """
+    name = f"{_slugify(' '.join(filter(None, [query, location])))}-p{page}.html"
+    relative_path = f"{source}/{name}"
+    os.makedirs(os.path.join(directory, source), exist_ok=True)
+    with open(os.path.join(directory, relative_path), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    entry = {
+        'file': relative_path,
+        'source': source,
+        'url': url,
+        'query': query,
+        'location': location,
+        'page': page,
+        'recorded_at': datetime.now(timezone.utc).isoformat(timespec='seconds')
+    }
+    entries = [e for e in load_manifest(directory) if e['file'] != relative_path]
+    entries.append(entry)
+    entries.sort(key=lambda e: e['file'])
+    _save_manifest(entries, directory)
+    return entry
+
+
+def iter_fixtures(source=None, directory=FIXTURES_DIR):
+    """
+    Parcourt les pages du corpus.
+
+    Args:
+        source (str, optional): Ne retourner que les pages de cette source
+        directory (str): Répertoire du corpus
+
+    Yields:
+        tuple: (entrée du manifeste, contenu HTML)
+    """
+    for entry in load_manifest(directory):
+        if source and entry['source'] != source:
+            continue
+        with open(os.path.join(directory, entry['file']), encoding='utf-8') as f:
+            yield entry, f.read()
+
+
+def record(source, query, location='', pages=1, directory=FIXTURES_DIR):
+    """
+    Récupère des pages de résultats en direct et les ajoute au corpus.
+
+    Les requêtes passent par le scraper de la source (robots.txt, limitation
+    de débit et cache HTTP compris).
+
+    Args:
+        source (str): Nom de la source
+        query (str): Terme de recherche
+        location (str): Lieu de recherche
+        pages (int): Nombre de pages de résultats à enregistrer
+        directory (str): Répertoire du corpus
+
+    Returns:
+        list: Entrées ajoutées au manifeste
+    """
+    # Import local : le corpus peut être lu sans les dépendances du scraping
+    from app.services.scraper.scraper_manager import get_scraper_manager
+
+    scraper = get_scraper_manager().scrapers[source]
+    entries = []
+    for page in range(pages):
+        effective_query, url = scraper._search_url(query, location, page)
+        html = scraper._fetch_html(url)
+        if not html:
+            print(f"Impossible de récupérer {url}", file=sys.stderr)
+            break
+        entries.append(add_fixture(html, source, url, effective_query, location, page, directory))
+        print(f"Enregistré {entries[-1]['file']}")
+    return entries
+
+
+def main():
+    """
+    Point d'entrée : enregistre des pages dans le corpus.
+    """
+    parser = argparse.ArgumentParser(description="Corpus de pages de résultats enregistrées")
+    parser.add_argument('--dir', default=FIXTURES_DIR, help="Répertoire du corpus")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    record_parser = commands.add_parser('record', help="Enregistrer des pages de résultats en direct")
+    record_parser.add_argument('source', help="Source (indeed, linkedin, monster, pole_emploi)")
+    record_parser.add_argument('query', help="Terme de recherche")
+    record_parser.add_argument('location', nargs='?', default='', help="Lieu de recherche")
+    record_parser.add_argument('--pages', type=int, default=1, help="Nombre de pages à enregistrer")
+
+    import_parser = commands.add_parser('import', help="Ajouter une page déjà téléchargée")
+    import_parser.add_argument('file', help="Fichier HTML")
+    import_parser.add_argument('--source', required=True, help="Source de la page")
+    import_parser.add_argument('--url', default='')
+    import_parser.add_argument('--query', default='')
+    import_parser.add_argument('--location', default='')
+    import_parser.add_argument('--page', type=int, default=0)
+
+    commands.add_parser('list', help="Afficher le contenu du corpus")
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record(args.source, args.query, args.location, args.pages, args.dir)
+    elif args.command == 'import':
+        with open(args.file, encoding='utf-8') as f:
+            html = f.read()
+        entry = add_fixture(html, args.source, args.url, args.query, args.location, args.page, args.dir)
+        print(f"Enregistré {entry['file']}")
+    else:
+        for entry in load_manifest(args.dir):
+            print(f"{entry['source']:<12} {entry['file']:<60} {entry['recorded_at']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""
+Scraping incrémental par recherche.
+
+Les sources triées par date (pagination 'newest_first') affichent les offres
+les plus récentes en premier : une fois les offres déjà vues atteintes, les
+pages suivantes ne contiennent que des offres déjà enregistrées. Pour chaque
+couple (source, recherche, lieu), une marque de niveau conserve les URLs des
+offres les plus récentes déjà vues et la date de publication la plus récente.
+Au scraping suivant :
+- les offres connues (URL déjà vue, ou publiée avant la marque moins
+  INCREMENTAL_CONFIG['date_tolerance']) ne sont plus produites ;
+- la pagination s'arrête sur la première page qui contient au moins
+  'stop_after_known' offres connues.
+En régime établi, seules les nouvelles offres sont récupérées.
+
+La marque n'avance qu'à la fin normale d'un parcours, une fois ses offres
+enregistrées (ScraperManager appelle commit() après la sauvegarde) : après
+une erreur de récupération ou d'enregistrement, les pages manquantes seront
+reparcourues. Chaque recherche est
+de plus parcourue entièrement toutes les 'full_crawl_interval' secondes
+(mise à jour des offres existantes, offres manquées par un parcours borné).
+
+Les marques sont conservées dans une base SQLite (SCRAPER_HIGH_WATER_DB)
+partagée par tous les workers.
+"""
+
+import os
+import re
+import json
+import time
+import sqlite3
+import logging
+import threading
+
+from app.config.scraper_config import INCREMENTAL_CONFIG, state_path
+from app.services.scraper import metrics
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Chemin de la base SQLite des marques (scraping incrémental désactivé si vide)
+HIGH_WATER_DB = os.environ.get('SCRAPER_HIGH_WATER_DB', state_path('high_water.db'))
+
+
+def search_key(query, location):
+    """
+    Calcule la clé d'une recherche (casse et espaces ignorés).
+
+    Args:
+        query (str): Terme de recherche
+        location (str): Lieu de recherche
+
+    Returns:
+        str: Clé de la recherche
+    """
+    def normalize(value):
+        return re.sub(r'\s+', ' ', (value or '').strip().lower())
+    return f"{normalize(query)}|{normalize(location)}"
+
+
+class HighWaterMarks:
+    """
+    Marques de niveau des recherches, partagées entre processus dans une base SQLite.
+    """
+
+    def __init__(self, path=HIGH_WATER_DB, config=None):
+        """
+        Args:
+            path (str): Chemin de la base SQLite (None ou vide pour désactiver)
+            config (dict, optional): Configuration. Par défaut INCREMENTAL_CONFIG.
+        """
+        self.path = path
+        self.config = config or INCREMENTAL_CONFIG
+        self._local = threading.local()
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Indique si le scraping incrémental est actif."""
+        return bool(self.path) and self.config.get('enabled', False)
+
+    def _connect(self):
+        """
+        Retourne la connexion SQLite du thread courant (la table est créée au premier accès).
+
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        if not self._initialized:
+            with self._lock:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS high_water ("
+                    "source TEXT NOT NULL, search TEXT NOT NULL, urls TEXT NOT NULL, newest_posted REAL, "
+                    "full_crawl REAL NOT NULL DEFAULT 0, updated REAL NOT NULL, PRIMARY KEY (source, search))"
+                )
+                self._initialized = True
+        return conn
+
+    def _read(self, conn, source, key):
+        """Lit la marque d'une recherche (None si elle n'a jamais été parcourue)."""
+        row = conn.execute(
+            "SELECT urls, newest_posted, full_crawl, updated FROM high_water WHERE source = ? AND search = ?",
+            (source, key)
+        ).fetchone()
+        if row is None:
+            return None
+        urls, newest_posted, full_crawl, updated = row
+        return {'urls': json.loads(urls), 'newest_posted': newest_posted, 'full_crawl': full_crawl, 'updated': updated}
+
+    def get(self, source, query, location):
+        """
+        Retourne la marque d'une recherche sur une source.
+
+        Args:
+            source (str): Nom de la source
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+
+        Returns:
+            dict ou None: {urls, newest_posted, full_crawl, updated} ou None si la recherche est inconnue
+        """
+        if not self.enabled:
+            return None
+        try:
+            return self._read(self._connect(), source, search_key(query, location))
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Lecture de la marque {source} impossible: {str(e)}")
+            return None
+
+    def advance(self, source, query, location, urls, newest_posted=None, full=False):
+        """
+        Fait avancer la marque d'une recherche après un parcours terminé.
+
+        Args:
+            source (str): Nom de la source
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            urls (list): URLs des nouvelles offres, des plus récentes aux plus anciennes
+            newest_posted (float, optional): Date de publication la plus récente vue (timestamp)
+            full (bool): True si le parcours était complet (sans marque)
+        """
+        if not self.enabled:
+            return
+        key = search_key(query, location)
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                mark = self._read(conn, source, key) or {'urls': [], 'newest_posted': None, 'full_crawl': 0}
+                # Les nouvelles offres passent devant les plus anciennes, sans doublon
+                known = list(dict.fromkeys(list(urls) + mark['urls']))[:self.config['known_urls']]
+                dates = [date for date in (newest_posted, mark['newest_posted']) if date is not None]
+                conn.execute(
+                    "INSERT OR REPLACE INTO high_water (source, search, urls, newest_posted, full_crawl, updated) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (source, key, json.dumps(known), max(dates) if dates else None,
+                     now if full else mark['full_crawl'], now)
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, ValueError) as e:
+            logger.warning(f"Mise à jour de la marque {source} impossible: {str(e)}")
+
+    def reset(self, source=None):
+        """
+        Supprime les marques pour forcer un parcours complet.
+
+        Args:
+            source (str, optional): Source concernée. Par défaut, toutes.
+        """
+        if not self.enabled:
+            return
+        conn = self._connect()
+        if source:
+            conn.execute("DELETE FROM high_water WHERE source = ?", (source,))
+        else:
+            conn.execute("DELETE FROM high_water")
+
+
+class IncrementalCrawl:
+    """
+    Parcours d'une recherche sur une source : écarte les offres connues et
+    indique quand arrêter la pagination.
+    """
+
+    def __init__(self, source, query, location, newest_first=False, incremental=True, marks=None):
+        """
+        Args:
+            source (str): Nom de la source
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            newest_first (bool): True si la source affiche les offres les plus récentes en premier
+            incremental (bool): False pour forcer un parcours complet
+            marks (HighWaterMarks, optional): Marques à utiliser. Par défaut, l'instance globale.
+        """
+        self.source = source
+        self.query = query
+        self.location = location
+        self.marks = marks or high_water_marks
+        self.config = self.marks.config
+        # Sources sans tri par date : les offres connues ne sont pas regroupées en fin de liste
+        self.active = newest_first and self.marks.enabled
+
+        mark = self.marks.get(source, query, location) if self.active and incremental else None
+        if mark and time.time() - mark['full_crawl'] > self.config['full_crawl_interval']:
+            mark = None
+        self.full = mark is None
+        self._known = set(mark['urls']) if mark else set()
+        self._newest = mark['newest_posted'] if mark else None
+        self._urls = []
+        self._posted = None
+
+    @property
+    def sequential(self):
+        """
+        Indique si la marque peut arrêter la pagination : la page suivante ne
+        doit alors être demandée qu'après l'analyse de la page courante.
+        """
+        return self.active and not self.full
+
+    def _is_known(self, job):
+        """Indique si une offre a déjà été vue lors d'un parcours précédent."""
+        if job.get('source_url') in self._known:
+            return True
+        posted = job.get('posted_date')
+        return (self._newest is not None and posted is not None
+                and posted.timestamp() < self._newest - self.config['date_tolerance'])
+
+    def filter_page(self, jobs):
+        """
+        Écarte les offres connues d'une page de résultats.
+
+        Args:
+            jobs (list): Offres de la page, dans l'ordre d'affichage
+
+        Returns:
+            tuple: (offres nouvelles, True si la pagination doit s'arrêter)
+        """
+        if not self.active:
+            return jobs, False
+
+        new_jobs = []
+        for job in jobs:
+            if self._is_known(job):
+                continue
+            new_jobs.append(job)
+            self._urls.append(job.get('source_url'))
+            posted = job.get('posted_date')
+            if posted is not None and (self._posted is None or posted.timestamp() > self._posted):
+                self._posted = posted.timestamp()
+
+        known = len(jobs) - len(new_jobs)
+        if not known:
+            return new_jobs, False
+        metrics.incr(self.source, 'known_skipped', known)
+        reached = known >= min(self.config['stop_after_known'], len(jobs))
+        if reached:
+            metrics.incr(self.source, 'incremental_stops')
+            logger.info(f"{self.source}: offres déjà connues atteintes pour '{self.query}' à '{self.location}'")
+        return new_jobs, reached
+
+    def commit(self):
+        """Fait avancer la marque de la recherche à la fin normale du parcours."""
+        if self.active and (self._urls or self.full):
+            self.marks.advance(self.source, self.query, self.location, self._urls, self._posted, full=self.full)
+
+
+# Instance globale partagée par les scrapers
+high_water_marks = HighWaterMarks()
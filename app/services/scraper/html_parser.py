@@ -0,0 +1,268 @@
+"""
+Parsing des pages de résultats.
+
+Au lieu de construire l'arbre complet de chaque page avec 'html.parser',
+seuls les sous-arbres utiles sont construits : les cartes d'offres
+(selectors['cards'] de la source) et les éléments nécessaires à la
+détection de blocage (titre, captcha). Le résultat reste un objet
+BeautifulSoup : _extract_text, _extract_attribute et _build_job_data
+fonctionnent sans modification.
+
+Moteurs disponibles (SCRAPER_PARSER, 'auto' par défaut) :
+- 'selectolax' : les cartes sont localisées par le moteur CSS de selectolax
+  sur la page entière, puis seul leur HTML est parsé par BeautifulSoup ;
+- 'lxml' : BeautifulSoup avec lxml et un SoupStrainer limité aux cartes ;
+- 'html.parser' : BeautifulSoup avec le parseur standard et le même SoupStrainer.
+'auto' choisit le premier moteur installé dans cet ordre.
+"""
+
+import os
+import re
+import logging
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    # bs4 >= 4.13 : un SoupStrainer construit sur une fonction ne reçoit plus les attributs
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+from app.services.scraper.utils import CAPTCHA_SELECTORS
+
+try:
+    import lxml  # noqa: F401
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+    SELECTOLAX_AVAILABLE = True
+except ImportError:
+    SELECTOLAX_AVAILABLE = False
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Moteur de parsing choisi
+PARSER_BACKEND = os.environ.get('SCRAPER_PARSER', 'auto')
+
+# Éléments conservés en plus des cartes pour la détection de blocage (check_blocked)
+BLOCK_SELECTORS = ['title'] + CAPTCHA_SELECTORS
+
+# Sélecteur simple : balise, classes, identifiant et attributs, sans combinateur
+SIMPLE_SELECTOR = re.compile(
+    r'^(?P<tag>[a-zA-Z][\w-]*)?(?P<parts>(?:\.[\w-]+|#[\w-]+|\[[\w-]+(?:=(?:"[^"]*"|\'[^\']*\'|[^\]]*))?\])*)$'
+)
+SELECTOR_PART = re.compile(r'\.(?P<cls>[\w-]+)|#(?P<id>[\w-]+)|\[(?P<attr>[\w-]+)(?:=(?P<value>"[^"]*"|\'[^\']*\'|[^\]]*))?\]')
+
+
+def resolve_backend(backend=None):
+    """
+    Détermine le moteur de parsing à utiliser.
+
+    Args:
+        backend (str, optional): Moteur demandé. Par défaut PARSER_BACKEND.
+
+    Returns:
+        str: 'selectolax', 'lxml' ou 'html.parser'
+    """
+    backend = backend or PARSER_BACKEND
+    if backend == 'selectolax' and not SELECTOLAX_AVAILABLE:
+        logger.warning("selectolax n'est pas installé, utilisation de BeautifulSoup")
+        backend = 'auto'
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        logger.warning("lxml n'est pas installé, utilisation de html.parser")
+        backend = 'html.parser'
+    if backend == 'auto':
+        if SELECTOLAX_AVAILABLE:
+            return 'selectolax'
+        return 'lxml' if LXML_AVAILABLE else 'html.parser'
+    return backend
+
+
+def _soup_features():
+    """
+    Retourne le parseur BeautifulSoup le plus rapide disponible.
+
+    Returns:
+        str: 'lxml' ou 'html.parser'
+    """
+    return 'lxml' if LXML_AVAILABLE else 'html.parser'
+
+
+def _compile_selector(selector):
+    """
+    Convertit un sélecteur CSS simple en fonction de test (balise, attributs).
+
+    Args:
+        selector (str): Sélecteur CSS (ex: 'div.job_seen_beacon', 'div[data-testid="job-card"]')
+
+    Returns:
+        callable ou None: Fonction (nom, attributs) -> bool, ou None si le sélecteur
+                          contient des combinateurs ou pseudo-classes
+    """
+    match = SIMPLE_SELECTOR.match(selector.strip())
+    if not match:
+        return None
+
+    tag = (match.group('tag') or '').lower()
+    classes, conditions = [], []
+    for part in SELECTOR_PART.finditer(match.group('parts')):
+        if part.group('cls'):
+            classes.append(part.group('cls'))
+        elif part.group('id'):
+            conditions.append(('id', part.group('id')))
+        else:
+            value = part.group('value')
+            if value is not None:
+                value = value.strip('"\'')
+            conditions.append((part.group('attr'), value))
+
+    def matches(name, attrs):
+        if tag and name != tag:
+            return False
+        if classes:
+            element_classes = attrs.get('class') or []
+            if isinstance(element_classes, str):
+                element_classes = element_classes.split()
+            if not all(cls in element_classes for cls in classes):
+                return False
+        for attr, value in conditions:
+            if attr not in attrs or (value is not None and attrs[attr] != value):
+                return False
+        return True
+
+    return matches
+
+
+if ElementFilter is not None:
+    class CardFilter(ElementFilter):
+        """
+        Filtre de parsing pour bs4 >= 4.13, qui décide à partir du nom et des attributs de chaque élément.
+        """
+
+        def __init__(self, keep):
+            """
+            Args:
+                keep (callable): Fonction (nom, attributs) -> bool
+            """
+            super().__init__()
+            self.keep = keep
+
+        def allow_tag_creation(self, nsprefix, name, attrs):
+            return self.keep(name, attrs or {})
+
+        def allow_string_creation(self, string):
+            # Comme un SoupStrainer sur les balises : aucun texte hors des éléments conservés
+            return False
+
+
+def build_strainer(card_selectors):
+    """
+    Construit un SoupStrainer conservant les cartes et les éléments de détection de blocage.
+
+    Args:
+        card_selectors (list): Sélecteurs CSS des cartes
+
+    Returns:
+        SoupStrainer, CardFilter ou None: Filtre de parsing, ou None si un sélecteur n'est pas simple
+    """
+    matchers = [_compile_selector(selector) for selector in list(card_selectors) + BLOCK_SELECTORS]
+    if not all(matchers):
+        return None
+    def keep(name, attrs):
+        return any(m(name, attrs) for m in matchers)
+
+    if ElementFilter is not None:
+        return CardFilter(keep)
+    return SoupStrainer(keep)
+
+
+class PageParser:
+    """
+    Parseur de pages de résultats restreint aux cartes d'une source.
+    """
+
+    def __init__(self, card_selectors, backend=None):
+        """
+        Args:
+            card_selectors (list): Sélecteurs CSS des cartes (selectors['cards'])
+            backend (str, optional): Moteur de parsing. Par défaut PARSER_BACKEND.
+        """
+        self.card_selectors = list(card_selectors or [])
+        self.backend = resolve_backend(backend)
+        self.strainer = build_strainer(self.card_selectors) if self.card_selectors else None
+        if self.card_selectors and self.strainer is None:
+            logger.warning(f"Sélecteurs de cartes non simples {self.card_selectors}: parsing de la page entière")
+
+    def parse(self, html, card_order=None):
+        """
+        Parse une page en ne construisant que les sous-arbres utiles.
+
+        Args:
+            html (str): Contenu HTML de la page
+            card_order (list, optional): Sélecteurs de cartes dans l'ordre où les essayer
+
+        Returns:
+            BeautifulSoup: Arbre contenant les cartes, le titre et les éléments de captcha
+        """
+        if self.strainer is None:
+            return BeautifulSoup(html, _soup_features())
+
+        if self.backend == 'selectolax':
+            return self._parse_with_selectolax(html, card_order or self.card_selectors)
+
+        return BeautifulSoup(html, self.backend, parse_only=self.strainer)
+
+    def _parse_with_selectolax(self, html, card_order):
+        """
+        Localise les cartes avec selectolax puis parse uniquement leur HTML.
+
+        Args:
+            html (str): Contenu HTML de la page
+            card_order (list): Sélecteurs de cartes
+
+        Returns:
+            BeautifulSoup: Arbre contenant les cartes, le titre et les éléments de captcha
+        """
+        tree = SelectolaxParser(html)
+
+        # Comme _extract_job_cards, les cartes de tous les sélecteurs sont retenues
+        found, matched = {}, 0
+        for selector in card_order:
+            nodes = tree.css(selector)
+            if nodes:
+                matched += 1
+                found.update((node.mem_id, node) for node in nodes)
+        cards = list(found.values())
+        if matched > 1:
+            # Balisages mélangés : ordre du document, sans les cartes contenues dans une autre
+            cards = [node for node in tree.root.traverse()
+                     if node.mem_id in found and not self._inside(node, found)]
+
+        fragments = [node.html for node in cards]
+        for selector in BLOCK_SELECTORS:
+            fragments.extend(node.html for node in tree.css(selector))
+
+        return BeautifulSoup(''.join(fragments), _soup_features())
+
+    @staticmethod
+    def _inside(node, found):
+        """
+        Indique si un nœud selectolax est contenu dans l'un des nœuds trouvés.
+
+        Args:
+            node: Nœud selectolax
+            found (dict): Nœuds trouvés, indexés par mem_id
+
+        Returns:
+            bool: True si un ancêtre du nœud fait partie des nœuds trouvés
+        """
+        parent = node.parent
+        while parent is not None:
+            if parent.mem_id in found:
+                return True
+            parent = parent.parent
+        return False
@@ -0,0 +1,457 @@
+"""
+Cache HTTP sur disque pour les pages scrapées.
+
+Les réponses GET sont enregistrées compressées (gzip) avec leurs en-têtes
+ETag / Last-Modified. Une page récupérée depuis moins que la durée minimale
+de fraîcheur de sa source est servie sans requête ; au-delà, elle est
+revalidée avec If-None-Match / If-Modified-Since et une réponse 304 réutilise
+le contenu enregistré. La durée minimale de fraîcheur est une politique du
+scraper : elle s'applique même si le site envoie no-cache / no-store.
+La taille du répertoire est bornée par MAX_SIZE : les entrées les moins
+récemment utilisées sont supprimées en premier. Les pages de blocage
+(captcha, "Access Denied") sont retirées du cache par invalidate().
+Les compteurs d'utilisation sont exposés par stats().
+"""
+
+import os
+import gzip
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from app.config.scraper_config import state_path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Répertoire du cache (désactivé si vide)
+HTTP_CACHE_DIR = os.environ.get('SCRAPER_HTTP_CACHE_DIR', state_path('http_cache'))
+
+# Au-delà de cette durée, une entrée n'est plus revalidée mais supprimée (secondes)
+MAX_STALE = 7 * 24 * 3600
+
+# Taille maximale du répertoire du cache (octets)
+MAX_SIZE = int(os.environ.get('SCRAPER_HTTP_CACHE_MAX_MB', 256)) * 1024 * 1024
+
+# Nombre d'enregistrements entre deux passes d'éviction
+EVICTION_INTERVAL = 100
+
+# En-têtes de réponse conservés avec le contenu
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control')
+
+
+def _max_age(headers):
+    """
+    Extrait la directive max-age de l'en-tête Cache-Control.
+
+    Args:
+        headers (dict): En-têtes de la réponse
+
+    Returns:
+        int: Durée de fraîcheur annoncée par le serveur (0 si absente ou no-cache)
+    """
+    cache_control = (headers.get('Cache-Control') or '').lower()
+    if 'no-store' in cache_control or 'no-cache' in cache_control:
+        return 0
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name == 'max-age' and value.strip().isdigit():
+            return int(value.strip())
+    return 0
+
+
+def decode_body(body, headers):
+    """
+    Décode le contenu d'une réponse selon le jeu de caractères annoncé.
+
+    Args:
+        body (bytes): Contenu brut
+        headers (dict): En-têtes de la réponse
+
+    Returns:
+        str: Contenu décodé
+    """
+    encoding = get_encoding_from_headers(CaseInsensitiveDict(headers)) or 'utf-8'
+    try:
+        return body.decode(encoding, errors='replace')
+    except LookupError:
+        return body.decode('utf-8', errors='replace')
+
+
+class CacheEntry:
+    """
+    Réponse enregistrée dans le cache.
+    """
+
+    __slots__ = ('url', 'headers', 'stored_at', 'body')
+
+    def __init__(self, url, headers, stored_at, body):
+        self.url = url
+        self.headers = headers
+        self.stored_at = stored_at
+        self.body = body
+
+    def is_fresh(self, min_ttl):
+        """
+        Indique si l'entrée peut être servie sans revalidation.
+
+        Args:
+            min_ttl (int): Durée minimale de fraîcheur de la source (secondes)
+
+        Returns:
+            bool: True si l'entrée est fraîche
+        """
+        ttl = max(min_ttl or 0, _max_age(self.headers))
+        return time.time() - self.stored_at < ttl
+
+    def conditional_headers(self):
+        """
+        Retourne les en-têtes de revalidation de l'entrée.
+
+        Returns:
+            dict: En-têtes If-None-Match / If-Modified-Since
+        """
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    @property
+    def text(self):
+        """Contenu décodé de l'entrée."""
+        return decode_body(self.body, self.headers)
+
+
+class HTTPCache:
+    """
+    Cache HTTP sur disque, partagé par les sessions requests et le moteur asynchrone.
+    """
+
+    def __init__(self, directory=HTTP_CACHE_DIR, max_size=MAX_SIZE):
+        """
+        Args:
+            directory (str): Répertoire du cache (None ou vide pour désactiver)
+            max_size (int): Taille maximale du répertoire (octets)
+        """
+        self.directory = directory
+        self.max_size = max_size
+        self._counters = {'hits': 0, 'revalidated': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self._lock = threading.Lock()
+        self._evict_lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Indique si le cache est actif."""
+        return bool(self.directory)
+
+    def _paths(self, url):
+        """
+        Retourne les chemins des fichiers d'une URL.
+
+        Args:
+            url (str): URL
+
+        Returns:
+            tuple: (chemin des métadonnées, chemin du contenu compressé)
+        """
+        return self._key_paths(hashlib.sha1(url.encode('utf-8')).hexdigest())
+
+    def _key_paths(self, key):
+        """Retourne les chemins des fichiers d'une clé du cache."""
+        base = os.path.join(self.directory, key)
+        return f"{base}.json", f"{base}.gz"
+
+    def _count(self, counter, value=1):
+        """
+        Incrémente un compteur d'utilisation.
+
+        Args:
+            counter (str): Nom du compteur
+            value (int): Valeur ajoutée
+
+        Returns:
+            int: Nouvelle valeur du compteur
+        """
+        with self._lock:
+            self._counters[counter] += value
+            return self._counters[counter]
+
+    def record_hit(self, revalidated=False):
+        """
+        Compte une réponse servie depuis le cache.
+
+        Args:
+            revalidated (bool): True si le serveur a confirmé l'entrée (304)
+        """
+        self._count('revalidated' if revalidated else 'hits')
+
+    def record_miss(self):
+        """
+        Compte une réponse téléchargée en entier.
+        """
+        self._count('misses')
+
+    def stats(self):
+        """
+        Retourne les compteurs d'utilisation du cache.
+
+        Returns:
+            dict: Compteurs hits, revalidated, misses, stores et taux de succès
+        """
+        with self._lock:
+            counters = dict(self._counters)
+        served = counters['hits'] + counters['revalidated']
+        total = served + counters['misses']
+        counters['hit_rate'] = round(served / total, 4) if total else None
+        return counters
+
+    def lookup(self, url, load_body=True):
+        """
+        Recherche l'entrée d'une URL.
+
+        Args:
+            url (str): URL
+            load_body (bool): False pour ne lire que les métadonnées (entrée sans contenu),
+                              par exemple pour tester la fraîcheur avant une requête
+
+        Returns:
+            CacheEntry ou None: Entrée enregistrée ou None
+        """
+        if not self.enabled:
+            return None
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('url') != url:
+                return None
+            if time.time() - meta['stored_at'] > MAX_STALE:
+                self._remove(url)
+                return None
+            if not load_body:
+                return CacheEntry(url, meta['headers'], meta['stored_at'], None)
+            with gzip.open(body_path, 'rb') as f:
+                body = f.read()
+            # Date d'utilisation pour l'éviction (la date d'enregistrement reste dans les métadonnées)
+            os.utime(meta_path)
+            return CacheEntry(url, meta['headers'], meta['stored_at'], body)
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def store(self, url, headers, body):
+        """
+        Enregistre une réponse 200.
+
+        Args:
+            url (str): URL
+            headers (dict): En-têtes de la réponse
+            body (bytes): Contenu brut
+
+        Returns:
+            CacheEntry ou None: Entrée enregistrée (None si le cache est désactivé)
+        """
+        if not self.enabled:
+            return None
+        kept = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        entry = CacheEntry(url, kept, time.time(), body)
+        meta_path, body_path = self._paths(url)
+        try:
+            # Le contenu est écrit avant les métadonnées : une entrée lisible est toujours complète
+            self._write_atomic(body_path, gzip.compress(body), binary=True)
+            self._write_atomic(meta_path, json.dumps({'url': url, 'headers': kept, 'stored_at': entry.stored_at}))
+            if self._count('stores') % EVICTION_INTERVAL == 0:
+                self.evict()
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer {url} dans le cache HTTP: {str(e)}")
+        return entry
+
+    def invalidate(self, url):
+        """
+        Retire une page du cache (ex: page de blocage ou de captcha).
+
+        Args:
+            url (str): URL de la page
+        """
+        if self.enabled:
+            self._remove(url)
+
+    def evict(self):
+        """
+        Supprime les entrées expirées, puis les moins récemment utilisées
+        jusqu'à ce que le répertoire ne dépasse plus max_size.
+
+        Returns:
+            int: Nombre d'entrées supprimées
+        """
+        # Une seule passe à la fois, les autres threads continuent à enregistrer
+        if not self.enabled or not self._evict_lock.acquire(blocking=False):
+            return 0
+        try:
+            now = time.time()
+            try:
+                names = os.listdir(self.directory)
+            except OSError:
+                return 0
+
+            # {clé: [taille des fichiers, date de dernière utilisation]}
+            entries = {}
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                key, ext = os.path.splitext(name)
+                if ext == '.tmp':
+                    # Fichier temporaire abandonné par un processus interrompu
+                    if now - stat.st_mtime > 3600:
+                        self._unlink(path)
+                    continue
+                entry = entries.setdefault(key, [0, 0.0])
+                entry[0] += stat.st_size
+                if ext == '.json':
+                    entry[1] = stat.st_mtime
+
+            total = sum(size for size, _ in entries.values())
+            removed = 0
+            for key, (size, used) in sorted(entries.items(), key=lambda item: item[1][1]):
+                if total <= self.max_size and now - used <= MAX_STALE:
+                    break
+                for path in self._key_paths(key):
+                    self._unlink(path)
+                total -= size
+                removed += 1
+            if removed:
+                self._count('evictions', removed)
+                logger.info(f"Cache HTTP : {removed} entrées supprimées")
+            return removed
+        finally:
+            self._evict_lock.release()
+
+    def touch(self, entry):
+        """
+        Marque une entrée comme revalidée (réponse 304).
+
+        Args:
+            entry (CacheEntry): Entrée revalidée
+        """
+        entry.stored_at = time.time()
+        meta_path, _ = self._paths(entry.url)
+        try:
+            self._write_atomic(meta_path, json.dumps({
+                'url': entry.url, 'headers': entry.headers, 'stored_at': entry.stored_at
+            }))
+        except OSError as e:
+            logger.warning(f"Impossible de mettre à jour {entry.url} dans le cache HTTP: {str(e)}")
+
+    def _remove(self, url):
+        """
+        Supprime l'entrée d'une URL.
+
+        Args:
+            url (str): URL
+        """
+        for path in self._paths(url):
+            self._unlink(path)
+
+    @staticmethod
+    def _unlink(path):
+        """Supprime un fichier s'il existe."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _write_atomic(self, path, data, binary=False):
+        """
+        Écrit un fichier de façon atomique.
+
+        Args:
+            path (str): Chemin du fichier
+            data (str ou bytes): Contenu
+            binary (bool): True si le contenu est binaire
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb' if binary else 'w') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+
+class CachingHTTPAdapter(HTTPAdapter):
+    """
+    Adaptateur requests qui sert et revalide les requêtes GET depuis le cache HTTP.
+    """
+
+    def __init__(self, cache, min_ttl=0, **kwargs):
+        """
+        Args:
+            cache (HTTPCache): Cache HTTP
+            min_ttl (int): Durée minimale de fraîcheur de la source (secondes)
+            **kwargs: Arguments de HTTPAdapter (max_retries...)
+        """
+        super().__init__(**kwargs)
+        self.cache = cache
+        self.min_ttl = min_ttl
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET' or not self.cache.enabled:
+            return super().send(request, **kwargs)
+
+        entry = self.cache.lookup(request.url)
+        # "Cache-Control: no-cache" : la page est revalidée auprès du site même si elle est fraîche
+        revalidate = 'no-cache' in request.headers.get('Cache-Control', '')
+        if entry and entry.is_fresh(self.min_ttl) and not revalidate:
+            self.cache.record_hit()
+            return self._build_cached_response(request, entry)
+
+        if entry:
+            request.headers.update(entry.conditional_headers())
+
+        response = super().send(request, **kwargs)
+
+        if entry and response.status_code == 304:
+            self.cache.touch(entry)
+            self.cache.record_hit(revalidated=True)
+            return self._build_cached_response(request, entry)
+
+        self.cache.record_miss()
+        if response.status_code == 200:
+            self.cache.store(request.url, response.headers, response.content)
+        return response
+
+    def _build_cached_response(self, request, entry):
+        """
+        Construit une réponse requests à partir d'une entrée du cache.
+
+        Args:
+            request (PreparedRequest): Requête d'origine
+            entry (CacheEntry): Entrée du cache
+
+        Returns:
+            requests.Response: Réponse 200 avec le contenu enregistré
+        """
+        response = Response()
+        response.status_code = 200
+        response.reason = 'OK'
+        response.url = request.url
+        response.request = request
+        response.headers = CaseInsensitiveDict(entry.headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry.body
+        response.connection = self
+        return response
+
+
+# Instance globale partagée par tous les scrapers
+http_cache = HTTPCache()
@@ -3,14 +3,13 @@ Scraper pour Indeed.
 """
 
 import logging
-import time
 import random
 from datetime import datetime, timezone
 
 from app.config.scraper_config import SCRAPER_CONFIG
 from app.services.scraper.base_scraper import BaseScraper
 from app.services.scraper.utils import (
-    format_url, extract_salary, extract_experience, 
+    extract_salary, extract_experience, 
     extract_skills, clean_company_name
 )
 
@@ -28,55 +27,7 @@ class IndeedScraper(BaseScraper):
         """
         super().__init__(SCRAPER_CONFIG['indeed'])
         self.name = "indeed"
-        
-    def scrape(self, query, location):
-        """
-        Scrape les offres d'emploi depuis Indeed.
-        
-        Args:
-            query (str): Terme de recherche
-            location (str): Lieu de recherche
-            
-        Returns:
-            list: Liste des offres d'emploi scrapées
-        """
-        if not query:
-            query = "développeur"
-            
-        # Construire l'URL
-        url = format_url(
-            self.config['base_url'],
-            self.config['params'],
-            query,
-            location if location else 'France'
-        )
-        
-        # Récupérer la page
-        soup = self._get_page(url)
-        if not soup:
-            logger.error(f"Impossible de récupérer la page Indeed: {url}")
-            return []
-            
-        # Extraire les cartes d'offres
-        job_cards = self._extract_job_cards(soup)
-        logger.info(f"Trouvé {len(job_cards)} offres d'emploi sur Indeed")
-        
-        # Extraire les données de chaque carte
-        jobs = []
-        for i, card in enumerate(job_cards[:20]):  # Limiter à 20 offres
-            try:
-                job_data = self._build_job_data(card, query, location, url)
-                if job_data:
-                    jobs.append(job_data)
-                    
-                # Pause aléatoire pour éviter d'être bloqué
-                time.sleep(random.uniform(0.2, 0.5))
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'extraction de l'offre Indeed {i+1}: {str(e)}")
-                continue
-                
-        return jobs
+        self.label = "Indeed"
         
     def _build_job_data(self, card, query, location, base_url):
         """
@@ -114,6 +65,9 @@ class IndeedScraper(BaseScraper):
         elif not job_url:
             job_url = f"{base_url}&vjk={random.randint(1000, 9999)}"
             
+        # Extraire la date de publication
+        _, posted_date = self._extract_posted_date(card, selectors['date'])
+            
         # Extraire la description
         description = self._extract_text(card, selectors['description'], f"Offre pour le poste de {title} chez {company_name} à {location_val}.")
         
@@ -150,7 +104,8 @@ class IndeedScraper(BaseScraper):
             'source_url': job_url,
             'skills': skills if skills else [query] if query else ['Non spécifié'],
             'source': 'Indeed',
-            'scraped_date': datetime.now(timezone.utc).replace(year=2023)
+            'posted_date': posted_date,
+            'scraped_date': datetime.now(timezone.utc)
         }
         
         return job
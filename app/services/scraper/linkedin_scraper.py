@@ -3,14 +3,12 @@ Scraper pour LinkedIn.
 """
 
 import logging
-import time
-import random
 from datetime import datetime, timezone
 
 from app.config.scraper_config import SCRAPER_CONFIG
 from app.services.scraper.base_scraper import BaseScraper
 from app.services.scraper.utils import (
-    format_url, extract_experience, extract_skills, clean_company_name
+    extract_experience, extract_skills, clean_company_name
 )
 
 # Configuration du logger
@@ -27,55 +25,7 @@ class LinkedInScraper(BaseScraper):
         """
         super().__init__(SCRAPER_CONFIG['linkedin'])
         self.name = "linkedin"
-        
-    def scrape(self, query, location):
-        """
-        Scrape les offres d'emploi depuis LinkedIn.
-        
-        Args:
-            query (str): Terme de recherche
-            location (str): Lieu de recherche
-            
-        Returns:
-            list: Liste des offres d'emploi scrapées
-        """
-        if not query:
-            query = "développeur"
-            
-        # Construire l'URL
-        url = format_url(
-            self.config['base_url'],
-            self.config['params'],
-            query,
-            location if location else 'France'
-        )
-        
-        # Récupérer la page
-        soup = self._get_page(url)
-        if not soup:
-            logger.error(f"Impossible de récupérer la page LinkedIn: {url}")
-            return []
-            
-        # Extraire les cartes d'offres
-        job_cards = self._extract_job_cards(soup)
-        logger.info(f"Trouvé {len(job_cards)} offres d'emploi sur LinkedIn")
-        
-        # Extraire les données de chaque carte
-        jobs = []
-        for i, card in enumerate(job_cards[:20]):  # Limiter à 20 offres
-            try:
-                job_data = self._build_job_data(card, query, location, url)
-                if job_data:
-                    jobs.append(job_data)
-                    
-                # Pause aléatoire pour éviter d'être bloqué
-                time.sleep(random.uniform(0.2, 0.5))
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'extraction de l'offre LinkedIn {i+1}: {str(e)}")
-                continue
-                
-        return jobs
+        self.label = "LinkedIn"
         
     def _build_job_data(self, card, query, location, base_url):
         """
@@ -117,10 +67,10 @@ class LinkedInScraper(BaseScraper):
                 job_url = base_url
                 
         # Extraire la date de publication
-        posted_date = self._extract_text(card, selectors['date'], "Récemment")
+        posted_text, posted_date = self._extract_posted_date(card, selectors['date'], "Récemment")
         
         # Créer une description
-        description = f"Offre pour le poste de {title} chez {company_name} à {location_val}. Publiée {posted_date}."
+        description = f"Offre pour le poste de {title} chez {company_name} à {location_val}. Publiée {posted_text}."
         
         # Extraire les compétences
         skills = extract_skills(description)
@@ -146,7 +96,8 @@ class LinkedInScraper(BaseScraper):
             'source_url': job_url,
             'skills': skills if skills else [query] if query else ['Non spécifié'],
             'source': 'LinkedIn',
-            'scraped_date': datetime.now(timezone.utc).replace(year=2023)
+            'posted_date': posted_date,
+            'scraped_date': datetime.now(timezone.utc)
         }
         
         return job
@@ -0,0 +1,183 @@
+"""
+Métriques de scraping par source et par étape.
+
+Chaque étape d'un rafraîchissement est chronométrée par source :
+- 'rate_limit' : attente imposée par la limitation de débit ;
+- 'fetch' / 'detail_fetch' : requête d'une page de résultats / d'une page d'offre ;
+- 'parse' : parsing du HTML (cartes uniquement) et détection de blocage ;
+- 'extract' : localisation des cartes d'offres ;
+- 'build' : construction d'une offre à partir de sa carte ;
+- 'save' : enregistrement d'un lot d'offres (source 'all', les lots mélangent les sources).
+
+Des compteurs complètent les durées : pages, octets reçus, cartes, offres,
+sélecteurs sans résultat et erreurs. Les valeurs sont agrégées en mémoire
+pour tout le processus (exposées par /monitoring/scraper-metrics) et, en
+parallèle, pour le scraping en cours (résumé retourné par
+scrape_all(with_summary=True)). Le scraping en cours est suivi par une
+variable de contexte : les fonctions confiées à un pool de threads doivent
+être enveloppées par in_context pour y être rattachées.
+"""
+
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# Collecteur du scraping en cours (None hors de collect())
+_current_run = contextvars.ContextVar('scrape_run_metrics', default=None)
+
+
+class ScrapeMetrics:
+    """
+    Agrégats de durées et de compteurs par source.
+    """
+
+    def __init__(self):
+        self._stages = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def observe(self, source, stage, seconds):
+        """
+        Ajoute une durée à une étape.
+
+        Args:
+            source (str): Nom de la source
+            stage (str): Nom de l'étape
+            seconds (float): Durée mesurée
+        """
+        with self._lock:
+            stats = self._stages.setdefault(source, {}).get(stage)
+            if stats is None:
+                self._stages[source][stage] = [1, seconds, seconds]
+            else:
+                stats[0] += 1
+                stats[1] += seconds
+                stats[2] = max(stats[2], seconds)
+
+    def incr(self, source, counter, value=1):
+        """
+        Incrémente un compteur.
+
+        Args:
+            source (str): Nom de la source
+            counter (str): Nom du compteur
+            value (int): Valeur ajoutée
+        """
+        with self._lock:
+            counters = self._counters.setdefault(source, {})
+            counters[counter] = counters.get(counter, 0) + value
+
+    def snapshot(self):
+        """
+        Retourne une copie des agrégats.
+
+        Returns:
+            dict: {source: {'stages': {étape: {count, total, avg, max}}, 'counters': {compteur: valeur}}}
+        """
+        with self._lock:
+            sources = set(self._stages) | set(self._counters)
+            return {
+                source: {
+                    'stages': {
+                        stage: {
+                            'count': count,
+                            'total': round(total, 4),
+                            'avg': round(total / count, 4),
+                            'max': round(maximum, 4)
+                        }
+                        for stage, (count, total, maximum) in self._stages.get(source, {}).items()
+                    },
+                    'counters': dict(self._counters.get(source, {}))
+                }
+                for source in sorted(sources)
+            }
+
+    def reset(self):
+        """Remet tous les agrégats à zéro."""
+        with self._lock:
+            self._stages.clear()
+            self._counters.clear()
+
+
+def observe(source, stage, seconds):
+    """
+    Enregistre une durée dans les métriques du processus et du scraping en cours.
+
+    Args:
+        source (str): Nom de la source
+        stage (str): Nom de l'étape
+        seconds (float): Durée mesurée
+    """
+    scrape_metrics.observe(source, stage, seconds)
+    run = _current_run.get()
+    if run is not None:
+        run.observe(source, stage, seconds)
+
+
+def incr(source, counter, value=1):
+    """
+    Incrémente un compteur dans les métriques du processus et du scraping en cours.
+
+    Args:
+        source (str): Nom de la source
+        counter (str): Nom du compteur
+        value (int): Valeur ajoutée
+    """
+    scrape_metrics.incr(source, counter, value)
+    run = _current_run.get()
+    if run is not None:
+        run.incr(source, counter, value)
+
+
+@contextmanager
+def timed(source, stage):
+    """
+    Chronomètre un bloc (la durée est enregistrée même si le bloc lève une exception).
+
+    Args:
+        source (str): Nom de la source
+        stage (str): Nom de l'étape
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(source, stage, time.perf_counter() - started)
+
+
+@contextmanager
+def collect():
+    """
+    Collecte à part les métriques du scraping exécuté dans le bloc.
+
+    Yields:
+        ScrapeMetrics: Métriques du scraping en cours
+    """
+    run = ScrapeMetrics()
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+
+def in_context(fn):
+    """
+    Rattache une fonction exécutée dans un autre thread au scraping en cours.
+
+    Args:
+        fn (callable): Fonction à confier à un pool de threads
+
+    Returns:
+        callable: Fonction exécutée dans une copie du contexte courant
+    """
+    context = contextvars.copy_context()
+
+    def run(*args, **kwargs):
+        return context.run(fn, *args, **kwargs)
+    return run
+
+
+# Instance globale : métriques cumulées depuis le démarrage du processus
+scrape_metrics = ScrapeMetrics()
@@ -3,14 +3,12 @@ Scraper pour Pôle Emploi.
 """
 
 import logging
-import time
-import random
 from datetime import datetime, timezone
 
 from app.config.scraper_config import SCRAPER_CONFIG
 from app.services.scraper.base_scraper import BaseScraper
 from app.services.scraper.utils import (
-    format_url, extract_salary, extract_experience, 
+    extract_salary, extract_experience, 
     extract_skills, clean_company_name
 )
 
@@ -28,55 +26,8 @@ class PoleEmploiScraper(BaseScraper):
         """
         super().__init__(SCRAPER_CONFIG['pole_emploi'])
         self.name = "pole_emploi"
-        
-    def scrape(self, query, location):
-        """
-        Scrape les offres d'emploi depuis Pôle Emploi.
-        
-        Args:
-            query (str): Terme de recherche
-            location (str): Lieu de recherche
-            
-        Returns:
-            list: Liste des offres d'emploi scrapées
-        """
-        if not query:
-            query = "développeur"
-            
-        # Construire l'URL
-        url = format_url(
-            self.config['base_url'],
-            self.config['params'],
-            query,
-            location if location else 'FRANCE'
-        )
-        
-        # Récupérer la page
-        soup = self._get_page(url)
-        if not soup:
-            logger.error(f"Impossible de récupérer la page Pôle Emploi: {url}")
-            return []
-            
-        # Extraire les cartes d'offres
-        job_cards = self._extract_job_cards(soup)
-        logger.info(f"Trouvé {len(job_cards)} offres d'emploi sur Pôle Emploi")
-        
-        # Extraire les données de chaque carte
-        jobs = []
-        for i, card in enumerate(job_cards[:20]):  # Limiter à 20 offres
-            try:
-                job_data = self._build_job_data(card, query, location, url)
-                if job_data:
-                    jobs.append(job_data)
-                    
-                # Pause aléatoire pour éviter d'être bloqué
-                time.sleep(random.uniform(0.2, 0.5))
-                
-            except Exception as e:
-                logger.error(f"Erreur lors de l'extraction de l'offre Pôle Emploi {i+1}: {str(e)}")
-                continue
-                
-        return jobs
+        self.label = "Pôle Emploi"
+        self.default_location = "FRANCE"
         
     def _build_job_data(self, card, query, location, base_url):
         """
@@ -120,6 +71,9 @@ class PoleEmploiScraper(BaseScraper):
             else:
                 job_url = base_url
                 
+        # Extraire la date de publication
+        _, posted_date = self._extract_posted_date(card, selectors['date'])
+            
         # Extraire la description
         description = self._extract_text(card, selectors['description'], f"Offre pour le poste de {title} chez {company_name} à {location_val}.")
         
@@ -145,7 +99,8 @@ class PoleEmploiScraper(BaseScraper):
             'source_url': job_url,
             'skills': skills if skills else [query] if query else ['Non spécifié'],
             'source': 'Pôle Emploi',
-            'scraped_date': datetime.now(timezone.utc).replace(year=2023)
+            'posted_date': posted_date,
+            'scraped_date': datetime.now(timezone.utc)
         }
         
         return job
@@ -0,0 +1,220 @@
+"""
+Limitation de débit par hôte (seau à jetons).
+
+Chaque hôte dispose d'un seau de `calls` jetons rechargé au rythme de
+`calls / period` jetons par seconde : tant que le budget n'est pas épuisé,
+une requête part immédiatement, et les rafales sont limitées à `calls`.
+Le limiteur est partagé par tous les scrapers et toutes les recherches du
+processus ; une base SQLite peut être configurée pour le partager entre
+plusieurs processus (SCRAPER_RATE_LIMIT_DB).
+
+Le limiteur fonctionne par réservation : `reserve` prélève un jeton
+(le solde pouvant devenir négatif) et retourne le délai d'attente avant
+que ce jeton soit réellement disponible. L'appelant attend ensuite avec
+time.sleep ou asyncio.sleep selon son mode d'exécution.
+"""
+
+import os
+import time
+import sqlite3
+import asyncio
+import threading
+import urllib.parse
+
+# Chemin de la base SQLite partagée entre processus (désactivé si vide)
+RATE_LIMIT_DB = os.environ.get('SCRAPER_RATE_LIMIT_DB', '')
+
+
+def _bucket_params(config):
+    """
+    Convertit une configuration {calls, period} en paramètres de seau.
+
+    Args:
+        config (dict): Configuration de limitation de débit
+
+    Returns:
+        tuple: (capacité en jetons, jetons rechargés par seconde)
+    """
+    calls = config.get('calls', 5)
+    period = config.get('period', 60)
+    return float(calls), calls / float(period)
+
+
+def _refill(tokens, updated, capacity, rate, now):
+    """
+    Calcule le solde d'un seau après rechargement.
+
+    Args:
+        tokens (float): Solde au moment `updated`
+        updated (float): Date de la dernière mise à jour (secondes)
+        capacity (float): Capacité du seau
+        rate (float): Jetons rechargés par seconde
+        now (float): Date courante (secondes)
+
+    Returns:
+        float: Solde rechargé, plafonné à la capacité
+    """
+    return min(capacity, tokens + (now - updated) * rate)
+
+
+class MemoryBucketStore:
+    """
+    Seaux conservés en mémoire, partagés par les threads du processus.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, key, capacity, rate):
+        """
+        Prélève un jeton dans le seau d'un hôte.
+
+        Args:
+            key (str): Hôte
+            capacity (float): Capacité du seau
+            rate (float): Jetons rechargés par seconde
+
+        Returns:
+            float: Délai d'attente en secondes (0 si un jeton était disponible)
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = _refill(tokens, updated, capacity, rate, now) - 1
+            self._buckets[key] = (tokens, now)
+        return max(0.0, -tokens / rate)
+
+
+class SQLiteBucketStore:
+    """
+    Seaux conservés dans une base SQLite, partagés entre processus.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Chemin de la base SQLite
+        """
+        self.path = path
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rate_limit_bucket ("
+                "host TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+            )
+
+    def _connect(self):
+        """
+        Retourne la connexion SQLite du thread courant.
+
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, key, capacity, rate):
+        """
+        Prélève un jeton dans le seau d'un hôte, dans une transaction exclusive.
+
+        Args:
+            key (str): Hôte
+            capacity (float): Capacité du seau
+            rate (float): Jetons rechargés par seconde
+
+        Returns:
+            float: Délai d'attente en secondes (0 si un jeton était disponible)
+        """
+        # Horloge murale : time.monotonic n'est pas comparable entre processus
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated FROM rate_limit_bucket WHERE host = ?", (key,)
+            ).fetchone()
+            tokens, updated = row if row else (capacity, now)
+            tokens = _refill(tokens, updated, capacity, rate, now) - 1
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_limit_bucket (host, tokens, updated) VALUES (?, ?, ?)",
+                (key, tokens, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return max(0.0, -tokens / rate)
+
+
+class HostRateLimiter:
+    """
+    Limiteur de débit par hôte, utilisable depuis des threads ou une boucle asyncio.
+    """
+
+    def __init__(self, store=None):
+        """
+        Args:
+            store (MemoryBucketStore ou SQLiteBucketStore, optional): Stockage des seaux.
+                Par défaut, SQLite si SCRAPER_RATE_LIMIT_DB est défini, sinon mémoire.
+        """
+        if store is None:
+            store = SQLiteBucketStore(RATE_LIMIT_DB) if RATE_LIMIT_DB else MemoryBucketStore()
+        self.store = store
+
+    def reserve(self, url, config, scope=None):
+        """
+        Réserve une requête vers l'hôte d'une URL.
+
+        Args:
+            url (str): URL de la requête
+            config (dict): Configuration {calls, period} de la source
+            scope (str, optional): Budget distinct au sein de l'hôte (ex: 'detail' pour les pages d'offres)
+
+        Returns:
+            float: Délai à attendre avant d'envoyer la requête (secondes)
+        """
+        if not config:
+            return 0.0
+        capacity, rate = _bucket_params(config)
+        host = urllib.parse.urlparse(url).netloc if url else ''
+        key = host or 'default'
+        if scope:
+            key = f"{key}#{scope}"
+        return self.store.reserve(key, capacity, rate)
+
+    def wait(self, url, config, scope=None):
+        """
+        Attend (en bloquant le thread) que la requête soit autorisée.
+
+        Args:
+            url (str): URL de la requête
+            config (dict): Configuration {calls, period} de la source
+            scope (str, optional): Budget distinct au sein de l'hôte
+        """
+        delay = self.reserve(url, config, scope)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def async_wait(self, url, config):
+        """
+        Attend (sans bloquer la boucle d'événements) que la requête soit autorisée.
+
+        Args:
+            url (str): URL de la requête
+            config (dict): Configuration {calls, period} de la source
+        """
+        if isinstance(self.store, SQLiteBucketStore):
+            # La transaction SQLite peut attendre le verrou jusqu'à 10 s : hors de la boucle
+            delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, url, config)
+        else:
+            delay = self.reserve(url, config)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Instance globale partagée par tous les scrapers du processus
+host_rate_limiter = HostRateLimiter()
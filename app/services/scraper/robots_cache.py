@@ -0,0 +1,260 @@
+"""
+Cache des règles robots.txt par origine.
+
+Le fichier robots.txt d'un site n'est téléchargé qu'une fois par durée de
+validité (déduite des en-têtes Cache-Control / Expires, 24 h par défaut).
+Les scrapers concurrents partagent un seul téléchargement par origine, et
+le cache est enregistré sur disque pour survivre aux redémarrages.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+import urllib.parse
+from email.utils import parsedate_to_datetime
+from urllib.robotparser import RobotFileParser
+
+import requests
+
+from app.config.scraper_config import state_path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Fichier de persistance du cache
+ROBOTS_CACHE_PATH = os.environ.get('SCRAPER_ROBOTS_CACHE', state_path('robots_cache.json'))
+
+# Durées de validité (secondes)
+DEFAULT_TTL = 24 * 3600
+MIN_TTL = 3600
+MAX_TTL = 7 * 24 * 3600
+# Après une erreur réseau, on réessaie plus tôt
+ERROR_TTL = 300
+
+# États possibles d'une entrée
+ALLOW_ALL = 'allow_all'
+DISALLOW_ALL = 'disallow_all'
+RULES = 'rules'
+
+
+def _origin(url):
+    """
+    Retourne l'origine (schéma + hôte) d'une URL.
+
+    Args:
+        url (str): URL
+
+    Returns:
+        str: Origine (ex: "https://fr.indeed.com")
+    """
+    parsed = urllib.parse.urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def _ttl_from_headers(headers):
+    """
+    Détermine la durée de validité d'un robots.txt à partir des en-têtes HTTP.
+
+    Args:
+        headers (dict): En-têtes de la réponse
+
+    Returns:
+        int: Durée de validité en secondes, bornée par MIN_TTL et MAX_TTL
+    """
+    ttl = DEFAULT_TTL
+    cache_control = headers.get('Cache-Control', '')
+    for directive in cache_control.split(','):
+        name, _, value = directive.strip().partition('=')
+        if name.lower() in ('max-age', 's-maxage') and value.strip().isdigit():
+            ttl = int(value.strip())
+            break
+    else:
+        expires = headers.get('Expires')
+        if expires:
+            try:
+                ttl = int(parsedate_to_datetime(expires).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    return max(MIN_TTL, min(MAX_TTL, ttl))
+
+
+class RobotsPolicyCache:
+    """
+    Cache des règles robots.txt, partagé par tous les scrapers du processus.
+    """
+
+    def __init__(self, path=ROBOTS_CACHE_PATH, timeout=10):
+        """
+        Initialise le cache (le fichier est lu à la première utilisation).
+
+        Args:
+            path (str): Fichier de persistance (None pour ne rien enregistrer)
+            timeout (float): Délai maximal de téléchargement d'un robots.txt
+        """
+        self.path = path
+        self.timeout = timeout
+        self._entries = {}
+        self._parsers = {}
+        self._origin_locks = {}
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self):
+        """
+        Charge les entrées enregistrées sur disque.
+        """
+        with self._lock:
+            if self._loaded:
+                return
+            self._loaded = True
+            if not self.path or not os.path.exists(self.path):
+                return
+            try:
+                with open(self.path, encoding='utf-8') as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Impossible de lire le cache robots.txt {self.path}: {str(e)}")
+
+    def _save(self):
+        """
+        Enregistre les entrées sur disque (écriture atomique).
+        """
+        if not self.path:
+            return
+        with self._lock:
+            snapshot = dict(self._entries)
+        try:
+            directory = os.path.dirname(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"Impossible d'enregistrer le cache robots.txt {self.path}: {str(e)}")
+
+    def _origin_lock(self, origin):
+        """
+        Retourne le verrou garantissant un seul téléchargement simultané par origine.
+
+        Args:
+            origin (str): Origine
+
+        Returns:
+            threading.Lock: Verrou de l'origine
+        """
+        with self._lock:
+            lock = self._origin_locks.get(origin)
+            if lock is None:
+                lock = self._origin_locks[origin] = threading.Lock()
+            return lock
+
+    def _fresh_entry(self, origin):
+        """
+        Retourne l'entrée d'une origine si elle est encore valide.
+
+        Args:
+            origin (str): Origine
+
+        Returns:
+            dict ou None: Entrée valide ou None
+        """
+        entry = self._entries.get(origin)
+        if entry and entry['expires'] > time.time():
+            return entry
+        return None
+
+    def _fetch(self, origin, user_agent):
+        """
+        Télécharge le robots.txt d'une origine et construit son entrée.
+        Reprend les règles de RobotFileParser.read : 401/403 interdisent tout,
+        les autres erreurs 4xx autorisent tout.
+
+        Args:
+            origin (str): Origine
+            user_agent (str): User-Agent utilisé pour le téléchargement
+
+        Returns:
+            dict: Entrée {status, lines, expires}
+        """
+        try:
+            response = requests.get(f"{origin}/robots.txt", headers={'User-Agent': user_agent},
+                                    timeout=self.timeout)
+            ttl = _ttl_from_headers(response.headers)
+            if response.status_code in (401, 403):
+                status, lines = DISALLOW_ALL, []
+            elif 400 <= response.status_code < 500:
+                status, lines = ALLOW_ALL, []
+            else:
+                response.raise_for_status()
+                status, lines = RULES, response.text.splitlines()
+        except Exception as e:
+            logger.warning(f"Erreur lors de la vérification du robots.txt pour {origin}: {str(e)}")
+            # En cas d'erreur, on suppose que c'est autorisé
+            status, lines, ttl = ALLOW_ALL, [], ERROR_TTL
+
+        return {'status': status, 'lines': lines, 'expires': time.time() + ttl}
+
+    def _get_entry(self, origin, user_agent):
+        """
+        Retourne l'entrée valide d'une origine, en la téléchargeant si nécessaire.
+
+        Args:
+            origin (str): Origine
+            user_agent (str): User-Agent utilisé pour le téléchargement
+
+        Returns:
+            dict: Entrée {status, lines, expires}
+        """
+        if not self._loaded:
+            self._load()
+
+        entry = self._fresh_entry(origin)
+        if entry:
+            return entry
+
+        with self._origin_lock(origin):
+            # Un autre thread a pu télécharger le fichier pendant l'attente du verrou
+            entry = self._fresh_entry(origin)
+            if entry:
+                return entry
+
+            entry = self._fetch(origin, user_agent)
+            with self._lock:
+                self._entries[origin] = entry
+                self._parsers.pop(origin, None)
+            self._save()
+            return entry
+
+    def can_fetch(self, url, user_agent):
+        """
+        Vérifie si le scraping d'une URL est autorisé.
+
+        Args:
+            url (str): URL à vérifier
+            user_agent (str): User-Agent à utiliser pour la vérification
+
+        Returns:
+            bool: True si le scraping est autorisé, False sinon
+        """
+        origin = _origin(url)
+        entry = self._get_entry(origin, user_agent)
+
+        if entry['status'] == ALLOW_ALL:
+            return True
+        if entry['status'] == DISALLOW_ALL:
+            return False
+
+        parser = self._parsers.get(origin)
+        if parser is None:
+            parser = RobotFileParser()
+            parser.parse(entry['lines'])
+            self._parsers[origin] = parser
+        return parser.can_fetch(user_agent, url)
+
+
+# Instance globale partagée par tous les scrapers
+robots_cache = RobotsPolicyCache()
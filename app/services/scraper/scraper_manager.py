@@ -2,22 +2,57 @@
 Gestionnaire de scrapers d'offres d'emploi.
 """
 
+import queue
+import atexit
 import logging
+import asyncio
+import threading
 import concurrent.futures
 from datetime import datetime, timezone
 
+from flask import current_app, has_app_context
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.attributes import flag_modified
+
 from app.models.job import Job
 from app.models.profile import Skill
 from app import db
 from app.services.fraud_detection import predict_job_fraud
+from app.services.fraud_detection.salary_stats import salary_stats
+from app.services.fraud_detection.background_scorer import background_scorer
+from app.services.company_service import company_resolver
 from app.services.scraper.indeed_scraper import IndeedScraper
 from app.services.scraper.linkedin_scraper import LinkedInScraper
 from app.services.scraper.monster_scraper import MonsterScraper
 from app.services.scraper.pole_emploi_scraper import PoleEmploiScraper
+from app.services.scraper.single_flight import single_flight, flight_key
+from app.services.scraper.circuit_breaker import circuit_breaker
+from app.services.scraper import metrics
+from app.services.scraper.enrichment import DetailEnricher
+from app.config.scraper_config import ENRICHMENT_CONFIG
 
 # Configuration du logger
 logger = logging.getLogger('scraper')
 
+# Nombre d'offres enregistrées par transaction
+SAVE_BATCH_SIZE = 50
+
+# Nombre maximal d'offres en attente entre les scrapers et l'enregistrement
+STREAM_QUEUE_SIZE = 200
+
+# Marqueur de fin d'un scraper dans la file des offres
+_DONE = object()
+
+
+def async_fraud_scoring_enabled():
+    """
+    Indique si l'analyse de fraude est déléguée au service d'arrière-plan.
+
+    Returns:
+        bool: True si les offres doivent être enregistrées en attente d'analyse
+    """
+    return has_app_context() and bool(current_app.config.get('FRAUD_ASYNC_SCORING'))
+
 class ScraperManager:
     """
     Gestionnaire de scrapers d'offres d'emploi.
@@ -34,64 +69,353 @@ class ScraperManager:
             'pole_emploi': PoleEmploiScraper()
         }
         
-    def scrape_all(self, query='', location='', parallel=True):
+    def close(self):
+        """
+        Ferme les sessions HTTP des scrapers et leurs connexions persistantes.
+        """
+        for name, scraper in self.scrapers.items():
+            try:
+                scraper.close()
+            except Exception as e:
+                logger.warning(f"Erreur lors de la fermeture du scraper {name}: {str(e)}")
+                
+    def scrape_all(self, query='', location='', parallel=True, max_pages=None, progress=None, with_summary=False):
         """
         Scrape les offres d'emploi depuis tous les sites configurés.
         
+        Les offres sont enregistrées par lots au fil de la pagination : la
+        mémoire utilisée ne dépend pas du nombre total de résultats.
+        Les demandes identiques simultanées, y compris depuis d'autres
+        processus, partagent un seul scraping (voir single_flight).
+        
         Args:
             query (str): Terme de recherche
             location (str): Lieu de recherche
             parallel (bool): Si True, exécute les scrapers en parallèle
+            max_pages (int, optional): Nombre maximal de pages par site. Par défaut, celui de la configuration.
+            progress (TaskProgress, optional): Suivi de l'avancement, notifié par source
+                                               (update) et après chaque lot enregistré (saved)
+            with_summary (bool): Si True, retourne aussi les métriques du scraping par source
+                                 (vides si le résultat d'un scraping identique a été réutilisé)
             
         Returns:
-            int: Nombre de nouvelles offres ajoutées
+            int ou tuple: Nombre de nouvelles offres ajoutées (et métriques si with_summary)
+        """
+        summary = {}
+        
+        def scrape():
+            logger.info(f"Démarrage du scraping pour '{query}' à '{location}'")
+            
+            # Parcours terminés, dont la marque n'avance qu'une fois les offres enregistrées
+            crawls = []
+            with metrics.collect() as run_metrics:
+                if parallel:
+                    jobs = self._iter_parallel(query, location, max_pages, progress, crawls)
+                else:
+                    jobs = self._iter_sequential(query, location, max_pages, progress, crawls)
+                    
+                new_jobs_count = self._filter_and_save(self._enrich(jobs), query, location, progress)
+            self._commit_crawls(crawls)
+            summary.update(run_metrics.snapshot())
+            self._log_summary(summary)
+            return new_jobs_count
+            
+        # Une recherche identique en cours (dans ce processus ou un autre) n'est pas relancée
+        new_jobs_count = single_flight.do(
+            flight_key(query, location, self.scrapers),
+            scrape,
+            on_shared=lambda count: self._on_shared(query, location, count, progress)
+        )
+        return (new_jobs_count, summary) if with_summary else new_jobs_count
+        
+    @staticmethod
+    def _commit_crawls(crawls):
+        """
+        Fait avancer les marques des parcours terminés, après l'enregistrement de leurs offres.
+        
+        Args:
+            crawls (list): Parcours terminés (IncrementalCrawl)
+        """
+        for crawl in crawls:
+            crawl.commit()
+        
+    @staticmethod
+    def _log_summary(summary):
+        """
+        Journalise le temps passé par étape pour chaque source.
+        
+        Args:
+            summary (dict): Métriques du scraping (voir ScrapeMetrics.snapshot)
+        """
+        for source, source_metrics in summary.items():
+            stages = ', '.join(
+                f"{stage} {stats['total']:.2f}s/{stats['count']}"
+                for stage, stats in source_metrics['stages'].items()
+            )
+            counters = ', '.join(f"{name}={value}" for name, value in source_metrics['counters'].items())
+            logger.info(f"Métriques {source}: {stages} | {counters}")
+        
+    def _on_shared(self, query, location, new_jobs_count, progress=None):
+        """
+        Signale la réutilisation du résultat d'un scraping identique.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            new_jobs_count (int): Nombre de nouvelles offres ajoutées par le leader
+            progress (TaskProgress, optional): Suivi de l'avancement
+        """
+        logger.info(f"Résultat partagé pour '{query}' à '{location}': {new_jobs_count} nouvelles offres")
+        if progress:
+            for name in self.scrapers:
+                progress.update(name, 'shared', 0)
+            progress.saved(new_jobs_count)
+        
+    def _iter_source(self, name, scraper, query, location, max_pages=None, progress=None, crawls=None):
+        """
+        Parcourt les offres d'un site en notifiant l'avancement.
+        
+        Args:
+            name (str): Nom du site
+            scraper (BaseScraper): Scraper du site
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages
+            progress (TaskProgress, optional): Suivi de l'avancement
+            crawls (list, optional): Reçoit le parcours terminé (voir BaseScraper.iter_jobs)
+            
+        Yields:
+            dict: Données d'une offre d'emploi
+        """
+        # Site qui nous bloque : ignoré sans attendre la limitation de débit
+        if circuit_breaker.is_open(name):
+            logger.warning(f"Disjoncteur ouvert pour {name} : source ignorée")
+            if progress:
+                progress.update(name, 'skipped', 0)
+            return
+            
+        count = 0
+        state = 'done'
+        if progress:
+            progress.update(name, 'running', count)
+        try:
+            for job in scraper.iter_jobs(query, location, max_pages, crawls=crawls):
+                count += 1
+                if progress:
+                    progress.update(name, 'running', count)
+                yield job
+        except Exception as e:
+            state = 'failed'
+            logger.error(f"Erreur avec le scraper {name}: {str(e)}")
+        finally:
+            logger.info(f"Scraper {name}: {count} offres trouvées")
+            if progress:
+                progress.update(name, state, count)
+                
+    def _iter_sequential(self, query, location, max_pages=None, progress=None, crawls=None):
         """
-        logger.info(f"Démarrage du scraping pour '{query}' à '{location}'")
+        Parcourt les offres de tous les sites, un site après l'autre.
         
-        all_jobs = []
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages par site
+            progress (TaskProgress, optional): Suivi de l'avancement
+            crawls (list, optional): Reçoit les parcours terminés
+            
+        Yields:
+            dict: Données d'une offre d'emploi
+        """
+        for name, scraper in self.scrapers.items():
+            yield from self._iter_source(name, scraper, query, location, max_pages, progress, crawls)
+            
+    def _iter_parallel(self, query, location, max_pages=None, progress=None, crawls=None):
+        """
+        Parcourt les offres de tous les sites, scrapés en parallèle.
         
-        if parallel:
-            # Exécution parallèle des scrapers
-            with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
-                future_to_scraper = {
-                    executor.submit(scraper.scrape, query, location): name
-                    for name, scraper in self.scrapers.items()
-                }
+        Chaque scraper s'exécute dans un thread et dépose ses offres dans une
+        file bornée : les scrapers attendent si l'enregistrement prend du retard.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages par site
+            progress (TaskProgress, optional): Suivi de l'avancement
+            crawls (list, optional): Reçoit les parcours terminés
+            
+        Yields:
+            dict: Données d'une offre d'emploi
+        """
+        jobs_queue = queue.Queue(maxsize=STREAM_QUEUE_SIZE)
+        stop = threading.Event()
+        
+        def produce(name, scraper):
+            try:
+                for job in self._iter_source(name, scraper, query, location, max_pages, progress, crawls):
+                    if not self._put(jobs_queue, job, stop):
+                        return
+            finally:
+                self._put(jobs_queue, _DONE, stop)
                 
-                for future in concurrent.futures.as_completed(future_to_scraper):
-                    scraper_name = future_to_scraper[future]
-                    try:
-                        jobs = future.result()
-                        logger.info(f"Scraper {scraper_name}: {len(jobs)} offres trouvées")
-                        all_jobs.extend(jobs)
-                    except Exception as e:
-                        logger.error(f"Erreur avec le scraper {scraper_name}: {str(e)}")
-        else:
-            # Exécution séquentielle des scrapers
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(self.scrapers)) as executor:
             for name, scraper in self.scrapers.items():
-                try:
-                    jobs = scraper.scrape(query, location)
-                    logger.info(f"Scraper {name}: {len(jobs)} offres trouvées")
-                    all_jobs.extend(jobs)
-                except Exception as e:
-                    logger.error(f"Erreur avec le scraper {name}: {str(e)}")
-                    
-        # Filtrer les offres d'emploi avec des liens d'exemple
-        filtered_jobs = []
-        for job in all_jobs:
-            # Vérifier si l'offre a un lien d'exemple
-            if 'source_url' in job and job['source_url'] and 'example.com' not in job['source_url']:
-                filtered_jobs.append(job)
+                # Chaque thread rattache ses métriques au scraping en cours
+                executor.submit(metrics.in_context(produce), name, scraper)
                 
-        logger.info(f"Après filtrage: {len(filtered_jobs)} offres réelles sur {len(all_jobs)} offres trouvées")
+            remaining = len(self.scrapers)
+            try:
+                while remaining:
+                    job = jobs_queue.get()
+                    if job is _DONE:
+                        remaining -= 1
+                    else:
+                        yield job
+            finally:
+                # Arrêt anticipé du consommateur : libérer les scrapers en attente
+                stop.set()
+                
+    @staticmethod
+    def _put(jobs_queue, item, stop):
+        """
+        Dépose un élément dans la file tant que le consommateur est actif.
+        
+        Args:
+            jobs_queue (queue.Queue): File des offres
+            item: Élément à déposer
+            stop (threading.Event): Signal d'arrêt du consommateur
+            
+        Returns:
+            bool: True si l'élément a été déposé, False si le consommateur s'est arrêté
+        """
+        while not stop.is_set():
+            try:
+                jobs_queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+        
+    def scrape_all_async(self, query='', location='', max_pages=None):
+        """
+        Scrape les offres d'emploi de tous les sites avec le moteur asynchrone.
+        
+        Args:
+            query (str): Terme de recherche
+            location (str): Lieu de recherche
+            max_pages (int, optional): Nombre maximal de pages par site
+            
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        return single_flight.do(
+            flight_key(query, location, self.scrapers),
+            lambda: self.scrape_searches_async([(query, location)], max_pages),
+            on_shared=lambda count: self._on_shared(query, location, count)
+        )
+        
+    def scrape_searches_async(self, searches, max_pages=None):
+        """
+        Scrape plusieurs recherches sur tous les sites dans une seule boucle d'événements.
+        
+        Args:
+            searches (list): Liste de tuples (terme de recherche, lieu)
+            max_pages (int, optional): Nombre maximal de pages par site
+            
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        # Import local : aiohttp n'est nécessaire que pour le mode asynchrone
+        from app.services.scraper.async_engine import scrape_sources
+        
+        logger.info(f"Démarrage du scraping asynchrone pour {len(searches)} recherche(s)")
+        crawls = []
+        all_jobs = asyncio.run(scrape_sources(self.scrapers, searches, max_pages=max_pages, crawls=crawls))
+        
+        query = ', '.join(q for q, _ in searches if q)
+        location = ', '.join(l for _, l in searches if l)
+        new_jobs_count = self._filter_and_save(self._enrich(all_jobs), query, location)
+        self._commit_crawls(crawls)
+        return new_jobs_count
+        
+    def _enrich(self, jobs):
+        """
+        Ajoute l'étape d'enrichissement par les pages d'offres au flux d'offres.
+        
+        Args:
+            jobs (iterable): Offres scrapées
+            
+        Returns:
+            iterable: Offres enrichies au fil de l'eau (ou jobs si l'enrichissement est désactivé)
+        """
+        if not ENRICHMENT_CONFIG.get('enabled'):
+            return jobs
+        return DetailEnricher(self.scrapers).enrich(jobs, self._enriched_urls)
+        
+    @staticmethod
+    def _enriched_urls(source_urls):
+        """
+        Indique les offres déjà enrichies lors d'un scraping précédent, en une requête.
+        
+        Args:
+            source_urls (list): URL des offres d'un paquet
+            
+        Returns:
+            set: URL dont la description complète est déjà enregistrée
+        """
+        if not source_urls:
+            return set()
+        return {
+            source_url for source_url, in db.session.query(Job.source_url).filter(
+                Job.source_url.in_(source_urls), Job.enriched_date.isnot(None)
+            )
+        }
+        
+    def _filter_and_save(self, jobs, query, location, progress=None):
+        """
+        Filtre les offres scrapées et sauvegarde les offres réelles en base de données.
+        
+        Les offres sont enregistrées par lots de SAVE_BATCH_SIZE au fur et à
+        mesure qu'elles arrivent : jobs peut être une liste ou un générateur.
+        
+        Args:
+            jobs (iterable): Offres scrapées
+            query (str): Terme de recherche (pour les logs)
+            location (str): Lieu de recherche (pour les logs)
+            progress (TaskProgress, optional): Suivi de l'avancement, notifié après chaque lot
+            
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        total_count = 0
+        filtered_count = 0
+        new_jobs_count = 0
+        batch = []
+        
+        for job in jobs:
+            total_count += 1
+            # Filtrer les offres d'emploi avec des liens d'exemple
+            if not job.get('source_url') or 'example.com' in job['source_url']:
+                continue
+            filtered_count += 1
+            batch.append(job)
+            if len(batch) >= SAVE_BATCH_SIZE:
+                new_jobs_count += self._save_jobs_to_db(batch)
+                batch = []
+                if progress:
+                    progress.saved(new_jobs_count)
+                    
+        if batch:
+            new_jobs_count += self._save_jobs_to_db(batch)
+            if progress:
+                progress.saved(new_jobs_count)
+            
+        logger.info(f"Après filtrage: {filtered_count} offres réelles sur {total_count} offres trouvées")
         
         # Si aucune offre réelle n'est trouvée après filtrage
-        if not filtered_jobs:
+        if not filtered_count:
             logger.warning(f"Aucune offre réelle trouvée pour '{query}' à '{location}' après filtrage")
             return 0
             
-        # Sauvegarder les offres en base de données
-        new_jobs_count = self._save_jobs_to_db(filtered_jobs)
         logger.info(f"{new_jobs_count} nouvelles offres ajoutées à la base de données")
         
         return new_jobs_count
@@ -106,11 +430,56 @@ class ScraperManager:
         Returns:
             int: Nombre de nouvelles offres ajoutées
         """
-        # Récupérer toutes les compétences existantes
-        existing_skills = {skill.name: skill for skill in Skill.query.all()}
+        try:
+            with metrics.timed('all', 'save'):
+                new_jobs_count = self._save_batch(jobs_data)
+        except Exception:
+            metrics.incr('all', 'save_errors')
+            raise
+        metrics.incr('all', 'saved', len(jobs_data))
+        metrics.incr('all', 'new_jobs', new_jobs_count)
+        return new_jobs_count
+        
+    def _save_batch(self, jobs_data):
+        """
+        Enregistre un lot d'offres (voir _save_jobs_to_db).
         
-        # Récupérer toutes les URLs sources existantes
-        existing_urls = {job.source_url for job in Job.query.all()}
+        Plusieurs workers peuvent enregistrer en même temps la même compétence
+        ou la même offre (source_url et nom de compétence uniques) : en cas de
+        conflit, le lot est rejoué une fois après relecture de la base.
+        
+        Args:
+            jobs_data (list): Liste des données d'offres d'emploi
+            
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        try:
+            return self._write_batch(jobs_data)
+        except IntegrityError:
+            # Un autre worker a créé une compétence ou une offre du lot entre-temps
+            db.session.rollback()
+            logger.info("Conflit d'enregistrement, nouvel essai du lot après relecture de la base")
+            return self._write_batch(jobs_data)
+        
+    def _write_batch(self, jobs_data):
+        """
+        Charge ou crée les compétences et les offres d'un lot puis valide la transaction.
+        
+        Args:
+            jobs_data (list): Liste des données d'offres d'emploi
+            
+        Returns:
+            int: Nombre de nouvelles offres ajoutées
+        """
+        # Récupérer uniquement les compétences et les offres concernées par le lot
+        skill_names = {name for job_data in jobs_data for name in job_data.get('skills', [])}
+        existing_skills = {
+            skill.name: skill for skill in Skill.query.filter(Skill.name.in_(skill_names)).all()
+        } if skill_names else {}
+        
+        urls = {job_data['source_url'] for job_data in jobs_data}
+        existing_jobs = {job.source_url: job for job in Job.query.filter(Job.source_url.in_(urls)).all()}
         
         # Préparer les nouvelles compétences à ajouter
         new_skills = {}
@@ -129,43 +498,86 @@ class ScraperManager:
             # Mettre à jour le dictionnaire des compétences existantes
             existing_skills.update(new_skills)
         
-        # Compteur de nouvelles offres
-        new_jobs_count = 0
+        # Rattacher les offres à leur entreprise canonique (créée si besoin)
+        companies = company_resolver.resolve_many({
+            job_data['company_name']: job_data.get('company_logo') for job_data in jobs_data
+        })
+        
+        # Nouvelles offres du lot
+        new_jobs = []
+        async_scoring = async_fraud_scoring_enabled()
         
         # Traiter chaque offre
         for job_data in jobs_data:
             # Vérifier si l'offre existe déjà
-            if job_data['source_url'] in existing_urls:
+            existing_job = existing_jobs.get(job_data['source_url'])
+            if existing_job is not None:
                 # Mise à jour de l'offre existante
-                self._update_existing_job(job_data, existing_skills)
+                self._update_existing_job(
+                    job_data, existing_skills, async_scoring, existing_job, companies[job_data['company_name']]
+                )
             else:
                 # Création d'une nouvelle offre
-                self._create_new_job(job_data, existing_skills)
-                new_jobs_count += 1
-                existing_urls.add(job_data['source_url'])
+                new_job = self._create_new_job(
+                    job_data, existing_skills, async_scoring, companies[job_data['company_name']]
+                )
+                existing_jobs[job_data['source_url']] = new_job
+                new_jobs.append(new_job)
+        
+        # Valeurs lues avant la validation (les objets sont ensuite expirés)
+        salaries = [(new_job.title, new_job.location, new_job.salary) for new_job in new_jobs]
         
         # Sauvegarder les modifications
         db.session.commit()
         
-        return new_jobs_count
+        # Mettre à jour les statistiques de salaires une fois les offres enregistrées
+        # (un lot rejoué après un conflit n'est pas compté deux fois)
+        for title, location, salary in salaries:
+            salary_stats.observe(title, location, salary)
+        salary_stats.flush()
         
-    def _update_existing_job(self, job_data, existing_skills):
+        # Réveiller le service d'analyse de fraude pour les offres en attente
+        if async_scoring:
+            background_scorer.notify()
+        
+        return len(new_jobs)
+        
+    def _update_existing_job(self, job_data, existing_skills, async_scoring=False, existing_job=None, company=None):
         """
         Met à jour une offre d'emploi existante.
         
         Args:
             job_data (dict): Données de l'offre d'emploi
             existing_skills (dict): Dictionnaire des compétences existantes
+            async_scoring (bool): Si True, l'analyse de fraude est faite en arrière-plan
+            existing_job (Job, optional): Offre déjà chargée. Si None, elle est recherchée par URL.
+            company (tuple, optional): Entreprise canonique (identifiant, nom, logo)
         """
-        existing_job = Job.query.filter_by(source_url=job_data['source_url']).first()
+        if existing_job is None:
+            existing_job = Job.query.filter_by(source_url=job_data['source_url']).first()
         
         if not existing_job:
             return
             
+        # Offre enrichie lors d'un scraping précédent : conserver la description complète
+        # et les informations qui en ont été extraites plutôt que l'extrait de la carte
+        keep_enriched = bool(existing_job.enriched_date) and not job_data.get('enriched')
+        if keep_enriched:
+            job_data = dict(
+                job_data,
+                description=existing_job.description,
+                education_required=existing_job.education_required,
+                experience_required=existing_job.experience_required,
+                skills=[skill.name for skill in existing_job.skills]
+            )
+            
         # Mise à jour des champs
         existing_job.title = job_data['title']
         existing_job.company_name = job_data['company_name']
         existing_job.company_logo = job_data['company_logo']
+        if company:
+            existing_job.company_id, existing_job.company_name, logo = company
+            existing_job.company_logo = logo or job_data['company_logo']
         existing_job.description = job_data['description']
         existing_job.location = job_data['location']
         existing_job.salary = job_data['salary']
@@ -174,36 +586,57 @@ class ScraperManager:
         existing_job.experience_required = job_data['experience_required']
         existing_job.benefits = job_data['benefits']
         existing_job.application_link = job_data['application_link']
-        existing_job.scraped_date = datetime.now(timezone.utc).replace(year=2023)
+        existing_job.source = job_data.get('source')
+        existing_job.scraped_date = datetime.now(timezone.utc)
+        if job_data.get('posted_date'):
+            existing_job.posted_date = job_data['posted_date']
+        if job_data.get('enriched'):
+            existing_job.enriched_date = datetime.utcnow()
         
-        # Analyser l'offre pour détecter les fraudes
-        fraud_result = predict_job_fraud(job_data)
-        
-        # Mise à jour des informations de fraude
-        try:
-            if hasattr(existing_job, 'fraud_probability'):
-                existing_job.fraud_probability = fraud_result['fraud_probability']
-                existing_job.set_fraud_indicators(fraud_result['indicators'])
-        except Exception as e:
-            logger.warning(f"Impossible de mettre à jour les informations de fraude: {str(e)}")
+        if async_scoring:
+            # Le contenu a pu changer : l'offre repasse en attente d'analyse
+            # (le score précédent reste affiché jusqu'à la nouvelle analyse)
+            existing_job.fraud_status = 'pending'
+            existing_job.fraud_claim = None
+            existing_job.fraud_attempts = 0
+            existing_job.fraud_retry_at = None
+            # Toujours écrits : une analyse commencée entre-temps sur l'ancien contenu
+            # ne doit pas pouvoir enregistrer son résultat (voir background_scorer.py)
+            flag_modified(existing_job, 'fraud_status')
+            flag_modified(existing_job, 'fraud_claim')
+        else:
+            # Analyser l'offre pour détecter les fraudes
+            fraud_result = predict_job_fraud(job_data)
+            
+            # Mise à jour des informations de fraude
+            try:
+                if hasattr(existing_job, 'fraud_probability'):
+                    existing_job.fraud_probability = fraud_result['fraud_probability']
+                    existing_job.set_fraud_indicators(fraud_result['indicators'])
+                    existing_job.fraud_status = 'scored'
+            except Exception as e:
+                logger.warning(f"Impossible de mettre à jour les informations de fraude: {str(e)}")
         
-        # Mise à jour des compétences
-        existing_job.skills = []
-        for skill_name in job_data['skills']:
-            if skill_name in existing_skills:
-                existing_job.skills.append(existing_skills[skill_name])
+        # Mise à jour des compétences (inchangées si la description complète est conservée)
+        if not keep_enriched:
+            existing_job.skills = []
+            for skill_name in job_data['skills']:
+                if skill_name in existing_skills:
+                    existing_job.skills.append(existing_skills[skill_name])
         
-    def _create_new_job(self, job_data, existing_skills):
+    def _create_new_job(self, job_data, existing_skills, async_scoring=False, company=None):
         """
         Crée une nouvelle offre d'emploi.
         
         Args:
             job_data (dict): Données de l'offre d'emploi
             existing_skills (dict): Dictionnaire des compétences existantes
+            async_scoring (bool): Si True, l'analyse de fraude est faite en arrière-plan
+            company (tuple, optional): Entreprise canonique (identifiant, nom, logo)
+            
+        Returns:
+            Job: Offre ajoutée à la session
         """
-        # Analyser l'offre pour détecter les fraudes
-        fraud_result = predict_job_fraud(job_data)
-        
         # Création de la nouvelle offre
         new_job = Job(
             title=job_data['title'],
@@ -218,17 +651,32 @@ class ScraperManager:
             benefits=job_data['benefits'],
             application_link=job_data['application_link'],
             source_url=job_data['source_url'],
-            posted_date=datetime.now(timezone.utc).replace(year=2023),
-            scraped_date=datetime.now(timezone.utc).replace(year=2023)
+            source=job_data.get('source'),
+            enriched_date=datetime.utcnow() if job_data.get('enriched') else None,
+            # Date affichée sur la carte, à défaut la date du scraping
+            posted_date=job_data.get('posted_date') or datetime.now(timezone.utc),
+            scraped_date=datetime.now(timezone.utc)
         )
+        if company:
+            new_job.company_id, new_job.company_name, logo = company
+            new_job.company_logo = logo or job_data['company_logo']
         
-        # Définir les informations de fraude
-        try:
-            if hasattr(new_job, 'fraud_probability'):
-                new_job.fraud_probability = fraud_result['fraud_probability']
-                new_job.set_fraud_indicators(fraud_result['indicators'])
-        except Exception as e:
-            logger.warning(f"Impossible de définir les informations de fraude: {str(e)}")
+        if async_scoring:
+            # L'offre est visible immédiatement, l'analyse de fraude suivra
+            new_job.fraud_probability = None
+            new_job.fraud_status = 'pending'
+        else:
+            # Analyser l'offre pour détecter les fraudes
+            fraud_result = predict_job_fraud(job_data)
+            
+            # Définir les informations de fraude
+            try:
+                if hasattr(new_job, 'fraud_probability'):
+                    new_job.fraud_probability = fraud_result['fraud_probability']
+                    new_job.set_fraud_indicators(fraud_result['indicators'])
+                    new_job.fraud_status = 'scored'
+            except Exception as e:
+                logger.warning(f"Impossible de définir les informations de fraude: {str(e)}")
         
         # Ajout des compétences
         for skill_name in job_data['skills']:
@@ -236,3 +684,41 @@ class ScraperManager:
                 new_job.skills.append(existing_skills[skill_name])
         
         db.session.add(new_job)
+        
+        return new_job
+
+
+# Instance partagée par tout le processus (créée au premier usage)
+_scraper_manager = None
+_scraper_manager_lock = threading.Lock()
+
+
+def get_scraper_manager():
+    """
+    Retourne le gestionnaire de scrapers du processus.
+    
+    Les scrapers et leurs sessions HTTP sont créés une seule fois : les
+    connexions TCP/TLS vers les sites sont réutilisées d'un rafraîchissement
+    à l'autre. Le gestionnaire peut être utilisé par plusieurs threads.
+    
+    Returns:
+        ScraperManager: Gestionnaire partagé
+    """
+    global _scraper_manager
+    if _scraper_manager is None:
+        with _scraper_manager_lock:
+            if _scraper_manager is None:
+                _scraper_manager = ScraperManager()
+                atexit.register(shutdown_scraper_manager)
+    return _scraper_manager
+
+
+def shutdown_scraper_manager():
+    """
+    Ferme le gestionnaire partagé (appelé à l'arrêt du processus).
+    """
+    global _scraper_manager
+    with _scraper_manager_lock:
+        manager, _scraper_manager = _scraper_manager, None
+    if manager is not None:
+        manager.close()
@@ -0,0 +1,290 @@
+"""
+Regroupement des scrapings identiques entre processus (single-flight).
+
+Quand plusieurs requêtes demandent la même recherche (terme, lieu et
+sources normalisés) en même temps, un seul processus — le « leader » —
+scrape les sites ; les autres attendent la fin de son bail et réutilisent
+son résultat. Les baux sont conservés dans une base SQLite partagée par
+tous les workers (SCRAPER_SINGLE_FLIGHT_DB) : le regroupement fonctionne
+entre threads comme entre processus gunicorn.
+
+Le leader prolonge son bail tant qu'il travaille. Si son processus
+s'arrête, le bail expire et l'un des processus en attente prend le relais.
+Un résultat reste partagé pendant RESULT_TTL secondes après la fin du
+scraping, pour absorber les rafales de requêtes identiques. Si la base des
+baux est inaccessible (verrouillée, disque plein...), le scraping est
+exécuté sans regroupement.
+"""
+
+import os
+import re
+import json
+import time
+import uuid
+import sqlite3
+import hashlib
+import logging
+import threading
+
+from app.config.scraper_config import state_path
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Chemin de la base SQLite des baux (regroupement désactivé si vide)
+SINGLE_FLIGHT_DB = os.environ.get('SCRAPER_SINGLE_FLIGHT_DB', state_path('single_flight.db'))
+
+# Durée d'un bail, prolongée tant que le leader travaille (secondes)
+LEASE_TTL = 120
+
+# Durée pendant laquelle le résultat d'un scraping terminé est partagé (secondes)
+RESULT_TTL = 60
+
+# Délai entre deux vérifications d'un processus en attente (secondes)
+POLL_INTERVAL = 0.5
+
+# États d'un bail
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+def flight_key(query, location, sources):
+    """
+    Construit la clé de regroupement d'une recherche.
+
+    Args:
+        query (str): Terme de recherche
+        location (str): Lieu de recherche
+        sources (iterable): Noms des sources scrapées
+
+    Returns:
+        str: Clé normalisée (insensible à la casse, aux espaces et à l'ordre des sources)
+    """
+    def normalize(value):
+        return re.sub(r'\s+', ' ', (value or '').strip().lower())
+
+    raw = '|'.join([normalize(query), normalize(location), ','.join(sorted(sources))])
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class SingleFlight:
+    """
+    Baux de scraping partagés entre processus dans une base SQLite.
+    """
+
+    def __init__(self, path=SINGLE_FLIGHT_DB, lease_ttl=LEASE_TTL, result_ttl=RESULT_TTL,
+                 poll_interval=POLL_INTERVAL):
+        """
+        Args:
+            path (str): Chemin de la base SQLite (None ou vide pour désactiver)
+            lease_ttl (float): Durée d'un bail (secondes)
+            result_ttl (float): Durée de partage d'un résultat (secondes)
+            poll_interval (float): Délai entre deux vérifications en attente (secondes)
+        """
+        self.path = path
+        self.lease_ttl = lease_ttl
+        self.result_ttl = result_ttl
+        self.poll_interval = poll_interval
+        self._local = threading.local()
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        """Indique si le regroupement est actif."""
+        return bool(self.path)
+
+    def _connect(self):
+        """
+        Retourne la connexion SQLite du thread courant (la table est créée au premier accès).
+
+        Returns:
+            sqlite3.Connection: Connexion à la base
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            self._local.conn = conn
+        if not self._initialized:
+            with self._lock:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS scrape_flight ("
+                    "key TEXT PRIMARY KEY, owner TEXT NOT NULL, status TEXT NOT NULL, "
+                    "expires REAL NOT NULL, result TEXT)"
+                )
+                self._initialized = True
+        return conn
+
+    def acquire(self, key):
+        """
+        Tente de prendre le bail d'une recherche.
+
+        Args:
+            key (str): Clé de la recherche
+
+        Returns:
+            tuple: (jeton du leader ou None, résultat partagé ou None).
+                   Jeton non nul : l'appelant est leader. Résultat non nul : un
+                   scraping identique vient de se terminer. Sinon : attendre.
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT status, expires, result FROM scrape_flight WHERE key = ?", (key,)
+            ).fetchone()
+            # Bail en cours ou résultat récent ; un échec récent est retenté
+            if row and row[1] > now and row[0] in (RUNNING, DONE):
+                conn.execute("COMMIT")
+                return None, json.loads(row[2]) if row[0] == DONE else None
+
+            token = uuid.uuid4().hex
+            conn.execute(
+                "INSERT OR REPLACE INTO scrape_flight (key, owner, status, expires, result) "
+                "VALUES (?, ?, ?, ?, NULL)",
+                (key, token, RUNNING, now + self.lease_ttl)
+            )
+            conn.execute("COMMIT")
+            return token, None
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    def renew(self, key, token):
+        """
+        Prolonge le bail du leader.
+
+        Args:
+            key (str): Clé de la recherche
+            token (str): Jeton du leader
+
+        Returns:
+            bool: True si le bail appartient toujours au leader
+        """
+        cursor = self._connect().execute(
+            "UPDATE scrape_flight SET expires = ? WHERE key = ? AND owner = ? AND status = ?",
+            (time.time() + self.lease_ttl, key, token, RUNNING)
+        )
+        return cursor.rowcount == 1
+
+    def complete(self, key, token, result=None, failed=False):
+        """
+        Termine le bail du leader et publie son résultat. Une erreur de la base
+        est journalisée sans être propagée : le bail expirera de lui-même.
+
+        Args:
+            key (str): Clé de la recherche
+            token (str): Jeton du leader
+            result: Résultat sérialisable en JSON, partagé avec les processus en attente
+            failed (bool): True si le scraping a échoué (les processus en attente le relancent)
+        """
+        status = FAILED if failed else DONE
+        try:
+            self._connect().execute(
+                "UPDATE scrape_flight SET status = ?, expires = ?, result = ? WHERE key = ? AND owner = ?",
+                (status, time.time() + self.result_ttl, json.dumps(result), key, token)
+            )
+        except sqlite3.Error as e:
+            logger.warning(f"Impossible de terminer le bail de scraping {key[:8]}: {str(e)}")
+
+    def wait(self, key, timeout=None):
+        """
+        Attend la fin du bail en cours d'une recherche.
+
+        Args:
+            key (str): Clé de la recherche
+            timeout (float, optional): Délai d'attente maximal (secondes)
+
+        Returns:
+            tuple: (état, résultat) : (DONE, résultat), (FAILED, None), ou
+                   (None, None) si le bail a expiré ou si le délai est dépassé
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        conn = self._connect()
+        while deadline is None or time.monotonic() < deadline:
+            row = conn.execute(
+                "SELECT status, expires, result FROM scrape_flight WHERE key = ?", (key,)
+            ).fetchone()
+            if not row or row[1] <= time.time():
+                return None, None
+            status, _, result = row
+            if status == DONE:
+                return DONE, json.loads(result)
+            if status == FAILED:
+                return FAILED, None
+            time.sleep(self.poll_interval)
+        return None, None
+
+    def do(self, key, fn, on_shared=None):
+        """
+        Exécute fn une seule fois pour toutes les demandes simultanées de la même clé.
+
+        Args:
+            key (str): Clé de la recherche
+            fn (callable): Fonction sans argument retournant un résultat sérialisable en JSON
+            on_shared (callable, optional): Appelée avec le résultat quand celui d'un autre leader est réutilisé
+
+        Returns:
+            Résultat de fn, calculé ici ou par un autre processus
+        """
+        if not self.enabled:
+            return fn()
+
+        while True:
+            try:
+                token, result = self.acquire(key)
+                if token is None and result is None:
+                    logger.info(f"Scraping identique en cours, attente du résultat ({key[:8]})")
+                    status, result = self.wait(key)
+                    if status is None or status == FAILED:
+                        # Bail expiré ou échec du leader : nouvelle tentative de prise du bail
+                        continue
+            except sqlite3.Error as e:
+                logger.warning(f"Base des baux de scraping inaccessible, scraping sans regroupement: {str(e)}")
+                return fn()
+            if token is None:
+                if on_shared:
+                    on_shared(result)
+                return result
+            return self._lead(key, token, fn)
+
+    def _lead(self, key, token, fn):
+        """
+        Exécute fn en tant que leader en prolongeant le bail régulièrement.
+
+        Args:
+            key (str): Clé de la recherche
+            token (str): Jeton du leader
+            fn (callable): Fonction à exécuter
+
+        Returns:
+            Résultat de fn
+        """
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease_ttl / 3):
+                try:
+                    if not self.renew(key, token):
+                        return
+                except sqlite3.Error as e:
+                    logger.warning(f"Impossible de prolonger le bail de scraping {key[:8]}: {str(e)}")
+
+        renewer = threading.Thread(target=heartbeat, name='single-flight-renew', daemon=True)
+        renewer.start()
+        try:
+            result = fn()
+        except Exception:
+            stop.set()
+            self.complete(key, token, failed=True)
+            raise
+        stop.set()
+        self.complete(key, token, result)
+        return result
+
+
+# Instance globale partagée par les gestionnaires de scrapers
+single_flight = SingleFlight()
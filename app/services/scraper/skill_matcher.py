@@ -0,0 +1,288 @@
+"""
+Extraction des compétences par automate d'Aho-Corasick.
+
+L'ancienne extraction appliquait une expression régulière par compétence
+de COMMON_SKILLS à chaque description : son coût croissait avec la taille
+du référentiel. Ici, toutes les compétences (et leurs synonymes) sont
+compilées une seule fois dans un automate, et chaque description est
+parcourue une seule fois, quelle que soit la taille du référentiel.
+
+La recherche est insensible à la casse et aux accents ("Modélisation" et
+"modelisation" sont équivalents) et respecte les limites de mots : "Java"
+n'est pas trouvé dans "JavaScript", ni "Go" dans "Google". Une limite n'est
+exigée que du côté où la compétence commence ou finit par une lettre ou un
+chiffre : "C++" et "C#" sont donc trouvés devant une espace ou une virgule.
+
+Le référentiel par défaut est COMMON_SKILLS. Un référentiel plus large
+(ex: ESCO, plusieurs dizaines de milliers de compétences) peut être chargé
+depuis SCRAPER_SKILLS_FILE : un fichier texte, éventuellement compressé en
+gzip, avec une compétence par ligne et ses synonymes séparés par '|' :
+
+    # nom affiché|synonyme|synonyme
+    JavaScript|JS|ECMAScript
+    Apprentissage automatique|Machine Learning
+
+Conversion d'un export CSV d'ESCO (colonnes preferredLabel et altLabels) :
+    python -m app.services.scraper.skill_matcher convert skills_fr.csv skills.txt.gz
+"""
+
+import os
+import re
+import csv
+import gzip
+import logging
+import argparse
+import threading
+import unicodedata
+from collections import deque
+
+from app.config.scraper_config import COMMON_SKILLS
+
+# Configuration du logger
+logger = logging.getLogger('scraper')
+
+# Fichier du référentiel de compétences (COMMON_SKILLS si vide)
+SKILLS_FILE = os.environ.get('SCRAPER_SKILLS_FILE', '')
+
+# Séparateur entre une compétence et ses synonymes dans le fichier du référentiel
+ALIAS_SEPARATOR = '|'
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """
+    Normalise un texte pour la recherche : sans accents, en minuscules, espaces simplifiés.
+
+    Args:
+        text (str): Texte à normaliser
+
+    Returns:
+        str: Texte normalisé
+    """
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(' ', text.casefold())
+
+
+def _is_word_char(ch):
+    """Indique si un caractère fait partie d'un mot (au sens de \\w)."""
+    return ch.isalnum() or ch == '_'
+
+
+class SkillMatcher:
+    """
+    Automate d'Aho-Corasick sur un référentiel de compétences.
+
+    Les transitions sont stockées dans une liste de dictionnaires (un par
+    état) avec des liens d'échec : la mémoire reste proportionnelle au
+    nombre total de caractères du référentiel.
+    """
+
+    def __init__(self, skills):
+        """
+        Construit l'automate.
+
+        Args:
+            skills (iterable): Compétences, chacune sous forme de nom ou de
+                               tuple (nom affiché, synonyme, ...)
+        """
+        self.names = []
+        self._goto = [{}]
+        self._fail = [0]
+        # Sorties de chaque état : tuples (longueur, index du nom, limite à gauche, limite à droite)
+        self._outputs = [()]
+
+        seen = {}
+        for entry in skills:
+            terms = (entry,) if isinstance(entry, str) else tuple(entry)
+            terms = [term.strip() for term in terms if term and term.strip()]
+            if not terms:
+                continue
+            index = seen.get(terms[0])
+            if index is None:
+                index = seen[terms[0]] = len(self.names)
+                self.names.append(terms[0])
+            for term in terms:
+                self._add(normalize(term), index)
+
+        self._build_failure_links()
+
+    def __len__(self):
+        return len(self.names)
+
+    def _add(self, pattern, index):
+        """
+        Ajoute un motif normalisé au trie.
+
+        Args:
+            pattern (str): Motif normalisé
+            index (int): Index du nom affiché de la compétence
+        """
+        if not pattern:
+            return
+        state = 0
+        for ch in pattern:
+            next_state = self._goto[state].get(ch)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][ch] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append(())
+            state = next_state
+        output = (len(pattern), index, _is_word_char(pattern[0]), _is_word_char(pattern[-1]))
+        if output not in self._outputs[state]:
+            self._outputs[state] += (output,)
+
+    def _build_failure_links(self):
+        """
+        Calcule les liens d'échec en largeur et fusionne les sorties des suffixes.
+        """
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        pending = deque(goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for ch, next_state in goto[state].items():
+                pending.append(next_state)
+                fallback = fail[state]
+                while fallback and ch not in goto[fallback]:
+                    fallback = fail[fallback]
+                target = goto[fallback].get(ch, 0)
+                fail[next_state] = target if target != next_state else 0
+                outputs[next_state] += outputs[fail[next_state]]
+
+    def find(self, text):
+        """
+        Recherche les compétences présentes dans un texte en un seul parcours.
+
+        Args:
+            text (str): Texte à analyser
+
+        Returns:
+            list: Noms des compétences trouvées, dans l'ordre du référentiel
+        """
+        if not text or not self.names:
+            return []
+
+        text = normalize(text)
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        last = len(text) - 1
+        found = set()
+        state = 0
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not outputs[state]:
+                continue
+            for length, index, left, right in outputs[state]:
+                if index in found:
+                    continue
+                start = position - length + 1
+                if left and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if right and position < last and _is_word_char(text[position + 1]):
+                    continue
+                found.add(index)
+
+        return [self.names[index] for index in sorted(found)]
+
+
+def load_taxonomy(path):
+    """
+    Charge un référentiel de compétences depuis un fichier texte (gzip si l'extension est .gz).
+
+    Args:
+        path (str): Chemin du fichier
+
+    Returns:
+        list: Tuples (nom affiché, synonyme, ...)
+    """
+    opener = gzip.open if path.endswith('.gz') else open
+    skills = []
+    with opener(path, 'rt', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                skills.append(tuple(line.split(ALIAS_SEPARATOR)))
+    return skills
+
+
+def convert_esco(csv_path, output_path):
+    """
+    Convertit un export CSV d'ESCO au format compact du référentiel.
+
+    Args:
+        csv_path (str): Export ESCO (colonnes preferredLabel et altLabels, synonymes séparés par des retours à la ligne)
+        output_path (str): Fichier produit (compressé si l'extension est .gz)
+
+    Returns:
+        int: Nombre de compétences écrites
+    """
+    opener = gzip.open if output_path.endswith('.gz') else open
+    count = 0
+    with open(csv_path, encoding='utf-8', newline='') as source, \
+            opener(output_path, 'wt', encoding='utf-8') as target:
+        for row in csv.DictReader(source):
+            name = (row.get('preferredLabel') or '').strip()
+            if not name:
+                continue
+            aliases = [alias.strip() for alias in (row.get('altLabels') or '').splitlines()]
+            terms = [name] + [alias for alias in aliases if alias and alias != name]
+            target.write(ALIAS_SEPARATOR.join(term.replace(ALIAS_SEPARATOR, ' ') for term in terms) + '\n')
+            count += 1
+    return count
+
+
+_skill_matcher = None
+_skill_matcher_lock = threading.Lock()
+
+
+def get_skill_matcher():
+    """
+    Retourne l'automate du référentiel configuré, construit au premier appel.
+
+    Returns:
+        SkillMatcher: Automate partagé par tous les scrapers
+    """
+    global _skill_matcher
+    if _skill_matcher is None:
+        with _skill_matcher_lock:
+            if _skill_matcher is None:
+                skills = list(COMMON_SKILLS)
+                if SKILLS_FILE:
+                    try:
+                        # Les compétences courantes restent en tête et gardent leur nom affiché
+                        skills += load_taxonomy(SKILLS_FILE)
+                    except OSError as e:
+                        logger.error(f"Impossible de charger le référentiel {SKILLS_FILE}: {str(e)}")
+                _skill_matcher = SkillMatcher(skills)
+                logger.info(f"Référentiel de compétences chargé : {len(_skill_matcher)} compétences")
+    return _skill_matcher
+
+
+def main():
+    """
+    Point d'entrée : conversion d'un référentiel ESCO ou test d'extraction.
+    """
+    parser = argparse.ArgumentParser(description="Référentiel de compétences")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    convert_parser = commands.add_parser('convert', help="Convertir un export CSV d'ESCO")
+    convert_parser.add_argument('csv', help="Export CSV d'ESCO")
+    convert_parser.add_argument('output', help="Fichier produit (.txt ou .txt.gz)")
+
+    find_parser = commands.add_parser('find', help="Extraire les compétences d'un texte")
+    find_parser.add_argument('text', help="Texte à analyser")
+    args = parser.parse_args()
+
+    if args.command == 'convert':
+        print(f"{convert_esco(args.csv, args.output)} compétences écrites dans {args.output}")
+    else:
+        print(', '.join(get_skill_matcher().find(args.text)))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,18 @@ Utilitaires pour le scraping d'offres d'emploi.
 
 import re
 import logging
-import time
+import functools
 import urllib.parse
-from urllib.robotparser import RobotFileParser
 import requests
-from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from bs4 import BeautifulSoup
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
 
-from app.config.scraper_config import EXTRACTION_PATTERNS, COMMON_SKILLS
+from app.config.scraper_config import EXTRACTION_PATTERNS, CONNECTION_POOL_CONFIG
+from app.services.scraper.rate_limiter import host_rate_limiter
+from app.services.scraper.robots_cache import robots_cache
+from app.services.scraper.http_cache import http_cache, CachingHTTPAdapter
+from app.services.scraper.skill_matcher import get_skill_matcher
 
 # Configuration du logger
 logger = logging.getLogger('scraper')
@@ -26,14 +28,22 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
-def create_session(retries=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504)):
+# Éléments de captcha indiquant un blocage
+CAPTCHA_SELECTORS = ['#captcha', '.captcha', '#recaptcha', '.g-recaptcha']
+
+def create_session(retries=3, backoff_factor=0.3, status_forcelist=(500, 502, 503, 504), cache_ttl=0,
+                   pool_connections=None, pool_maxsize=None):
     """
-    Crée une session HTTP avec gestion automatique des retries.
+    Crée une session HTTP avec gestion automatique des retries, cache HTTP
+    et pool de connexions persistantes (keep-alive) dimensionné.
     
     Args:
         retries (int): Nombre de tentatives en cas d'échec
         backoff_factor (float): Facteur de temporisation entre les tentatives
         status_forcelist (tuple): Liste des codes HTTP qui déclenchent un retry
+        cache_ttl (int): Durée minimale de fraîcheur des pages en cache (secondes)
+        pool_connections (int, optional): Nombre d'hôtes dont le pool est conservé
+        pool_maxsize (int, optional): Connexions conservées par hôte
         
     Returns:
         requests.Session: Session HTTP configurée
@@ -46,7 +56,11 @@ def create_session(retries=3, backoff_factor=0.3, status_forcelist=(500, 502, 50
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = HTTPAdapter(max_retries=retry)
+    adapter = CachingHTTPAdapter(
+        http_cache, min_ttl=cache_ttl, max_retries=retry,
+        pool_connections=pool_connections or CONNECTION_POOL_CONFIG['pool_connections'],
+        pool_maxsize=pool_maxsize or CONNECTION_POOL_CONFIG['pool_maxsize']
+    )
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
@@ -74,6 +88,7 @@ def safe_select(element, selectors):
 def check_robots_permission(url, user_agent):
     """
     Vérifie si le scraping est autorisé selon le fichier robots.txt du site.
+    Les règles sont mises en cache par origine (voir robots_cache).
     
     Args:
         url (str): URL à vérifier
@@ -82,23 +97,12 @@ def check_robots_permission(url, user_agent):
     Returns:
         bool: True si le scraping est autorisé, False sinon
     """
-    try:
-        parsed_url = urllib.parse.urlparse(url)
-        base_url = f"{parsed_url.scheme}://{parsed_url.netloc}"
-        
-        rp = RobotFileParser()
-        rp.set_url(f"{base_url}/robots.txt")
-        rp.read()
-        
-        return rp.can_fetch(user_agent, url)
-    except Exception as e:
-        logger.warning(f"Erreur lors de la vérification du robots.txt pour {url}: {str(e)}")
-        # En cas d'erreur, on suppose que c'est autorisé
-        return True
+    return robots_cache.can_fetch(url, user_agent)
 
 def check_blocked(soup, url):
     """
     Vérifie si la page indique que nous sommes bloqués.
+    Une page de blocage est retirée du cache HTTP pour ne pas être resservie.
     
     Args:
         soup (BeautifulSoup): Objet BeautifulSoup de la page
@@ -116,12 +120,13 @@ def check_blocked(soup, url):
     
     if any(bt.lower() in title.lower() for bt in blocked_titles):
         logger.warning(f"Détection de blocage sur {url}: {title}")
+        http_cache.invalidate(url)
         return True
         
     # Vérifier les éléments de captcha courants
-    captcha_selectors = ['#captcha', '.captcha', '#recaptcha', '.g-recaptcha']
-    if any(soup.select_one(selector) for selector in captcha_selectors):
+    if any(soup.select_one(selector) for selector in CAPTCHA_SELECTORS):
         logger.warning(f"Captcha détecté sur {url}")
+        http_cache.invalidate(url)
         return True
         
     return False
@@ -175,6 +180,7 @@ def extract_experience(text):
 def extract_skills(text):
     """
     Extrait les compétences techniques à partir d'un texte.
+    Le texte est parcouru une seule fois par l'automate du référentiel (voir skill_matcher.py).
     
     Args:
         text (str): Texte contenant potentiellement des compétences
@@ -185,16 +191,23 @@ def extract_skills(text):
     if not text:
         return []
         
-    found_skills = []
-    for skill in COMMON_SKILLS:
-        if re.search(r'\b' + re.escape(skill) + r'\b', text, re.IGNORECASE):
-            found_skills.append(skill)
-            
-    return found_skills
+    return get_skill_matcher().find(text)
 
+# Suffixes juridiques et mots génériques retirés des noms d'entreprises (une seule expression)
+COMPANY_SUFFIXES = re.compile(
+    r'\b(?:SAS|SARL|SA|EURL|SNC|SCS|SCA|Inc|LLC|Ltd|Limited|Corp|Corporation|GmbH|AG|BV|PLC|SpA|Oy|AB|'
+    r'Group|Groupe|Holding|Consulting|Consultants)\b',
+    re.IGNORECASE
+)
+
+# Nombre de noms d'entreprises nettoyés gardés en mémoire
+COMPANY_NAME_CACHE_SIZE = 4096
+
+@functools.lru_cache(maxsize=COMPANY_NAME_CACHE_SIZE)
 def clean_company_name(company_name):
     """
     Nettoie le nom d'une entreprise en supprimant les caractères spéciaux et les mots inutiles.
+    Les mêmes employeurs reviennent d'une offre à l'autre : les résultats sont mémorisés.
     
     Args:
         company_name (str): Nom de l'entreprise à nettoyer
@@ -205,23 +218,13 @@ def clean_company_name(company_name):
     if not company_name:
         return "Entreprise non spécifiée"
 
-    # Supprimer les caractères spéciaux et les mots inutiles
-    company_name = company_name.replace("·", "").replace("•", "").strip()
+    # Supprimer les caractères spéciaux et les suffixes courants
+    company_name = company_name.replace("·", "").replace("•", "")
+    company_name = COMPANY_SUFFIXES.sub('', company_name)
     company_name = re.sub(r'\s+', ' ', company_name)  # Remplacer les espaces multiples par un seul espace
 
-    # Supprimer les suffixes courants
-    suffixes = [
-        r'\bSAS\b', r'\bSARL\b', r'\bSA\b', r'\bEURL\b', r'\bSNC\b', r'\bSCS\b', r'\bSCA\b',
-        r'\bInc\b', r'\bLLC\b', r'\bLtd\b', r'\bLimited\b', r'\bCorp\b', r'\bCorporation\b',
-        r'\bGmbH\b', r'\bAG\b', r'\bBV\b', r'\bPLC\b', r'\bSpA\b', r'\bOy\b', r'\bAB\b',
-        r'\bGroup\b', r'\bGroupe\b', r'\bHolding\b', r'\bConsulting\b', r'\bConsultants\b'
-    ]
-
-    for suffix in suffixes:
-        company_name = re.sub(suffix, '', company_name, flags=re.IGNORECASE)
-
     # Supprimer les caractères spéciaux à la fin
-    company_name = re.sub(r'[,\.;:\-_]+$', '', company_name)
+    company_name = re.sub(r'[,\.;:\-_]+$', '', company_name.strip())
 
     # Supprimer les espaces en début et fin
     company_name = company_name.strip()
@@ -232,24 +235,91 @@ def clean_company_name(company_name):
 
     return company_name
 
-def rate_limit(config):
+# Durée des unités des dates relatives ("il y a 3 jours", "5 days ago")
+POSTED_DATE_UNITS = {
+    'minute': timedelta(minutes=1), 'min': timedelta(minutes=1),
+    'heure': timedelta(hours=1), 'hour': timedelta(hours=1), 'h': timedelta(hours=1),
+    'jour': timedelta(days=1), 'day': timedelta(days=1), 'j': timedelta(days=1),
+    'semaine': timedelta(weeks=1), 'week': timedelta(weeks=1),
+    'mois': timedelta(days=30), 'month': timedelta(days=30)
+}
+
+RELATIVE_DATE = re.compile(
+    r'(\d+)\s*\+?\s*(minutes?|min|heures?|hours?|h|jours?|days?|j|semaines?|weeks?|mois|months?)\b',
+    re.IGNORECASE
+)
+ABSOLUTE_DATE = re.compile(r'\b(\d{1,2})/(\d{1,2})/(\d{4})\b')
+ISO_DATE = re.compile(r'^\d{4}-\d{2}-\d{2}')
+
+def parse_posted_date(text, now=None):
+    """
+    Convertit la date de publication affichée sur une carte en date UTC.
+
+    Formats reconnus : date ISO (attribut datetime), "12/03/2024",
+    "aujourd'hui", "hier", "il y a 3 jours", "Publiée il y a 2 heures",
+    "30+ jours", "5 days ago". La précision des dates relatives est celle
+    de leur unité.
+
+    Args:
+        text (str): Texte ou attribut de la date
+        now (datetime, optional): Date de référence. Par défaut, maintenant.
+
+    Returns:
+        datetime ou None: Date de publication (UTC) ou None si le texte n'est pas reconnu
     """
-    Applique une limitation de débit selon la configuration.
+    if not text:
+        return None
+    text = text.strip()
+    now = now or datetime.now(timezone.utc)
+
+    if ISO_DATE.match(text):
+        try:
+            posted = datetime.fromisoformat(text.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+        return posted.replace(tzinfo=timezone.utc) if posted.tzinfo is None else posted.astimezone(timezone.utc)
+
+    match = ABSOLUTE_DATE.search(text)
+    if match:
+        day, month, year = (int(value) for value in match.groups())
+        try:
+            return datetime(year, month, day, tzinfo=timezone.utc)
+        except ValueError:
+            return None
+
+    lowered = text.lower()
+    match = RELATIVE_DATE.search(lowered)
+    if match:
+        unit = match.group(2).rstrip('s') if match.group(2) != 'mois' else 'mois'
+        return now - int(match.group(1)) * POSTED_DATE_UNITS[unit]
+    if any(word in lowered for word in ("aujourd", "à l'instant", 'today', 'just posted', 'instant')):
+        return now
+    if 'hier' in lowered or 'yesterday' in lowered:
+        return now - timedelta(days=1)
+
+    return None
+
+def rate_limit(config, url=None, scope=None):
+    """
+    Applique la limitation de débit de l'hôte de l'URL selon la configuration.
+    N'attend que si le budget de requêtes de l'hôte est épuisé.
     
     Args:
         config (dict): Configuration de limitation de débit
+        url (str, optional): URL de la requête (détermine l'hôte)
+        scope (str, optional): Budget distinct au sein de l'hôte (ex: 'detail')
     """
-    if not config:
-        return
-        
-    calls = config.get('calls', 5)
-    period = config.get('period', 60)
-    
-    # Calculer le temps d'attente entre chaque appel
-    wait_time = period / calls
+    host_rate_limiter.wait(url, config, scope)
+
+async def async_rate_limit(config, url=None):
+    """
+    Équivalent asynchrone de rate_limit : attend sans bloquer la boucle d'événements.
     
-    # Attendre
-    time.sleep(wait_time)
+    Args:
+        config (dict): Configuration de limitation de débit
+        url (str, optional): URL de la requête (détermine l'hôte)
+    """
+    await host_rate_limiter.async_wait(url, config)
 
 def format_url(base_url, params, query, location):
     """
@@ -3,12 +3,12 @@ API pour le scraping d'offres d'emploi.
 """
 
 import logging
-from app.services.scraper.scraper_manager import ScraperManager
+from app.services.scraper.scraper_manager import get_scraper_manager
 
 # Configuration du logger
 logger = logging.getLogger('scraper')
 
-def scrape_jobs(query='', location='', parallel=True):
+def scrape_jobs(query='', location='', parallel=True, async_engine=False, max_pages=None):
     """
     Scrape les offres d'emploi depuis plusieurs sources et les sauvegarde en base de données.
     N'utilise que des offres réelles.
@@ -17,12 +17,16 @@ def scrape_jobs(query='', location='', parallel=True):
         query (str): Terme de recherche
         location (str): Lieu de recherche
         parallel (bool): Si True, exécute les scrapers en parallèle
+        async_engine (bool): Si True, utilise le moteur asynchrone au lieu des threads
+        max_pages (int, optional): Nombre maximal de pages de résultats par site
 
     Returns:
         int: Nombre de nouvelles offres ajoutées
     """
-    # Créer une instance du gestionnaire de scrapers
-    scraper_manager = ScraperManager()
+    # Gestionnaire partagé : les connexions aux sites sont réutilisées d'un appel à l'autre
+    scraper_manager = get_scraper_manager()
     
     # Lancer le scraping
-    return scraper_manager.scrape_all(query, location, parallel)
+    if async_engine:
+        return scraper_manager.scrape_all_async(query, location, max_pages)
+    return scraper_manager.scrape_all(query, location, parallel, max_pages)
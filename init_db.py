@@ -9,6 +9,11 @@ from app.models.job import Job
 from app.models.profile import Profile, Skill
 from app.models.user import User
 from app.models.search_history import SearchHistory
+from app.models.fraud_score_stats import FraudScoreStats
+from app.models.salary_stats import SalaryStats
+from app.models.scrape_task import ScrapeTask
+from app.models.company import Company, CompanyAlias
+from app.services.fraud_detection.update_database import UNIQUE_SOURCE_URL_STATEMENTS
 
 def init_db():
     """
@@ -47,6 +52,48 @@ def init_db():
                 conn.execute(text("ALTER TABLE job ADD COLUMN fraud_indicators TEXT"))
                 conn.commit()
 
+        if 'fraud_status' not in column_names:
+            print("Ajout de la colonne 'fraud_status'...")
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE job ADD COLUMN fraud_status VARCHAR(20) DEFAULT 'scored'"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_job_fraud_status ON job (fraud_status)"))
+                conn.commit()
+
+        for column, ddl in (('fraud_claim', 'VARCHAR(32)'), ('fraud_retry_at', 'DATETIME'),
+                            ('fraud_attempts', 'INTEGER DEFAULT 0')):
+            if column not in column_names:
+                print(f"Ajout de la colonne '{column}'...")
+                with db.engine.connect() as conn:
+                    conn.execute(text(f"ALTER TABLE job ADD COLUMN {column} {ddl}"))
+                    conn.commit()
+
+        if 'source' not in column_names:
+            print("Ajout de la colonne 'source'...")
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE job ADD COLUMN source VARCHAR(50)"))
+                conn.commit()
+
+        if 'enriched_date' not in column_names:
+            print("Ajout de la colonne 'enriched_date'...")
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE job ADD COLUMN enriched_date DATETIME"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_job_source_url ON job (source_url)"))
+                conn.commit()
+
+        if 'company_id' not in column_names:
+            print("Ajout de la colonne 'company_id'...")
+            with db.engine.connect() as conn:
+                conn.execute(text("ALTER TABLE job ADD COLUMN company_id INTEGER REFERENCES company (id)"))
+                conn.execute(text("CREATE INDEX IF NOT EXISTS ix_job_company_id ON job (company_id)"))
+                conn.commit()
+
+        if not any(index['name'] == 'ix_job_source_url' and index['unique'] for index in inspect(db.engine).get_indexes('job')):
+            print("Suppression des offres en double et index unique sur 'source_url'...")
+            with db.engine.connect() as conn:
+                for statement in UNIQUE_SOURCE_URL_STATEMENTS:
+                    conn.execute(text(statement))
+                conn.commit()
+
         # Vérifier à nouveau les colonnes
         inspector = inspect(db.engine)
         columns = inspector.get_columns('job')
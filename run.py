@@ -1,6 +1,15 @@
-from app import create_app
+import os
+
+from app import create_app, start_background_services
 
 app = create_app()
 
+# Avec le rechargement automatique (mode debug), ce module est chargé par le processus
+# de surveillance puis par le processus qui sert l'application (WERKZEUG_RUN_MAIN) :
+# les services d'arrière-plan ne démarrent que dans ce dernier.
+# Hors mode debug (gunicorn run:app), ils démarrent au chargement du module.
+if os.environ.get('WERKZEUG_RUN_MAIN') == 'true' or not (app.debug or __name__ == '__main__'):
+    start_background_services(app)
+
 if __name__ == '__main__':
     app.run(debug=True)